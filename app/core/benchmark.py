@@ -0,0 +1,114 @@
+import math
+import statistics
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+
+def measure(func, repeat=5):
+    """Call func repeat times and return its timings in milliseconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    return {
+        'min': min(timings),
+        'median': statistics.median(timings),
+        'max': max(timings),
+    }
+
+
+def percentiles(durations, points=(50, 95, 99)):
+    """Return the nearest-rank percentiles of the durations by name"""
+    ordered = sorted(durations)
+    return {
+        f'p{point}': ordered[max(math.ceil(point / 100 * len(ordered)), 1) - 1]
+        for point in points
+    }
+
+
+def format_timings(timings):
+    """Return the timings as a line of text"""
+    return 'min {min:.2f}ms, median {median:.2f}ms, max {max:.2f}ms'.format(
+        **timings
+    )
+
+
+def sample_recipes(count):
+    """Return recipe representations like the recipe list sends"""
+    media = 'http://localhost:8000/media/uploads/recipe'
+    recipes = []
+    for i in range(count):
+        name = uuid.uuid4()
+        recipes.append({
+            'id': i,
+            'title': f'Recipe {i}',
+            'time_minutes': i % 180,
+            'price': str(Decimal(i % 10000) / 100),
+            'ingredients': list(range(i % 7, i % 7 + 5)),
+            'tags': list(range(i % 5, i % 5 + 3)),
+            'link': f'https://example.com/recipes/{i}',
+            'image_status': 'ready',
+            'images': {
+                'original': f'{media}/{name}.jpg',
+                'thumbnail': f'{media}/{name}_thumbnail.jpg',
+                'medium': f'{media}/{name}_medium.jpg',
+                'webp': f'{media}/{name}_webp.webp',
+            },
+        })
+
+    return recipes
+
+
+def timed_request(request, on_body=None):
+    """Return the status and duration in milliseconds of a request
+
+    The body of a successful response is passed to on_body once timed.
+    """
+    start = time.perf_counter()
+    body = None
+    try:
+        with urllib.request.urlopen(request) as response:
+            body = response.read()
+            status = response.status
+    except urllib.error.HTTPError as exc:
+        status = exc.code
+    except OSError:
+        status = None
+    duration = (time.perf_counter() - start) * 1000
+
+    if on_body is not None and body is not None:
+        on_body(body)
+    return status, duration
+
+
+def load_test(url, requests, concurrency, headers=None):
+    """Send the GET requests from concurrent clients and time them
+
+    Returns the status and duration of each request and the total time
+    in milliseconds.
+    """
+    def send(_):
+        return timed_request(
+            urllib.request.Request(url, headers=headers or {})
+        )
+
+    return run_concurrently(send, requests, concurrency)
+
+
+def run_concurrently(send, requests, concurrency):
+    """Call send with the index of each request from concurrent clients
+
+    Returns what send returns for each request and the total time in
+    milliseconds.
+    """
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(send, range(requests)))
+
+    return results, (time.perf_counter() - start) * 1000
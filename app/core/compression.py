@@ -0,0 +1,103 @@
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class _BrotliCompressor:
+    """Brotli compressor with the interface of zlib compress objects"""
+
+    def __init__(self, level):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def flush(self):
+        return self._compressor.finish()
+
+
+def _gzip_compressobj(level):
+    return zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+
+def _zstd_compressobj(level):
+    return zstandard.ZstdCompressor(level=level).compressobj()
+
+
+# Compress object factory of each codec installed, by content coding
+CODECS = {'gzip': _gzip_compressobj}
+if brotli is not None:
+    CODECS['br'] = _BrotliCompressor
+if zstandard is not None:
+    CODECS['zstd'] = _zstd_compressobj
+
+
+def parse_accept_encoding(header):
+    """Return the quality of each content coding of an Accept-Encoding"""
+    qualities = {}
+    for coding in header.split(','):
+        name, _, params = coding.partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[name] = quality
+
+    return qualities
+
+
+def choose_codec(header, preference):
+    """Return the installed codec the client accepts best, if any
+
+    Codings accepted with the same quality are chosen in the order of
+    preference.
+    """
+    qualities = parse_accept_encoding(header)
+    best, best_quality = None, 0.0
+    for codec in preference:
+        quality = qualities.get(codec, qualities.get('*', 0.0))
+        if codec in CODECS and quality > best_quality:
+            best, best_quality = codec, quality
+
+    return best
+
+
+def compress(codec, data, level):
+    """Return the data compressed with the codec"""
+    compressor = CODECS[codec](level)
+    return compressor.compress(data) + compressor.flush()
+
+
+def compress_sequence(codec, chunks, level):
+    """Compress the chunks as a single stream, yielding as data is ready"""
+    compressor = CODECS[codec](level)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def decompress(codec, data):
+    """Return the data compressed with the codec, decompressed"""
+    if codec == 'br':
+        return brotli.decompress(data)
+    if codec == 'zstd':
+        return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+    return zlib.decompress(data, 16 + zlib.MAX_WBITS)
@@ -0,0 +1,87 @@
+import functools
+
+from django.db.backends.postgresql import base
+
+from core.db.backends.postgresql.creation import DatabaseCreation
+from core.db.pool import get_pool
+
+
+def _ping(connection):
+    """Return whether the connection still answers queries"""
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+    except base.Database.Error:
+        return False
+    return True
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """PostgreSQL backend with health checks and an optional pool
+
+    With CONN_HEALTH_CHECKS, a persistent connection is checked before
+    its first query in a request and reopened if it stopped working.
+    With POOL enabled, connections are taken from a pool shared by the
+    threads of the process and returned to it at the end of the request
+    instead of being closed.
+    """
+    creation_class = DatabaseCreation
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pool = None
+        self.health_check_done = False
+
+    def get_new_connection(self, conn_params):
+        options = self.settings_dict.get('POOL') or {}
+        if not options.get('ENABLED'):
+            self.pool = None
+            return super().get_new_connection(conn_params)
+
+        # Connections of the same alias may use other databases, like
+        # while the test database is created
+        key = (self.alias, repr(sorted(conn_params.items())))
+        self.pool = get_pool(key, options, _ping)
+        return self.pool.acquire(
+            functools.partial(super().get_new_connection, conn_params)
+        )
+
+    def connect(self):
+        super().connect()
+        self.health_check_done = True
+
+    def _close(self):
+        if self.pool is None or self.connection is None:
+            return super()._close()
+
+        # End any transaction left open before the connection is reused
+        try:
+            self.connection.rollback()
+        except base.Database.Error:
+            self.pool.discard(self.connection)
+        else:
+            self.pool.release(self.connection)
+
+    def close_if_unusable_or_obsolete(self):
+        super().close_if_unusable_or_obsolete()
+        if self.connection is None:
+            return
+
+        if self.pool is not None and not self.in_atomic_block:
+            self.close()
+        else:
+            self.health_check_done = False
+
+    def close_if_health_check_failed(self):
+        """Close the connection if it stopped working since last checked"""
+        if self.connection is None or self.health_check_done or \
+                not self.settings_dict.get('CONN_HEALTH_CHECKS'):
+            return
+
+        if not self.is_usable():
+            self.close()
+        self.health_check_done = True
+
+    def _cursor(self, name=None):
+        self.close_if_health_check_failed()
+        return super()._cursor(name)
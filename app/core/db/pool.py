@@ -0,0 +1,118 @@
+import threading
+import time
+from collections import deque
+
+from django.db.utils import OperationalError
+
+
+class ConnectionPool:
+    """Thread safe pool of open database connections
+
+    At most max_size connections are handed out at once, callers wait up
+    to timeout seconds for one to be released. Released connections are
+    closed after idle_timeout seconds unused and, when a ping function
+    is given, checked with it before they are handed out again.
+    """
+
+    def __init__(self, max_size, idle_timeout, timeout, ping=None):
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self._ping = ping
+        # Released connections with their release time, the most recent
+        # last, so the warmest connection is reused first
+        self._idle = deque()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_size)
+
+    def _close(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def _pop_idle(self):
+        """Return a usable idle connection or None"""
+        while True:
+            with self._lock:
+                if not self._idle:
+                    return None
+                connection, released = self._idle.pop()
+
+            expired = time.monotonic() - released > self.idle_timeout
+            if expired or (self._ping and not self._ping(connection)):
+                self._close(connection)
+                continue
+            return connection
+
+    def acquire(self, connect):
+        """Return an idle connection, or one opened by calling connect"""
+        if not self._slots.acquire(timeout=self.timeout):
+            raise OperationalError(
+                f'No database connection released in {self.timeout} seconds'
+            )
+
+        try:
+            connection = self._pop_idle()
+            return connection if connection is not None else connect()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, connection):
+        """Return the connection to the pool, closing expired ones"""
+        now = time.monotonic()
+        expired = []
+        with self._lock:
+            self._idle.append((connection, now))
+            while now - self._idle[0][1] > self.idle_timeout:
+                expired.append(self._idle.popleft()[0])
+        self._slots.release()
+
+        for connection in expired:
+            self._close(connection)
+
+    def discard(self, connection):
+        """Close a connection that can't be reused, freeing its slot"""
+        self._close(connection)
+        self._slots.release()
+
+    def close_idle(self):
+        """Close all the idle connections"""
+        with self._lock:
+            idle, self._idle = self._idle, deque()
+        for connection, _ in idle:
+            self._close(connection)
+
+    @property
+    def idle_count(self):
+        return len(self._idle)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(key, options, ping=None):
+    """Return the pool of the process for the key, creating it if needed
+
+    The options are the POOL settings of the database, ping is used
+    to check idle connections when PRE_PING is enabled.
+    """
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(
+                max_size=options.get('MAX_SIZE', 10),
+                idle_timeout=options.get('IDLE_TIMEOUT', 300),
+                timeout=options.get('TIMEOUT', 10),
+                ping=ping if options.get('PRE_PING', True) else None,
+            )
+        return _pools[key]
+
+
+def close_pools():
+    """Close the idle connections of all the pools of the process"""
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close_idle()
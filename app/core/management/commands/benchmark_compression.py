@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from core import compression
+from core.benchmark import measure, sample_recipes
+
+
+# Levels measured for each codec, from the fastest to the smallest
+LEVELS = {
+    'gzip': [1, 6, 9],
+    'br': [1, 4, 6, 11],
+    'zstd': [1, 3, 9, 19],
+}
+
+
+class Command(BaseCommand):
+    """Django command to compare the response compression codecs"""
+    help = 'Measure the size and time of compressing a list of recipes ' \
+        'with each installed codec and level'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recipes', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        content = JSONRenderer().render({
+            'next': None,
+            'previous': None,
+            'results': sample_recipes(options['recipes']),
+        })
+        self.stdout.write(f'identity: {len(content)} bytes')
+
+        for codec, levels in LEVELS.items():
+            if codec not in compression.CODECS:
+                self.stdout.write(f'{codec}: not installed')
+                continue
+
+            for level in levels:
+                compressed = compression.compress(codec, content, level)
+                if compression.decompress(codec, compressed) != content:
+                    raise CommandError(f'{codec} {level} output differs')
+
+                compress = measure(
+                    lambda: compression.compress(codec, content, level),
+                    options['repeat']
+                )
+                decompress = measure(
+                    lambda: compression.decompress(codec, compressed),
+                    options['repeat']
+                )
+                self.stdout.write(
+                    '{} {}: {} bytes, ratio {:.1f}, compress {:.2f}ms '
+                    '({:.1f}MB/s), decompress {:.2f}ms'.format(
+                        codec, level, len(compressed),
+                        len(content) / len(compressed), compress['median'],
+                        len(content) / compress['median'] / 1000,
+                        decompress['median']
+                    )
+                )
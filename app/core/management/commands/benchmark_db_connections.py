@@ -0,0 +1,96 @@
+import statistics
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.core.signals import request_finished, request_started
+from django.db import connections
+
+from core.db.pool import close_pools
+
+
+class Command(BaseCommand):
+    """Django command to compare the database connection strategies"""
+    help = 'Time small requests from concurrent threads with a new ' \
+        'connection per request, persistent connections and the pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--database', default='default')
+
+    def run_client(self, alias, count, durations):
+        """Send request signals around a query like a request thread"""
+        User = get_user_model()
+        for _ in range(count):
+            start = time.perf_counter()
+            request_started.send(sender=self.__class__)
+            User.objects.using(alias).filter(pk=0).exists()
+            request_finished.send(sender=self.__class__)
+            durations.append((time.perf_counter() - start) * 1000)
+        connections[alias].close()
+
+    def run_mode(self, alias, requests, concurrency):
+        """Return the requests per second and the request durations"""
+        durations = []
+        clients = [
+            threading.Thread(
+                target=self.run_client,
+                args=(alias, requests // concurrency, durations)
+            )
+            for _ in range(concurrency)
+        ]
+        start = time.perf_counter()
+        for client in clients:
+            client.start()
+        for client in clients:
+            client.join()
+        elapsed = time.perf_counter() - start
+        close_pools()
+
+        return len(durations) / elapsed, durations
+
+    def handle(self, *args, **options):
+        alias = options['database']
+        settings_dict = connections.databases[alias]
+        if not hasattr(connections[alias], 'close_if_health_check_failed'):
+            raise CommandError(
+                f'The {alias} database does not use the pooling backend'
+            )
+
+        original = dict(settings_dict)
+        pool = {**(settings_dict.get('POOL') or {}), 'ENABLED': True}
+        modes = [
+            ('new connection per request', {'CONN_MAX_AGE': 0}),
+            ('persistent connections', {
+                'CONN_MAX_AGE': 600, 'CONN_HEALTH_CHECKS': False,
+            }),
+            ('persistent with health checks', {
+                'CONN_MAX_AGE': 600, 'CONN_HEALTH_CHECKS': True,
+            }),
+            ('pool', {'CONN_MAX_AGE': 0, 'POOL': pool}),
+            ('pool without pre-ping', {
+                'CONN_MAX_AGE': 0, 'POOL': {**pool, 'PRE_PING': False},
+            }),
+        ]
+
+        try:
+            for name, mode in modes:
+                # Connections of new threads read the shared settings
+                settings_dict.update(
+                    {'POOL': {'ENABLED': False}, **mode}
+                )
+                rate, durations = self.run_mode(
+                    alias, options['requests'], options['concurrency']
+                )
+                self.stdout.write(
+                    '{}: {:.0f} requests/s, median {:.2f}ms, '
+                    'max {:.2f}ms'.format(
+                        name, rate, statistics.median(durations),
+                        max(durations)
+                    )
+                )
+        finally:
+            settings_dict.clear()
+            settings_dict.update(original)
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from core.benchmark import measure, format_timings, sample_recipes
+from core.renderers import FastJSONRenderer
+
+
+class Command(BaseCommand):
+    """Django command to compare the JSON renderers"""
+    help = 'Time rendering a list of recipes with JSONRenderer and ' \
+        'FastJSONRenderer'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recipes', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        data = {
+            'next': None,
+            'previous': None,
+            'results': sample_recipes(options['recipes']),
+        }
+        renderers = [
+            ('JSONRenderer', JSONRenderer()),
+            ('FastJSONRenderer', FastJSONRenderer()),
+        ]
+
+        outputs = {name: renderer.render(data) for name, renderer in renderers}
+        if len(set(outputs.values())) != 1:
+            raise CommandError('The renderers output differs')
+
+        medians = {}
+        for name, renderer in renderers:
+            timings = measure(
+                lambda: renderer.render(data), options['repeat']
+            )
+            medians[name] = timings['median']
+            self.stdout.write(f'{name}: {format_timings(timings)}')
+
+        self.stdout.write('speed-up: {:.1f}x, {} bytes'.format(
+            medians['JSONRenderer'] / medians['FastJSONRenderer'],
+            len(outputs['JSONRenderer'])
+        ))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from core.benchmark import load_test, percentiles
+
+
+class Command(BaseCommand):
+    """Django command to measure the throughput of a running server"""
+    help = 'Send GET requests to a URL from concurrent clients and report ' \
+        'the throughput and latency'
+
+    def add_arguments(self, parser):
+        parser.add_argument('url')
+        parser.add_argument('--requests', type=int, default=1000)
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument('--token', help='Token of the API user')
+
+    def handle(self, *args, **options):
+        headers = {}
+        if options['token']:
+            headers['Authorization'] = f'Token {options["token"]}'
+
+        results, elapsed = load_test(
+            options['url'], options['requests'], options['concurrency'],
+            headers
+        )
+        failed = sum(1 for status, _ in results if status != 200)
+        durations = [duration for _, duration in results]
+
+        self.stdout.write(
+            '{} requests, {} failed in {:.0f}ms: {:.1f} requests/s, '
+            'latency p50 {p50:.2f}ms, p95 {p95:.2f}ms, p99 {p99:.2f}ms, '
+            'max {:.2f}ms'.format(
+                len(results), failed, elapsed,
+                len(results) / elapsed * 1000, max(durations),
+                **percentiles(durations)
+            )
+        )
@@ -1,21 +1,82 @@
+import random
 import time
+from concurrent.futures import ThreadPoolExecutor
+
 from django.db import connections
 from django.db.utils import OperationalError
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 
 
 class Command(BaseCommand):
     """Django command to pause execution until database is available"""
 
-    def handle(self, *args, **options):
-        self.stdout.write('Waiting for database...')
-        db_conn = None
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database', action='append', dest='databases',
+            help='Alias of a database to wait for, all by default'
+        )
+        parser.add_argument(
+            '--timeout', type=float, default=60,
+            help='Seconds to wait for the databases before failing'
+        )
+        parser.add_argument(
+            '--delay', type=float, default=0.5,
+            help='Upper bound of the first wait, doubled after each attempt'
+        )
+        parser.add_argument(
+            '--max-delay', type=float, default=5,
+            help='Upper bound of the waits between attempts'
+        )
+
+    def query_database(self, alias):
+        """Open a connection to the database and run a query"""
+        try:
+            with connections[alias].cursor() as cursor:
+                cursor.execute('SELECT 1')
+        finally:
+            connections[alias].close()
+
+    def wait_for(self, alias, deadline, delay, max_delay):
+        """Retry the database with exponential backoff and full jitter
 
-        while not db_conn:
+        Randomizing the waits spreads the attempts of containers started
+        together instead of retrying all at once.
+        """
+        attempt = 0
+        while True:
             try:
-                db_conn = connections['default']
+                self.query_database(alias)
+                return
             except OperationalError:
-                self.stdout.write('Database unavailable, waiting 1 second...')
-                time.sleep(1)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise CommandError(f'Database {alias} unavailable')
+
+            wait = min(
+                random.uniform(0, min(max_delay, delay * 2 ** attempt)),
+                remaining
+            )
+            self.stdout.write(
+                f'Database {alias} unavailable, waiting {wait:.2f} seconds...'
+            )
+            time.sleep(wait)
+            attempt += 1
+
+    def handle(self, *args, **options):
+        self.stdout.write('Waiting for database...')
+        aliases = options['databases'] or list(connections.databases)
+        deadline = time.monotonic() + options['timeout']
+
+        # Each alias is checked from its own thread, with its own connection
+        with ThreadPoolExecutor(max_workers=len(aliases)) as executor:
+            futures = [
+                executor.submit(
+                    self.wait_for, alias, deadline, options['delay'],
+                    options['max_delay']
+                )
+                for alias in aliases
+            ]
+            for future in futures:
+                future.result()
 
         self.stdout.write(self.style.SUCCESS('Database available!'))
@@ -0,0 +1,134 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+
+# Upper bounds in milliseconds of the request duration histogram buckets,
+# a last bucket counts the slower requests
+BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+_local = threading.local()
+_views = {}
+_views_lock = threading.Lock()
+
+
+class RequestTimings:
+    """Time spent in the database and in serializers by a request"""
+    __slots__ = ('db_queries', 'db_time', 'serialize_time', 'serializing')
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+        self.serializing = False
+
+
+def start_request():
+    """Return the timings of a new request of the current thread"""
+    _local.timings = RequestTimings()
+    return _local.timings
+
+
+def finish_request():
+    _local.timings = None
+
+
+def record_query(execute, sql, params, many, context):
+    """Connection execute wrapper counting and timing the queries"""
+    timings = getattr(_local, 'timings', None)
+    if timings is None:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.db_queries += 1
+        timings.db_time += time.perf_counter() - start
+
+
+@contextmanager
+def measure_serialization():
+    """Add the time spent in the block to the serialization time
+
+    Nested blocks, like nested serializers, are only counted once.
+    """
+    timings = getattr(_local, 'timings', None)
+    if timings is None or timings.serializing:
+        yield
+        return
+
+    timings.serializing = True
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.serialize_time += time.perf_counter() - start
+        timings.serializing = False
+
+
+class TimedSerializerMixin:
+    """Serializer mixin measuring the serialization time of the request"""
+
+    def to_representation(self, instance):
+        with measure_serialization():
+            return super().to_representation(instance)
+
+
+class ViewMetrics:
+    """Aggregated metrics of the requests of a view"""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.duration = 0.0
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+        self.response_bytes = 0
+        self.histogram = [0] * (len(BUCKETS) + 1)
+
+    def add(self, status_code, duration, timings, response_bytes):
+        self.requests += 1
+        self.errors += status_code >= 500
+        self.duration += duration
+        self.db_queries += timings.db_queries
+        self.db_time += timings.db_time
+        self.serialize_time += timings.serialize_time
+        self.response_bytes += response_bytes
+        self.histogram[bisect_left(BUCKETS, duration * 1000)] += 1
+
+    def as_dict(self):
+        """Return the metrics with the times in milliseconds"""
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'duration_ms': round(self.duration * 1000, 3),
+            'db_queries': self.db_queries,
+            'db_time_ms': round(self.db_time * 1000, 3),
+            'serialize_time_ms': round(self.serialize_time * 1000, 3),
+            'response_bytes': self.response_bytes,
+            'histogram_ms': dict(zip(
+                [str(bound) for bound in BUCKETS] + ['+Inf'], self.histogram
+            )),
+        }
+
+
+def record(view_name, status_code, duration, timings, response_bytes):
+    """Add a finished request to the metrics of its view"""
+    with _views_lock:
+        if view_name not in _views:
+            _views[view_name] = ViewMetrics()
+        _views[view_name].add(status_code, duration, timings, response_bytes)
+
+
+def snapshot():
+    """Return the metrics of each view recorded by this process"""
+    with _views_lock:
+        return {name: view.as_dict() for name, view in _views.items()}
+
+
+def reset():
+    with _views_lock:
+        _views.clear()
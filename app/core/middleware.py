@@ -0,0 +1,153 @@
+import logging
+import re
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+from core import compression, metrics, queries
+
+
+logger = logging.getLogger(__name__)
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """Compress text responses with the best codec the client accepts
+
+    Only the content types in COMPRESSION_CONTENT_TYPES are compressed,
+    so images and other encoded media are left alone, and responses
+    smaller than COMPRESSION_MIN_SIZE are sent as they are. Streaming
+    responses are compressed as they are sent.
+    """
+
+    def _is_compressible(self, response):
+        content_type = response.get('Content-Type', '').split(';')[0]
+        content_type = content_type.strip().lower()
+        return not response.has_header('Content-Encoding') and any(
+            content_type.startswith(compressible)
+            if compressible.endswith('/') else content_type == compressible
+            for compressible in settings.COMPRESSION_CONTENT_TYPES
+        )
+
+    def process_response(self, request, response):
+        if not self._is_compressible(response):
+            return response
+        if not response.streaming and \
+                len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        codec = compression.choose_codec(
+            request.META.get('HTTP_ACCEPT_ENCODING', ''),
+            settings.COMPRESSION_CODECS
+        )
+        if codec is None:
+            return response
+        level = settings.COMPRESSION_LEVELS[codec]
+
+        if response.streaming:
+            response.streaming_content = compression.compress_sequence(
+                codec, response.streaming_content, level
+            )
+            del response['Content-Length']
+        else:
+            content = compression.compress(codec, response.content, level)
+            if len(content) >= len(response.content):
+                return response
+            response.content = content
+            response['Content-Length'] = str(len(content))
+
+        # The compressed body is a different representation of the same
+        # resource, so its ETag can only match weakly
+        if response.has_header('ETag'):
+            response['ETag'] = re.sub(r'^"', 'W/"', response['ETag'])
+        response['Content-Encoding'] = codec
+
+        return response
+
+
+class MetricsMiddleware:
+    """Measure the requests and aggregate the metrics of each view
+
+    The total, database and serialization times are sent back in a
+    Server-Timing header when METRICS_SERVER_TIMING is set. The request
+    is counted with the name of its view, like recipe:recipe-list.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.METRICS_ENABLED:
+            return self.get_response(request)
+
+        timings = metrics.start_request()
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(metrics.record_query)
+                    )
+                response = self.get_response(request)
+        finally:
+            metrics.finish_request()
+        duration = time.perf_counter() - start
+
+        match = request.resolver_match
+        metrics.record(
+            match.view_name if match else 'unresolved',
+            response.status_code,
+            duration,
+            timings,
+            0 if response.streaming else len(response.content)
+        )
+
+        if settings.METRICS_SERVER_TIMING:
+            response['Server-Timing'] = (
+                'total;dur={:.2f}, db;dur={:.2f};desc="{} queries", '
+                'serialize;dur={:.2f}'.format(
+                    duration * 1000, timings.db_time * 1000,
+                    timings.db_queries, timings.serialize_time * 1000
+                )
+            )
+
+        return response
+
+
+class QueryInspectionMiddleware:
+    """Log the repeated and slow queries of each request
+
+    A statement run QUERY_REPEAT_THRESHOLD times or more by a request,
+    with any parameters, is logged as a probable N+1 pattern, and those
+    slower than SLOW_QUERY_MS are logged with where they were run from.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.QUERY_INSPECTION_ENABLED:
+            return self.get_response(request)
+
+        recorder = queries.QueryRecorder(slow_ms=settings.SLOW_QUERY_MS)
+        with recorder.record():
+            response = self.get_response(request)
+
+        for statement, count, origin in recorder.repeated(
+            settings.QUERY_REPEAT_THRESHOLD
+        ):
+            logger.warning(
+                'Repeated query in %s %s, %d times from %s: %s',
+                request.method, request.path, count, origin, statement
+            )
+        for statement, duration, origin in recorder.slow:
+            logger.warning(
+                'Slow query in %s %s, %.1fms from %s: %s',
+                request.method, request.path, duration, origin, statement
+            )
+
+        return response
@@ -0,0 +1,101 @@
+import os
+import re
+import sys
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+
+_IN_LIST = re.compile(r'\bIN \((?:%s, )*%s\)')
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_SPACES = re.compile(r'\s+')
+# Modules running the queries of others, left out of their origin
+_INSTRUMENTATION = {
+    os.path.join(os.path.dirname(__file__), name)
+    for name in ('metrics.py', 'middleware.py', 'queries.py', 'testing.py')
+}
+
+
+def fingerprint(sql):
+    """Return the statement with its values and IN lists collapsed
+
+    Statements that only differ by their parameters, like the query run
+    for each object of an N+1 pattern, have the same fingerprint.
+    """
+    sql = _IN_LIST.sub('IN (...)', sql)
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    return _SPACES.sub(' ', sql).strip()
+
+
+def find_origin(depth=3):
+    """Return the innermost project frames of the current stack"""
+    origins = []
+    frame = sys._getframe(1)
+    while frame is not None and len(origins) < depth:
+        filename = frame.f_code.co_filename
+        if filename.startswith(settings.BASE_DIR) and \
+                filename not in _INSTRUMENTATION and \
+                'site-packages' not in filename:
+            origins.append('{}:{} in {}'.format(
+                os.path.relpath(filename, settings.BASE_DIR),
+                frame.f_lineno,
+                frame.f_code.co_name
+            ))
+        frame = frame.f_back
+
+    return ' < '.join(origins) or 'unknown'
+
+
+class QueryRecorder:
+    """Execute wrapper recording the statements run on the connections
+
+    The stack is only inspected for statements run a second time and
+    for slow ones, so recording stays cheap.
+    """
+
+    def __init__(self, slow_ms=None):
+        self.slow_ms = slow_ms
+        self.counts = Counter()
+        self.origins = {}
+        self.slow = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = (time.perf_counter() - start) * 1000
+            statement = fingerprint(sql)
+            self.counts[statement] += 1
+            if self.counts[statement] == 2:
+                self.origins[statement] = find_origin()
+            if self.slow_ms is not None and duration >= self.slow_ms:
+                self.slow.append((statement, duration, find_origin()))
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+    def repeated(self, threshold):
+        """Return the statements run at least threshold times
+
+        Each is returned with its execution count and origin.
+        """
+        return [
+            (statement, count, self.origins.get(statement, 'unknown'))
+            for statement, count in self.counts.most_common()
+            if count >= threshold
+        ]
+
+    @contextmanager
+    def record(self):
+        """Record the statements run in the block on all connections"""
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(self))
+            yield self
@@ -0,0 +1,82 @@
+from contextlib import contextmanager
+
+from django.core.signals import request_finished, request_started
+
+from core.queries import QueryRecorder
+
+
+class QueryBudgetMixin:
+    """TestCase mixin failing tests whose requests exceed a query budget
+
+    Each request made during a test may run at most max_queries
+    statements when it is set, and any statement at most max_repeats
+    times, which catches queries run once per object of a list.
+    """
+    max_queries = None
+    max_repeats = 1
+
+    def _pre_setup(self):
+        # Django calls it before setUp, which test cases need not chain
+        super()._pre_setup()
+        self._request_recording = None
+        self._budget_errors = []
+        request_started.connect(self._start_request_recording)
+        request_finished.connect(self._finish_request_recording)
+        self.addCleanup(self._check_request_budgets)
+        self.addCleanup(request_started.disconnect,
+                        self._start_request_recording)
+        self.addCleanup(request_finished.disconnect,
+                        self._finish_request_recording)
+
+    def _budget_errors_of(self, recorder, max_queries, max_repeats):
+        """Return the ways the recorded statements exceed the budget"""
+        errors = []
+        if max_queries is not None and recorder.total > max_queries:
+            errors.append(
+                f'{recorder.total} queries run, the budget is {max_queries}'
+            )
+        if max_repeats is not None:
+            for statement, count, origin in recorder.repeated(
+                max_repeats + 1
+            ):
+                errors.append(
+                    f'{count} runs of the same query from {origin}, the '
+                    f'budget is {max_repeats}: {statement}'
+                )
+        return errors
+
+    def _start_request_recording(self, sender, environ=None, **kwargs):
+        recorder = QueryRecorder()
+        recording = recorder.record()
+        recording.__enter__()
+        path = environ.get('PATH_INFO') if environ else None
+        self._request_recording = (recorder, recording, path)
+
+    def _finish_request_recording(self, sender, **kwargs):
+        if self._request_recording is None:
+            return
+        recorder, recording, path = self._request_recording
+        self._request_recording = None
+        recording.__exit__(None, None, None)
+
+        self._budget_errors.extend(
+            f'{path}: {error}' for error in self._budget_errors_of(
+                recorder, self.max_queries, self.max_repeats
+            )
+        )
+
+    def _check_request_budgets(self):
+        if self._budget_errors:
+            self.fail('Query budget exceeded:\n' +
+                      '\n'.join(self._budget_errors))
+
+    @contextmanager
+    def assertQueryBudget(self, max_queries=None, max_repeats=None):
+        """Fail if the block exceeds the given budget"""
+        recorder = QueryRecorder()
+        with recorder.record():
+            yield recorder
+
+        errors = self._budget_errors_of(recorder, max_queries, max_repeats)
+        if errors:
+            self.fail('Query budget exceeded:\n' + '\n'.join(errors))
@@ -1,7 +1,11 @@
-from unittest.mock import patch
+from io import StringIO
+from unittest import skipUnless
+from unittest.mock import MagicMock, patch
 from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
 from django.db.utils import OperationalError
-from django.test import TestCase
+from django.test import LiveServerTestCase, TestCase
 
 
 class CommandTests(TestCase):
@@ -9,14 +13,91 @@ class CommandTests(TestCase):
     def test_wait_for_db_ready(self):
         """Test waiting for db when db is ready"""
         with patch('django.db.utils.ConnectionHandler.__getitem__') as gi:
-            gi.return_value = True
-            call_command('wait_for_db')
-            self.assertEqual(gi.call_count, 1)
+            call_command('wait_for_db', stdout=StringIO())
+
+            cursor = gi.return_value.cursor.return_value.__enter__
+            cursor.return_value.execute.assert_called_once_with('SELECT 1')
+            gi.return_value.close.assert_called_once_with()
 
     @patch('time.sleep', return_value=True)
     def test_wait_for_db(self, ts):
         """Test waiting for db"""
         with patch('django.db.utils.ConnectionHandler.__getitem__') as gi:
-            gi.side_effect = [OperationalError] * 5 + [True]
-            call_command('wait_for_db')
-            self.assertEqual(gi.call_count, 6)
+            gi.return_value.cursor.side_effect = \
+                [OperationalError] * 5 + [MagicMock()]
+            call_command('wait_for_db', stdout=StringIO())
+
+            self.assertEqual(gi.return_value.cursor.call_count, 6)
+            self.assertEqual(ts.call_count, 5)
+
+    @patch('random.uniform', side_effect=lambda low, high: high)
+    @patch('time.sleep', return_value=True)
+    def test_wait_for_db_backoff(self, ts, uniform):
+        """Test the waits double up to the maximum delay"""
+        with patch('django.db.utils.ConnectionHandler.__getitem__') as gi:
+            gi.return_value.cursor.side_effect = \
+                [OperationalError] * 5 + [MagicMock()]
+            call_command('wait_for_db', delay=1, max_delay=5,
+                         stdout=StringIO())
+
+            self.assertEqual([c[0][0] for c in ts.call_args_list],
+                             [1, 2, 4, 5, 5])
+
+    @patch('time.sleep', return_value=True)
+    def test_wait_for_db_timeout(self, ts):
+        """Test waiting fails once the timeout is reached"""
+        with patch('django.db.utils.ConnectionHandler.__getitem__') as gi:
+            gi.return_value.cursor.side_effect = OperationalError
+
+            with self.assertRaises(CommandError):
+                call_command('wait_for_db', timeout=0, stdout=StringIO())
+            ts.assert_not_called()
+
+    def test_wait_for_db_aliases(self):
+        """Test each of the given databases is checked"""
+        with patch('django.db.utils.ConnectionHandler.__getitem__') as gi:
+            call_command('wait_for_db', databases=['default', 'replica'],
+                         stdout=StringIO())
+
+            aliases = {args[0] for args, _ in gi.call_args_list}
+            self.assertEqual(aliases, {'default', 'replica'})
+
+    def test_benchmark_renderers(self):
+        """Test both renderers are timed on the same output"""
+        out = StringIO()
+        call_command('benchmark_renderers', recipes=10, repeat=1, stdout=out)
+
+        self.assertIn('JSONRenderer:', out.getvalue())
+        self.assertIn('FastJSONRenderer:', out.getvalue())
+        self.assertIn('speed-up:', out.getvalue())
+
+    def test_benchmark_compression(self):
+        """Test the compression of each installed codec is measured"""
+        out = StringIO()
+        call_command('benchmark_compression', recipes=10, repeat=1,
+                     stdout=out)
+
+        self.assertIn('identity:', out.getvalue())
+        self.assertIn('gzip 6:', out.getvalue())
+
+    @skipUnless(connection.vendor == 'postgresql', 'PostgreSQL backend only')
+    def test_benchmark_db_connections(self):
+        """Test each connection strategy is measured"""
+        out = StringIO()
+        call_command('benchmark_db_connections', requests=4, concurrency=2,
+                     stdout=out)
+
+        self.assertIn('new connection per request:', out.getvalue())
+        self.assertIn('pool:', out.getvalue())
+
+
+class LoadTestCommandTests(LiveServerTestCase):
+
+    def test_load_test(self):
+        """Test the requests to the live server are counted"""
+        out = StringIO()
+        call_command('load_test', f'{self.live_server_url}/api/recipe/tags/',
+                     requests=5, concurrency=2, stdout=out)
+
+        self.assertIn('5 requests, 5 failed', out.getvalue())
+        self.assertIn('requests/s', out.getvalue())
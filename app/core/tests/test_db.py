@@ -0,0 +1,121 @@
+from unittest import skipUnless
+from unittest.mock import MagicMock
+
+from django.db import connection, connections
+from django.db.utils import OperationalError
+from django.test import SimpleTestCase
+
+from core.db.pool import ConnectionPool
+
+
+def fake_connect():
+    return MagicMock()
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    """Test the pool hands out and reuses connections"""
+
+    def test_reuse_released_connection(self):
+        """Test a released connection is handed out again"""
+        pool = ConnectionPool(max_size=2, idle_timeout=60, timeout=1)
+        conn = pool.acquire(fake_connect)
+        pool.release(conn)
+
+        self.assertIs(pool.acquire(fake_connect), conn)
+        conn.close.assert_not_called()
+
+    def test_max_size(self):
+        """Test no more than max_size connections are handed out"""
+        pool = ConnectionPool(max_size=1, idle_timeout=60, timeout=0.01)
+        conn = pool.acquire(fake_connect)
+
+        with self.assertRaises(OperationalError):
+            pool.acquire(fake_connect)
+
+        pool.discard(conn)
+        conn.close.assert_called_once_with()
+        self.assertIsNotNone(pool.acquire(fake_connect))
+
+    def test_idle_timeout(self):
+        """Test connections idle for too long are closed"""
+        pool = ConnectionPool(max_size=2, idle_timeout=0, timeout=1)
+        conn = pool.acquire(fake_connect)
+        pool.release(conn)
+
+        self.assertIsNot(pool.acquire(fake_connect), conn)
+        conn.close.assert_called_once_with()
+
+    def test_pre_ping(self):
+        """Test idle connections failing the ping are replaced"""
+        ping = MagicMock(return_value=False)
+        pool = ConnectionPool(max_size=1, idle_timeout=60, timeout=1,
+                              ping=ping)
+        conn = pool.acquire(fake_connect)
+        pool.release(conn)
+
+        self.assertIsNot(pool.acquire(fake_connect), conn)
+        ping.assert_called_once_with(conn)
+        conn.close.assert_called_once_with()
+
+    def test_failed_connect_frees_slot(self):
+        """Test a connection error does not use up the pool"""
+        pool = ConnectionPool(max_size=1, idle_timeout=60, timeout=0.01)
+
+        with self.assertRaises(OperationalError):
+            pool.acquire(MagicMock(side_effect=OperationalError))
+
+        self.assertIsNotNone(pool.acquire(fake_connect))
+
+    def test_close_idle(self):
+        """Test the idle connections are closed"""
+        pool = ConnectionPool(max_size=2, idle_timeout=60, timeout=1)
+        conn = pool.acquire(fake_connect)
+        pool.release(conn)
+
+        pool.close_idle()
+
+        self.assertEqual(pool.idle_count, 0)
+        conn.close.assert_called_once_with()
+
+
+@skipUnless(connection.vendor == 'postgresql', 'PostgreSQL backend only')
+class PostgreSQLBackendTests(SimpleTestCase):
+    """Test the health checks and pool of the PostgreSQL backend"""
+
+    def get_wrapper(self, **settings):
+        wrapper = type(connections['default'])(
+            {**connection.settings_dict, **settings}, alias='backend_test'
+        )
+        self.addCleanup(wrapper.close)
+        return wrapper
+
+    def test_health_check(self):
+        """Test a broken persistent connection is replaced"""
+        wrapper = self.get_wrapper(CONN_MAX_AGE=60, CONN_HEALTH_CHECKS=True)
+        wrapper.ensure_connection()
+        broken = wrapper.connection
+        broken.close()
+
+        wrapper.close_if_unusable_or_obsolete()
+        with wrapper.cursor() as cursor:
+            cursor.execute('SELECT 1')
+
+        self.assertIsNot(wrapper.connection, broken)
+
+    def test_pool(self):
+        """Test the connection returns to the pool at the end of requests"""
+        wrapper = self.get_wrapper(POOL={
+            'ENABLED': True, 'MAX_SIZE': 1, 'IDLE_TIMEOUT': 60, 'TIMEOUT': 1,
+        })
+        wrapper.ensure_connection()
+        pooled = wrapper.connection
+
+        wrapper.close_if_unusable_or_obsolete()
+        self.assertIsNone(wrapper.connection)
+        self.assertFalse(pooled.closed)
+
+        wrapper.ensure_connection()
+        self.assertIs(wrapper.connection, pooled)
+        wrapper.close()
+        wrapper.pool.close_idle()
+        self.assertTrue(pooled.closed)
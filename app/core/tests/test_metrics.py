@@ -0,0 +1,119 @@
+from django.contrib.auth import get_user_model
+from django.shortcuts import reverse
+from django.test import TestCase, override_settings
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core import metrics
+from recipe.models import Recipe, Tag
+
+
+METRICS_URL = reverse('core:metrics')
+RECIPE_LIST_URL = reverse('recipe:recipe-list')
+
+
+@override_settings(METRICS_ENABLED=True, METRICS_SERVER_TIMING=True)
+class MetricsMiddlewareTests(TestCase):
+    """Test the requests are measured by view"""
+
+    def setUp(self):
+        metrics.reset()
+        self.user = get_user_model().objects.create_user(
+            'test@gotmail.com',
+            'testpass'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        recipe = Recipe.objects.create(
+            user=self.user, title='Curry', time_minutes=30, price=7
+        )
+        recipe.tags.add(Tag.objects.create(user=self.user, name='Vegan'))
+
+    def test_server_timing(self):
+        """Test the timings of the request are sent in a header"""
+        res = self.client.get(RECIPE_LIST_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertRegex(
+            res['Server-Timing'],
+            r'^total;dur=[\d.]+, db;dur=[\d.]+;desc="3 queries", '
+            r'serialize;dur=[\d.]+$'
+        )
+
+    def test_metrics_by_view(self):
+        """Test the requests are aggregated by view name"""
+        self.client.get(RECIPE_LIST_URL)
+        res = self.client.get(RECIPE_LIST_URL)
+        self.client.get('/api/unknown/')
+
+        data = metrics.snapshot()
+        recipe_list = data['recipe:recipe-list']
+        self.assertEqual(recipe_list['requests'], 2)
+        self.assertEqual(recipe_list['errors'], 0)
+        self.assertEqual(recipe_list['db_queries'], 6)
+        self.assertGreater(recipe_list['serialize_time_ms'], 0)
+        self.assertEqual(recipe_list['response_bytes'], 2 * len(res.content))
+        self.assertEqual(sum(recipe_list['histogram_ms'].values()), 2)
+        self.assertEqual(data['unresolved']['requests'], 1)
+
+    @override_settings(METRICS_SERVER_TIMING=False)
+    def test_server_timing_disabled(self):
+        """Test the header can be left out"""
+        res = self.client.get(RECIPE_LIST_URL)
+
+        self.assertFalse(res.has_header('Server-Timing'))
+        self.assertEqual(metrics.snapshot()['recipe:recipe-list']['requests'],
+                         1)
+
+    @override_settings(METRICS_ENABLED=False)
+    def test_metrics_disabled(self):
+        """Test nothing is measured when the metrics are disabled"""
+        res = self.client.get(RECIPE_LIST_URL)
+
+        self.assertFalse(res.has_header('Server-Timing'))
+        self.assertEqual(metrics.snapshot(), {})
+
+    def test_metrics_requires_staff(self):
+        """Test the metrics are only shown to staff users"""
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_metrics_endpoint(self):
+        """Test staff users can read the metrics"""
+        self.client.get(RECIPE_LIST_URL)
+        self.user.is_staff = True
+        self.user.save()
+
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['recipe:recipe-list']['requests'], 1)
+
+
+class MeasureSerializationTests(TestCase):
+    """Test the serialization time of the request is measured"""
+
+    def tearDown(self):
+        metrics.finish_request()
+
+    def test_nested_blocks_counted_once(self):
+        """Test a block inside another adds no time of its own"""
+        timings = metrics.start_request()
+        with metrics.measure_serialization():
+            with metrics.measure_serialization():
+                self.assertTrue(timings.serializing)
+            outer_only = timings.serialize_time
+
+        self.assertEqual(outer_only, 0)
+        self.assertGreater(timings.serialize_time, 0)
+        self.assertFalse(timings.serializing)
+
+    def test_outside_request(self):
+        """Test nothing is recorded outside of a request"""
+        with metrics.measure_serialization():
+            pass
+
+        self.assertIsNone(getattr(metrics._local, 'timings', None))
@@ -0,0 +1,138 @@
+import json
+from unittest import skipUnless
+
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from core import compression
+from core.middleware import CompressionMiddleware
+
+
+CONTENT = json.dumps(
+    [{'id': i, 'title': f'Recipe {i}'} for i in range(200)]
+).encode('utf-8')
+
+
+@override_settings(
+    COMPRESSION_MIN_SIZE=1024,
+    COMPRESSION_CODECS=['zstd', 'br', 'gzip'],
+)
+class CompressionMiddlewareTests(SimpleTestCase):
+    """Test the responses are compressed as the client accepts"""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.middleware = CompressionMiddleware()
+
+    def get_response(self, response, accept_encoding='gzip'):
+        request = self.factory.get(
+            '/api/recipe/recipes/', HTTP_ACCEPT_ENCODING=accept_encoding
+        )
+        return self.middleware.process_response(request, response)
+
+    def test_compress_json(self):
+        """Test a large JSON response is compressed with gzip"""
+        response = HttpResponse(CONTENT, content_type='application/json')
+        response['ETag'] = '"v1"'
+
+        res = self.get_response(response)
+
+        self.assertEqual(res['Content-Encoding'], 'gzip')
+        self.assertEqual(res['Content-Length'], str(len(res.content)))
+        self.assertEqual(res['Vary'], 'Accept-Encoding')
+        self.assertEqual(res['ETag'], 'W/"v1"')
+        self.assertEqual(compression.decompress('gzip', res.content), CONTENT)
+
+    def test_small_response_not_compressed(self):
+        """Test responses below the minimum size are sent as they are"""
+        response = HttpResponse(b'{"id":1}', content_type='application/json')
+
+        res = self.get_response(response)
+
+        self.assertFalse(res.has_header('Content-Encoding'))
+        self.assertEqual(res.content, b'{"id":1}')
+
+    def test_image_not_compressed(self):
+        """Test image responses are left alone"""
+        response = HttpResponse(CONTENT, content_type='image/jpeg')
+
+        res = self.get_response(response)
+
+        self.assertFalse(res.has_header('Content-Encoding'))
+        self.assertFalse(res.has_header('Vary'))
+        self.assertEqual(res.content, CONTENT)
+
+    def test_encoded_response_not_compressed(self):
+        """Test responses with a content encoding are left alone"""
+        response = HttpResponse(CONTENT, content_type='application/json')
+        response['Content-Encoding'] = 'identity'
+
+        res = self.get_response(response)
+
+        self.assertEqual(res['Content-Encoding'], 'identity')
+        self.assertEqual(res.content, CONTENT)
+
+    def test_not_accepted(self):
+        """Test responses are not compressed for clients without codecs"""
+        for accept_encoding in ['', 'identity', 'gzip;q=0', 'deflate']:
+            response = HttpResponse(CONTENT, content_type='application/json')
+
+            res = self.get_response(response, accept_encoding)
+
+            self.assertFalse(res.has_header('Content-Encoding'))
+            self.assertEqual(res['Vary'], 'Accept-Encoding')
+            self.assertEqual(res.content, CONTENT)
+
+    def test_streaming_response(self):
+        """Test streaming responses are compressed as a single stream"""
+        lines = [b'{"id":%d,"title":"Recipe"}\n' % i for i in range(1000)]
+        response = StreamingHttpResponse(
+            iter(lines), content_type='application/x-ndjson'
+        )
+        response['Content-Length'] = str(sum(map(len, lines)))
+
+        res = self.get_response(response)
+
+        self.assertEqual(res['Content-Encoding'], 'gzip')
+        self.assertFalse(res.has_header('Content-Length'))
+        content = b''.join(res.streaming_content)
+        self.assertEqual(
+            compression.decompress('gzip', content), b''.join(lines)
+        )
+
+    @skipUnless('zstd' in compression.CODECS, 'zstandard is not installed')
+    def test_preferred_codec(self):
+        """Test the preferred codec is used among equally accepted ones"""
+        response = HttpResponse(CONTENT, content_type='application/json')
+
+        res = self.get_response(response, 'gzip, br, zstd')
+
+        self.assertEqual(res['Content-Encoding'], 'zstd')
+        self.assertEqual(compression.decompress('zstd', res.content), CONTENT)
+
+
+class ChooseCodecTests(SimpleTestCase):
+    """Test negotiating the codec from Accept-Encoding"""
+
+    def test_quality_values(self):
+        """Test the codec with the highest quality is chosen"""
+        self.assertEqual(
+            compression.choose_codec(
+                'gzip;q=1.0, zstd;q=0.5', ['zstd', 'gzip']
+            ),
+            'gzip'
+        )
+        self.assertEqual(
+            compression.choose_codec('GZIP ; q=0.8', ['gzip']), 'gzip'
+        )
+
+    def test_wildcard(self):
+        """Test the wildcard accepts the codecs not listed"""
+        self.assertEqual(compression.choose_codec('*', ['gzip']), 'gzip')
+        self.assertIsNone(
+            compression.choose_codec('*, gzip;q=0', ['gzip'])
+        )
+
+    def test_invalid_quality(self):
+        """Test codings with an invalid quality are not accepted"""
+        self.assertIsNone(compression.choose_codec('gzip;q=x', ['gzip']))
@@ -0,0 +1,126 @@
+from django.contrib.auth import get_user_model
+from django.shortcuts import reverse
+from django.test import TestCase, override_settings
+
+from rest_framework.test import APIClient
+
+from core import queries
+from core.testing import QueryBudgetMixin
+
+
+RECIPE_LIST_URL = reverse('recipe:recipe-list')
+
+
+class FingerprintTests(TestCase):
+    """Test statements differing by their values have one fingerprint"""
+
+    def test_values_collapsed(self):
+        """Test the literals and IN lists are replaced"""
+        self.assertEqual(
+            queries.fingerprint(
+                "SELECT * FROM t WHERE a = 12 AND b = 'it''s'\n"
+                "AND c IN (%s, %s, %s) AND d = 1.5"
+            ),
+            'SELECT * FROM t WHERE a = ? AND b = ? AND c IN (...) AND d = ?'
+        )
+        self.assertEqual(
+            queries.fingerprint('SELECT * FROM t WHERE c IN (%s)'),
+            queries.fingerprint('SELECT * FROM t WHERE c IN (%s, %s)')
+        )
+
+
+class QueryRecorderTests(TestCase):
+    """Test the statements run are recorded"""
+
+    def test_repeated_queries(self):
+        """Test a query run for each object is reported with its origin"""
+        users = [
+            get_user_model().objects.create_user(f'user{i}@gotmail.com', 'x')
+            for i in range(3)
+        ]
+
+        with queries.QueryRecorder().record() as recorder:
+            for user in users:
+                get_user_model().objects.get(pk=user.pk)
+            get_user_model().objects.count()
+
+        self.assertEqual(recorder.total, 4)
+        (statement, count, origin), = recorder.repeated(2)
+        self.assertIn('WHERE "core_user"."id" = %s', statement)
+        self.assertEqual(count, 3)
+        self.assertIn('core/tests/test_queries.py', origin)
+        self.assertIn('in test_repeated_queries', origin)
+
+    def test_slow_queries(self):
+        """Test the queries above the threshold are reported"""
+        with queries.QueryRecorder(slow_ms=0).record() as recorder:
+            get_user_model().objects.count()
+
+        (statement, duration, origin), = recorder.slow
+        self.assertIn('COUNT(*)', statement)
+        self.assertGreaterEqual(duration, 0)
+
+
+@override_settings(
+    QUERY_INSPECTION_ENABLED=True, QUERY_REPEAT_THRESHOLD=2, SLOW_QUERY_MS=0
+)
+class QueryInspectionMiddlewareTests(TestCase):
+    """Test the repeated and slow queries of requests are logged"""
+
+    def test_slow_queries_logged(self):
+        """Test the slow queries of a request are logged"""
+        client = APIClient()
+        client.force_authenticate(
+            get_user_model().objects.create_user('a@gotmail.com', 'x')
+        )
+
+        with self.assertLogs('core.middleware', 'WARNING') as logs:
+            client.get(RECIPE_LIST_URL)
+
+        self.assertIn(
+            f'Slow query in GET {RECIPE_LIST_URL}', logs.output[0]
+        )
+        self.assertIn('recipe/views.py', logs.output[0])
+
+
+class QueryBudgetMixinTests(QueryBudgetMixin, TestCase):
+    """Test the budgets fail the tests exceeding them"""
+
+    def test_budget_exceeded(self):
+        """Test a block running a query too often fails"""
+        with self.assertRaisesRegex(AssertionError, '2 runs of the same'):
+            with self.assertQueryBudget(max_repeats=1):
+                get_user_model().objects.filter(pk=1).exists()
+                get_user_model().objects.filter(pk=2).exists()
+
+    def test_total_budget(self):
+        """Test a block running too many queries fails"""
+        with self.assertRaisesRegex(AssertionError, '2 queries run'):
+            with self.assertQueryBudget(max_queries=1):
+                get_user_model().objects.count()
+                get_user_model().objects.exists()
+
+    def test_within_budget(self):
+        """Test a block within its budget passes"""
+        with self.assertQueryBudget(max_queries=1, max_repeats=1) as rec:
+            get_user_model().objects.count()
+
+        self.assertEqual(rec.total, 1)
+
+    def test_request_budget(self):
+        """Test the statements of requests are checked after the test"""
+        client = APIClient()
+        client.force_authenticate(
+            get_user_model().objects.create_user('a@gotmail.com', 'x')
+        )
+        client.get(RECIPE_LIST_URL)
+        self.assertEqual(self._budget_errors, [])
+
+        self.max_queries = 0
+        client.get(RECIPE_LIST_URL)
+
+        self.assertEqual(len(self._budget_errors), 1)
+        self.assertIn(f'{RECIPE_LIST_URL}: 1 queries run',
+                      self._budget_errors[0])
+        # The test passes once the expected error is cleared
+        self._budget_errors.clear()
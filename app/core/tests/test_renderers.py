@@ -0,0 +1,110 @@
+import datetime
+import uuid
+from decimal import Decimal
+from io import BytesIO
+from unittest import skipUnless
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from core import parsers, renderers
+
+
+SAMPLE_DATA = {
+    'id': 1,
+    'price': Decimal('12.50'),
+    'prices': [Decimal('0.10'), '5.00'],
+    'image': f'http://testserver/media/uploads/recipe/{uuid.uuid4()}.jpg',
+    'uuid': uuid.uuid4(),
+    'created': datetime.datetime(2020, 9, 22, 23, 31, 5, 123456,
+                                 tzinfo=timezone.utc),
+    'naive': datetime.datetime(2020, 9, 22, 23, 31),
+    'date': datetime.date(2020, 9, 22),
+    'time': datetime.time(23, 31, 5, 250000),
+    'duration': datetime.timedelta(minutes=30),
+    'lazy': gettext_lazy('Invalid cursor'),
+    'text': 'Crème brûlée \u2028\u2029 "quoted" </script>',
+    'nested': [{'tags': (1, 2), 'empty': None, 'ok': True}],
+    3: 'integer key',
+}
+
+
+class FastJSONRendererTests(SimpleTestCase):
+    """Test the fast renderer output is the same as JSONRenderer"""
+
+    @skipUnless(renderers.orjson, 'orjson is not installed')
+    def test_same_output_as_json_renderer(self):
+        """Test the special values are rendered like JSONRenderer"""
+        self.assertEqual(
+            renderers.FastJSONRenderer().render(SAMPLE_DATA),
+            JSONRenderer().render(SAMPLE_DATA)
+        )
+
+    def test_indented_output(self):
+        """Test pretty printed output is rendered like JSONRenderer"""
+        media_type = 'application/json; indent=4'
+
+        self.assertEqual(
+            renderers.FastJSONRenderer().render(SAMPLE_DATA, media_type),
+            JSONRenderer().render(SAMPLE_DATA, media_type)
+        )
+
+    @skipUnless(renderers.orjson, 'orjson is not installed')
+    def test_unsupported_values_fall_back(self):
+        """Test values orjson cannot encode are rendered by JSONRenderer"""
+        data = {'big': 2 ** 70}
+
+        self.assertEqual(
+            renderers.FastJSONRenderer().render(data),
+            JSONRenderer().render(data)
+        )
+
+    def test_without_orjson(self):
+        """Test the renderer works when orjson is not installed"""
+        with patch.object(renderers, 'orjson', None):
+            self.assertEqual(
+                renderers.FastJSONRenderer().render(SAMPLE_DATA),
+                JSONRenderer().render(SAMPLE_DATA)
+            )
+
+
+class FastJSONParserTests(SimpleTestCase):
+    """Test the fast parser accepts and refuses like JSONParser"""
+
+    def parse(self, parser, body):
+        return parser.parse(BytesIO(body))
+
+    @skipUnless(renderers.orjson, 'orjson is not installed')
+    def test_same_data_as_json_parser(self):
+        """Test the parsed data is the same as JSONParser"""
+        body = '{"title": "Crème", "price": "5.00", "tags": [1, 2], ' \
+            '"time_minutes": 5.5, "link": null}'.encode('utf-8')
+
+        self.assertEqual(
+            self.parse(parsers.FastJSONParser(), body),
+            self.parse(JSONParser(), body)
+        )
+
+    @skipUnless(renderers.orjson, 'orjson is not installed')
+    def test_invalid_json(self):
+        """Test invalid bodies raise the same parse errors"""
+        for body in [b'{"title": ', b'NaN', b'']:
+            with self.assertRaises(ParseError) as default:
+                self.parse(JSONParser(), body)
+            with self.assertRaises(ParseError) as fast:
+                self.parse(parsers.FastJSONParser(), body)
+
+            self.assertEqual(fast.exception.detail, default.exception.detail)
+
+    def test_without_orjson(self):
+        """Test the parser works when orjson is not installed"""
+        with patch.object(parsers, 'orjson', None):
+            self.assertEqual(
+                self.parse(parsers.FastJSONParser(), b'{"id": 1}'),
+                {'id': 1}
+            )
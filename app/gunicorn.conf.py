@@ -0,0 +1,41 @@
+"""
+Gunicorn configuration of the production server.
+
+Run it from the app directory with:
+
+    gunicorn -c gunicorn.conf.py app.wsgi
+
+Every setting can be changed with the GUNICORN_* environment variables.
+"""
+
+import multiprocessing
+import os
+
+
+def available_cores():
+    """Return the number of cores the process may run on"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return multiprocessing.cpu_count()
+
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+
+# Threads let a worker serve other requests while one waits on the
+# database, so fewer processes are needed than the usual 2 * cores + 1
+workers = int(os.environ.get('GUNICORN_WORKERS', available_cores() + 1))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+# Restart each worker after a number of requests, with jitter so they
+# are not all restarted at once, to limit memory growth
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+accesslog = '-'
+errorlog = '-'
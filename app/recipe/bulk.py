@@ -0,0 +1,164 @@
+from collections import Counter
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.dispatch import Signal
+
+from recipe.counters import recipe_counts
+from recipe.models import Recipe
+
+
+# Sent after recipes, their relations or the tags and ingredients they
+# use are written in bulk, which does not send the model signals. The
+# recipe counts are the change of the count of each related object by
+# model and id.
+recipes_bulk_changed = Signal(
+    providing_args=['user_ids', 'recipe_ids', 'recipe_counts']
+)
+
+RELATIONS = (
+    ('ingredients', 'ingredient_id'),
+    ('tags', 'tag_id'),
+)
+
+
+def _split_relations(items):
+    """Return the recipe fields and the related objects of each item"""
+    fields = []
+    relations = []
+    for item in items:
+        item = dict(item)
+        relations.append({
+            name: item.pop(name) for name, _ in RELATIONS if name in item
+        })
+        fields.append(item)
+
+    return fields, relations
+
+
+def _insert_relations(recipes, relations, batch_size, counts):
+    """Insert the through rows of the recipe relations in batches
+
+    Each related object inserted is counted in counts, by model.
+    """
+    for name, column in RELATIONS:
+        field = getattr(Recipe, name)
+        model_counts = counts.setdefault(field.field.related_model, Counter())
+        rows = []
+        for recipe, related in zip(recipes, relations):
+            related_ids = list(dict.fromkeys(
+                obj.pk for obj in related.get(name, [])
+            ))
+            model_counts.update(related_ids)
+            rows.extend(
+                field.through(recipe_id=recipe.pk, **{column: related_id})
+                for related_id in related_ids
+            )
+        field.through.objects.bulk_create(rows, batch_size)
+
+
+def _send_bulk_changed(recipes, counts):
+    recipes_bulk_changed.send(
+        sender=Recipe,
+        user_ids={recipe.user_id for recipe in recipes},
+        recipe_ids=[recipe.pk for recipe in recipes],
+        recipe_counts={
+            model: {pk: count for pk, count in model_counts.items() if count}
+            for model, model_counts in counts.items()
+        },
+    )
+
+
+def bulk_create_recipes(items, batch_size=None):
+    """Create the recipes and their relations with batched inserts
+
+    The items are validated recipe data including the user. Databases
+    that cannot return the ids of bulk inserted rows get one insert per
+    recipe, the relations are still inserted in batches.
+    """
+    batch_size = batch_size or settings.RECIPE_BULK_BATCH_SIZE
+    fields, relations = _split_relations(items)
+    recipes = [Recipe(**recipe_fields) for recipe_fields in fields]
+
+    if connection.features.can_return_ids_from_bulk_insert:
+        Recipe.objects.bulk_create(recipes, batch_size)
+    else:
+        for recipe in recipes:
+            recipe.save()
+
+    counts = {}
+    _insert_relations(recipes, relations, batch_size, counts)
+    _send_bulk_changed(recipes, counts)
+
+    return recipes
+
+
+def bulk_update_recipes(recipes, items, batch_size=None):
+    """Update the recipes and replace the relations given in the items
+
+    Relations missing from an item are left untouched, the ones given
+    are replaced with one delete and batched inserts for all recipes.
+    """
+    batch_size = batch_size or settings.RECIPE_BULK_BATCH_SIZE
+    fields, relations = _split_relations(items)
+
+    for recipe, recipe_fields in zip(recipes, fields):
+        for attr, value in recipe_fields.items():
+            setattr(recipe, attr, value)
+        if recipe_fields:
+            recipe.save(update_fields=list(recipe_fields))
+
+    counts = {}
+    for name, _ in RELATIONS:
+        field = getattr(Recipe, name)
+        replaced = [
+            recipe.pk for recipe, related in zip(recipes, relations)
+            if name in related
+        ]
+        counts[field.field.related_model] = Counter()
+        counts[field.field.related_model].subtract(
+            recipe_counts(field.field.related_model, replaced)
+        )
+        field.through.objects.filter(recipe_id__in=replaced).delete()
+
+    _insert_relations(recipes, relations, batch_size, counts)
+    _send_bulk_changed(recipes, counts)
+
+    return recipes
+
+
+def bulk_ensure_named(model, user, names, batch_size=None):
+    """Return the user objects with the names, creating the missing ones
+
+    Existing objects are found with one query and the missing ones are
+    inserted in one batch. If a concurrent request creates some of them
+    first, each missing name falls back to get_or_create.
+    """
+    batch_size = batch_size or settings.RECIPE_BULK_BATCH_SIZE
+    names = list(dict.fromkeys(names))
+    found = {
+        obj.name: obj
+        for obj in model.objects.filter(user=user, name__in=names)
+    }
+    missing = [name for name in names if name not in found]
+
+    if missing:
+        try:
+            with transaction.atomic():
+                model.objects.bulk_create(
+                    [model(user=user, name=name) for name in missing],
+                    batch_size
+                )
+        except IntegrityError:
+            for name in missing:
+                model.objects.get_or_create(user=user, name=name)
+
+        found.update({
+            obj.name: obj
+            for obj in model.objects.filter(user=user, name__in=missing)
+        })
+        recipes_bulk_changed.send(
+            sender=model, user_ids={user.id}, recipe_ids=[], recipe_counts={}
+        )
+
+    return [found[name] for name in names]
@@ -0,0 +1,93 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def _version_key(user_id):
+    return f'recipe:version:{user_id}'
+
+
+def get_user_version(user_id):
+    """Return the version of the recipe data of the user
+
+    A missing version starts from the current time, so it is still newer
+    than any version evicted from the cache.
+    """
+    key = _version_key(user_id)
+    version = cache.get(key)
+
+    if version is None:
+        cache.add(key, int(time.time() * 1000), None)
+        version = cache.get(key)
+
+    return version
+
+
+def _increment_user_version(user_id):
+    try:
+        cache.incr(_version_key(user_id))
+    except ValueError:
+        get_user_version(user_id)
+
+
+def bump_user_version(user_id):
+    """Invalidate the cached responses of the user
+
+    The version is bumped right away and again on commit, so a response
+    computed from the data before the commit is not kept.
+    """
+    _increment_user_version(user_id)
+    transaction.on_commit(lambda: _increment_user_version(user_id))
+
+
+class CachedListMixin:
+    """Cache the list responses of each user until their data changes
+
+    Responses are keyed by user, path, query parameters and the version
+    of the user data, and carry an ETag so unchanged lists are answered
+    with 304 Not Modified.
+    """
+
+    def get_list_cache_key(self, request):
+        """Return the cache key and ETag of the list request"""
+        version = get_user_version(request.user.id)
+        params = sorted(request.query_params.lists())
+        digest = hashlib.md5(
+            f'{request.path}?{params}'.encode('utf-8')
+        ).hexdigest()
+
+        key = f'recipe:response:{request.user.id}:{version}:{digest}'
+        return key, quote_etag(f'{version}-{digest}')
+
+    def list(self, request, *args, **kwargs):
+        key, etag = self.get_list_cache_key(request)
+
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match:
+            # Compared weakly, as compressed responses have weak ETags
+            etags = [
+                value[2:] if value.startswith('W/') else value
+                for value in parse_etags(if_none_match)
+            ]
+            if '*' in etags or etag in etags:
+                return Response(
+                    status=status.HTTP_304_NOT_MODIFIED,
+                    headers={'ETag': etag}
+                )
+
+        data = cache.get(key)
+        if data is None:
+            response = super().list(request, *args, **kwargs)
+            cache.set(key, response.data, settings.RECIPE_LIST_CACHE_TTL)
+        else:
+            response = Response(data)
+
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
@@ -0,0 +1,57 @@
+from collections import defaultdict
+
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def _through(model):
+    """Return the recipe relation table of the model and its column"""
+    relation = model._meta.get_field('recipes')
+    return relation.through, relation.field.m2m_reverse_field_name()
+
+
+def counted_recipes(model):
+    """Return an expression counting the recipes using each object"""
+    through, column = _through(model)
+    return Coalesce(Subquery(
+        through.objects.filter(
+            **{column: OuterRef('pk')}
+        ).order_by().values(column).annotate(
+            count=Count('*')
+        ).values('count'),
+        output_field=IntegerField()
+    ), 0)
+
+
+def recount_recipes(objects):
+    """Recompute the recipe counts of the objects
+
+    Only the wrong counts are written, their number is returned.
+    """
+    actual = counted_recipes(objects.model)
+    return objects.exclude(recipe_count=actual).update(recipe_count=actual)
+
+
+def recipe_counts(model, recipe_ids):
+    """Return how many of the recipes use each object, by id"""
+    through, column = _through(model)
+    return dict(through.objects.filter(
+        recipe_id__in=recipe_ids
+    ).order_by().values(column).annotate(
+        count=Count('*')
+    ).values_list(column, 'count'))
+
+
+def add_recipe_counts(model, counts, sign=1):
+    """Add the numbers of recipes to the counts of the objects by id
+
+    The objects changing by the same number are updated at once.
+    """
+    ids_by_count = defaultdict(list)
+    for pk, count in counts.items():
+        ids_by_count[count].append(pk)
+
+    for count, ids in ids_by_count.items():
+        model.objects.filter(pk__in=ids).update(
+            recipe_count=F('recipe_count') + sign * count
+        )
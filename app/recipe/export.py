@@ -0,0 +1,89 @@
+import csv
+import json
+from itertools import islice
+
+from recipe.models import Recipe
+
+
+CHUNK_SIZE = 1000
+FIELDS = ['id', 'title', 'time_minutes', 'price', 'link']
+CSV_HEADER = FIELDS + ['tags', 'ingredients']
+CSV_SEPARATOR = '|'
+
+
+def iter_chunks(iterable, size):
+    """Yield lists of up to size items from the iterable"""
+    iterator = iter(iterable)
+    chunk = list(islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))
+
+
+def _related_map(relation, recipe_ids):
+    """Return the related objects of each recipe, as id and name dicts"""
+    through = getattr(Recipe, relation).through
+    column = through._meta.get_field(relation[:-1]).name
+    related = {}
+    for recipe_id, pk, name in through.objects.filter(
+        recipe_id__in=recipe_ids
+    ).order_by(f'{column}__name').values_list(
+        'recipe_id', f'{column}__id', f'{column}__name'
+    ):
+        related.setdefault(recipe_id, []).append({'id': pk, 'name': name})
+
+    return related
+
+
+def iter_recipes(queryset, chunk_size=CHUNK_SIZE):
+    """Yield the recipes with their tags and ingredients as dicts
+
+    Recipes are read through a server-side cursor and their relations
+    are loaded for a chunk of recipes at a time, so memory use depends
+    on the chunk size only.
+    """
+    rows = queryset.order_by('id').values(*FIELDS).iterator(
+        chunk_size=chunk_size
+    )
+    for chunk in iter_chunks(rows, chunk_size):
+        recipe_ids = [row['id'] for row in chunk]
+        tags = _related_map('tags', recipe_ids)
+        ingredients = _related_map('ingredients', recipe_ids)
+
+        for row in chunk:
+            row['price'] = '{:.2f}'.format(row['price'])
+            row['tags'] = tags.get(row['id'], [])
+            row['ingredients'] = ingredients.get(row['id'], [])
+            yield row
+
+
+def iter_ndjson(recipes):
+    """Yield a JSON line for each recipe"""
+    for recipe in recipes:
+        yield json.dumps(recipe, separators=(',', ':')) + '\n'
+
+
+class _Echo:
+    """File-like object returning what is written to it"""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(recipes):
+    """Yield a CSV line for each recipe, with the relation names joined"""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(CSV_HEADER)
+    for recipe in recipes:
+        yield writer.writerow([recipe[field] for field in FIELDS] + [
+            CSV_SEPARATOR.join(item['name'] for item in recipe['tags']),
+            CSV_SEPARATOR.join(
+                item['name'] for item in recipe['ingredients']
+            ),
+        ])
+
+
+FORMATS = {
+    'ndjson': (iter_ndjson, 'application/x-ndjson'),
+    'csv': (iter_csv, 'text/csv'),
+}
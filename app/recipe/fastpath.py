@@ -0,0 +1,100 @@
+from decimal import Decimal
+
+from core import metrics
+from recipe import images
+from recipe.models import Recipe
+
+
+PRICE_QUANTUM = Decimal('0.01')
+
+# Fields of RecipeSerializer in their order, with the columns they read
+FIELD_COLUMNS = {
+    'id': ['id'],
+    'title': ['title'],
+    'time_minutes': ['time_minutes'],
+    'price': ['price'],
+    'ingredients': [],
+    'tags': [],
+    'link': ['link'],
+    'image_status': ['image_status'],
+    'images': ['image', 'image_status'],
+}
+RELATIONS = ('ingredients', 'tags')
+
+
+def get_columns(fields, extra=()):
+    """Return the columns to select for the fields, in a stable order"""
+    columns = ['id']
+    for name in [*(column for field in fields for column in
+                   FIELD_COLUMNS[field]), *extra]:
+        if name not in columns:
+            columns.append(name)
+
+    return columns
+
+
+def _related_ids(relation, recipe_ids):
+    """Return the related ids of each recipe, ordered by id"""
+    through = getattr(Recipe, relation).through
+    column = f'{relation[:-1]}_id'
+    related = {}
+    for recipe_id, related_id in through.objects.filter(
+        recipe_id__in=recipe_ids
+    ).order_by(column).values_list('recipe_id', column):
+        related.setdefault(recipe_id, []).append(related_id)
+
+    return related
+
+
+def _related_objects(relation, recipe_ids):
+    """Return the related ids and names of each recipe, ordered by id"""
+    through = getattr(Recipe, relation).through
+    field = relation[:-1]
+    related = {}
+    for recipe_id, related_id, name in through.objects.filter(
+        recipe_id__in=recipe_ids
+    ).order_by(f'{field}_id').values_list(
+        'recipe_id', f'{field}_id', f'{field}__name'
+    ):
+        related.setdefault(recipe_id, []).append(
+            {'id': related_id, 'name': name}
+        )
+
+    return related
+
+
+def represent_recipes(rows, fields, request=None, nested=False):
+    """Return the representation of the recipe rows as the serializers do
+
+    The rows are dicts with the columns of the fields, the relations are
+    loaded for all the rows with one query each. Relations are lists of
+    ids like in RecipeSerializer, or of id and name dicts like in
+    RecipeDetailSerializer when nested.
+    """
+    recipe_ids = [row['id'] for row in rows]
+    load_related = _related_objects if nested else _related_ids
+    related = {
+        relation: load_related(relation, recipe_ids)
+        for relation in RELATIONS if relation in fields and recipe_ids
+    }
+
+    results = []
+    with metrics.measure_serialization():
+        for row in rows:
+            data = {}
+            for field in fields:
+                if field in related:
+                    data[field] = related[field].get(row['id'], [])
+                elif field == 'price':
+                    data[field] = '{:f}'.format(
+                        row['price'].quantize(PRICE_QUANTUM)
+                    )
+                elif field == 'images':
+                    data[field] = images.image_urls(
+                        row['image'], row['image_status'], request
+                    )
+                else:
+                    data[field] = row[field]
+            results.append(data)
+
+    return results
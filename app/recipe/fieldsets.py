@@ -0,0 +1,100 @@
+from rest_framework.exceptions import ValidationError
+
+
+class SparseFieldsetMixin:
+    """Send only the fields requested with the fields or exclude parameters
+
+    The serializer drops the other fields and the queryset loads only the
+    columns and prefetches the relations the remaining fields read. Fields
+    that are not read from a single model field, like method fields, name
+    the model fields they need in field_sources.
+    """
+    fields_query_param = 'fields'
+    exclude_query_param = 'exclude'
+    sparse_actions = ('list', 'retrieve')
+    field_sources = {}
+
+    def _get_param_fields(self, param):
+        value = self.request.query_params.get(param)
+        if value is None:
+            return None
+        return [name.strip() for name in value.split(',') if name.strip()]
+
+    def get_requested_fields(self):
+        """Return the names of the fields to send, None to send them all"""
+        if self.action not in self.sparse_actions:
+            return None
+        if hasattr(self, '_requested_fields'):
+            return self._requested_fields
+
+        fields = self._get_param_fields(self.fields_query_param)
+        exclude = self._get_param_fields(self.exclude_query_param)
+        requested = None
+
+        if fields is not None or exclude is not None:
+            available = list(self.get_serializer_class()().fields)
+            for param, names in [(self.fields_query_param, fields),
+                                 (self.exclude_query_param, exclude)]:
+                unknown = set(names or []) - set(available)
+                if unknown:
+                    raise ValidationError({param: [
+                        f'Unknown fields: {", ".join(sorted(unknown))}'
+                    ]})
+
+            requested = [
+                name for name in available
+                if (fields is None or name in fields) and
+                name not in (exclude or [])
+            ]
+
+        self._requested_fields = requested
+        return requested
+
+    def _get_field_sources(self, fields):
+        """Return the model fields the serializer fields read, if known"""
+        serializer_fields = self.get_serializer_class()().fields
+        sources = []
+        for name in fields:
+            if name in self.field_sources:
+                sources.extend(self.field_sources[name])
+            elif '.' in serializer_fields[name].source or \
+                    serializer_fields[name].source == '*':
+                return None
+            else:
+                sources.append(serializer_fields[name].source)
+
+        return sources
+
+    def get_requested_relations(self, relations):
+        """Return which of the many to many relations are sent"""
+        fields = self.get_requested_fields()
+        sources = None if fields is None else self._get_field_sources(fields)
+        if sources is None:
+            return list(relations)
+
+        return [relation for relation in relations if relation in sources]
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self.get_requested_fields()
+        if fields is not None:
+            kwargs.setdefault('fields', fields)
+        return super().get_serializer(*args, **kwargs)
+
+    def filter_queryset(self, queryset):
+        """Load only the columns the requested fields and ordering read"""
+        queryset = super().filter_queryset(queryset)
+        fields = self.get_requested_fields()
+        sources = None if fields is None else self._get_field_sources(fields)
+        if sources is None:
+            return queryset
+
+        columns = {
+            field.name for field in queryset.model._meta.concrete_fields
+        }
+        ordering = [
+            name.lstrip('-') for name in self.paginator.get_ordering(self)
+        ] if self.paginator is not None else []
+
+        return queryset.only(*(
+            name for name in ['id', *sources, *ordering] if name in columns
+        ))
@@ -0,0 +1,178 @@
+import logging
+import os
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from PIL import Image
+
+from recipe.models import Recipe
+
+
+logger = logging.getLogger(__name__)
+
+VARIANTS = {
+    'thumbnail': {'size': (150, 150), 'format': 'JPEG', 'ext': 'jpg'},
+    'medium': {'size': (600, 600), 'format': 'JPEG', 'ext': 'jpg'},
+    'webp': {'size': (1200, 1200), 'format': 'WEBP', 'ext': 'webp'},
+}
+QUALITY = 85
+
+EXIF_ORIENTATION = 0x0112
+# Transposition turning upright an image of each EXIF orientation
+ORIENTATIONS = {
+    2: Image.FLIP_LEFT_RIGHT,
+    3: Image.ROTATE_180,
+    4: Image.FLIP_TOP_BOTTOM,
+    5: Image.TRANSPOSE,
+    6: Image.ROTATE_270,
+    7: Image.TRANSVERSE,
+    8: Image.ROTATE_90,
+}
+# Errors of Pillow decoding a corrupt or unsupported image
+DECODE_ERRORS = (
+    OSError, ValueError, SyntaxError, struct.error,
+    Image.DecompressionBombError,
+)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def variant_name(name, variant):
+    """Return the storage name of a variant of the image"""
+    root, _ = os.path.splitext(name)
+    return f'{root}_{variant}.{VARIANTS[variant]["ext"]}'
+
+
+def image_urls(name, image_status, request=None):
+    """Return the urls of the image and of its variants once ready
+
+    The urls are absolute when the request is given.
+    """
+    if not name:
+        return None
+
+    urls = {'original': default_storage.url(name)}
+    for variant in VARIANTS:
+        urls[variant] = default_storage.url(variant_name(name, variant)) \
+            if image_status == Recipe.IMAGE_READY else None
+
+    if request is not None:
+        urls = {
+            variant: url and request.build_absolute_uri(url)
+            for variant, url in urls.items()
+        }
+
+    return urls
+
+
+def delete_variants(name):
+    """Delete the stored variants of the image"""
+    for variant in VARIANTS:
+        default_storage.delete(variant_name(name, variant))
+
+
+def apply_orientation(image):
+    """Return the image turned upright as its EXIF orientation says
+
+    Phone cameras store the pixels as captured and the rotation in the
+    EXIF data, which the variants do not keep.
+    """
+    # Pillow before 6.0 only reads the EXIF data of JPEG images, with
+    # the private _getexif
+    getexif = getattr(image, '_getexif', None)
+    exif = getexif() if getexif is not None else None
+    orientation = exif.get(EXIF_ORIENTATION) if exif else None
+    if orientation in ORIENTATIONS:
+        return image.transpose(ORIENTATIONS[orientation])
+    return image
+
+
+def create_variants(name):
+    """Resize and re-encode the image into each of the variants"""
+    with default_storage.open(name) as image_file:
+        image = Image.open(image_file)
+        image.load()
+
+    image = apply_orientation(image)
+    if image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+
+    for variant, options in VARIANTS.items():
+        resized = image.copy()
+        resized.thumbnail(options['size'], Image.LANCZOS)
+        content = BytesIO()
+        resized.save(content, options['format'], quality=QUALITY)
+
+        path = variant_name(name, variant)
+        default_storage.delete(path)
+        default_storage.save(path, ContentFile(content.getvalue()))
+
+
+def process_recipe_image(recipe_id):
+    """Create the variants of the recipe image and update its status"""
+    recipe = Recipe.objects.filter(id=recipe_id).only('image').first()
+    if recipe is None or not recipe.image:
+        return
+
+    try:
+        create_variants(recipe.image.name)
+        image_status = Recipe.IMAGE_READY
+    except DECODE_ERRORS:
+        logger.exception('Failed to process image of recipe %s', recipe_id)
+        image_status = Recipe.IMAGE_FAILED
+
+    # The image may have been replaced while it was being processed
+    Recipe.objects.filter(id=recipe_id, image=recipe.image.name).update(
+        image_status=image_status
+    )
+
+
+def _process_in_worker(recipe_id):
+    """Process the image, marking it failed on any error
+
+    The future of the job is not kept, so an error left uncaught would
+    be lost and the image would stay pending.
+    """
+    try:
+        process_recipe_image(recipe_id)
+    except Exception:
+        logger.exception('Failed to process image of recipe %s', recipe_id)
+        Recipe.objects.filter(
+            id=recipe_id, image_status=Recipe.IMAGE_PENDING
+        ).update(image_status=Recipe.IMAGE_FAILED)
+    finally:
+        connection.close()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.RECIPE_IMAGE_WORKERS,
+                thread_name_prefix='recipe-image'
+            )
+    return _executor
+
+
+def schedule_image_processing(recipe):
+    """Process the recipe image in the worker pool once it is committed
+
+    Resizing and encoding run in Pillow without holding the GIL, so a
+    thread pool keeps the work off the request. With no workers set up
+    the image is processed right away.
+    """
+    if not settings.RECIPE_IMAGE_WORKERS:
+        process_recipe_image(recipe.id)
+        return
+
+    transaction.on_commit(
+        lambda: _get_executor().submit(_process_in_worker, recipe.id)
+    )
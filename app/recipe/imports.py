@@ -0,0 +1,160 @@
+import csv
+import json
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+
+from recipe import bulk, models
+from recipe.export import CSV_SEPARATOR, iter_chunks
+from recipe.serializers import RecipeImportSerializer
+
+
+RELATIONS = (
+    ('ingredients', models.Ingredient),
+    ('tags', models.Tag),
+)
+
+
+ENCODING = 'utf-8-sig'
+
+
+def _invalid_row(message):
+    return ValidationError({'non_field_errors': [message]})
+
+
+def _decode(lines, invalid):
+    """Yield the lines of a binary file as text
+
+    Lines that are not valid UTF-8 are decoded with replacement
+    characters and their numbers added to invalid, so the rows they
+    belong to can be reported.
+    """
+    for number, line in enumerate(lines, 1):
+        try:
+            yield line.decode(ENCODING)
+        except UnicodeDecodeError:
+            invalid.append(number)
+            yield line.decode(ENCODING, errors='replace')
+
+
+def parse_ndjson(lines):
+    """Yield the recipe of each non blank line of an NDJSON file
+
+    Lines that are not valid UTF-8 or JSON are yielded as validation
+    errors, so they are reported with the other invalid rows.
+    """
+    for line in lines:
+        try:
+            line = line.decode(ENCODING)
+        except UnicodeDecodeError:
+            yield _invalid_row('Invalid UTF-8.')
+            continue
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield _invalid_row('Invalid JSON.')
+
+
+def parse_csv(lines):
+    """Yield the recipe of each row of a CSV file with a header
+
+    Rows that are not valid UTF-8 or CSV are yielded as validation
+    errors, the reader carrying on with the next line.
+    """
+    invalid = []
+    reader = csv.DictReader(_decode(lines, invalid))
+    while True:
+        try:
+            row = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as exc:
+            row = _invalid_row(f'Invalid CSV: {exc}.')
+        else:
+            for name, _ in RELATIONS:
+                value = row.get(name)
+                row[name] = value.split(CSV_SEPARATOR) if value else []
+
+        # The lines are read as needed, so all the invalid ones read
+        # belong to this row
+        if invalid:
+            invalid.clear()
+            row = _invalid_row('Invalid UTF-8.')
+        yield row
+
+
+PARSERS = {
+    'ndjson': parse_ndjson,
+    'csv': parse_csv,
+}
+
+
+def _validate(serializer, item):
+    """Return the validated data of the item or raise ValidationError"""
+    if isinstance(item, ValidationError):
+        raise item
+
+    if isinstance(item, dict):
+        # Related objects may be given as exported, with their id
+        item = dict(item)
+        for name, _ in RELATIONS:
+            if isinstance(item.get(name), list):
+                item[name] = [
+                    obj['name'] if isinstance(obj, dict) and 'name' in obj
+                    else obj
+                    for obj in item[name]
+                ]
+
+    return serializer.run_validation(item)
+
+
+def _create_recipes(user, items):
+    """Create the recipes, resolving the related names once per model"""
+    for name, model in RELATIONS:
+        names = [value for item in items for value in item.get(name, [])]
+        objects = {
+            obj.name: obj
+            for obj in bulk.bulk_ensure_named(model, user, names)
+        }
+        for item in items:
+            item[name] = [objects[value] for value in item.get(name, [])]
+
+    bulk.bulk_create_recipes([dict(item, user=user) for item in items])
+
+
+def import_recipes(user, items, start=0, chunk_size=None, progress=None):
+    """Validate and create the recipes in chunks, each in a transaction
+
+    The first start items are skipped, so an interrupted import resumes
+    after the rows committed by its last chunk. Invalid rows are left
+    out and reported with their row number, counting from one. After
+    each chunk the progress callback is called with the result so far.
+    """
+    chunk_size = chunk_size or settings.RECIPE_IMPORT_CHUNK_SIZE
+    result = {'rows': start, 'created': 0, 'failed': 0, 'errors': []}
+    serializer = RecipeImportSerializer()
+
+    for chunk in iter_chunks(islice(items, start, None), chunk_size):
+        valid = []
+        for row, item in enumerate(chunk, result['rows'] + 1):
+            try:
+                valid.append(_validate(serializer, item))
+            except ValidationError as exc:
+                result['failed'] += 1
+                if len(result['errors']) < settings.RECIPE_IMPORT_MAX_ERRORS:
+                    result['errors'].append({'row': row, 'errors': exc.detail})
+
+        if valid:
+            with transaction.atomic():
+                _create_recipes(user, valid)
+
+        result['rows'] += len(chunk)
+        result['created'] += len(valid)
+        if progress is not None:
+            progress(result)
+
+    return result
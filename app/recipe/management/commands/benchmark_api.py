@@ -0,0 +1,340 @@
+import json
+import random
+import shutil
+import statistics
+import tempfile
+import time
+import urllib.request
+from decimal import Decimal
+from io import BytesIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.shortcuts import reverse
+from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
+from django.test.utils import override_settings
+from PIL import Image
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.benchmark import percentiles, run_concurrently, timed_request
+from recipe import bulk, images
+from recipe.models import Recipe
+
+
+SCENARIOS = [
+    'tag-list',
+    'ingredient-list',
+    'recipe-list',
+    'recipe-detail',
+    'recipe-create',
+    'upload-image',
+]
+
+CREATED_TITLE = 'Benchmark recipe'
+
+
+def sample_image(size=(800, 600)):
+    """Return the bytes of a JPEG image of the size"""
+    output = BytesIO()
+    Image.new('RGB', size, (200, 120, 40)).save(output, format='JPEG')
+    return output.getvalue()
+
+
+def summarize(results, elapsed):
+    """Return the latency percentiles and throughput of timed requests"""
+    durations = [duration for _, duration in results]
+    return {
+        'requests': len(results),
+        'errors': sum(1 for status, _ in results if status not in (200, 201)),
+        'throughput': len(results) / elapsed * 1000,
+        'mean': statistics.mean(durations),
+        **percentiles(durations),
+        'max': max(durations),
+    }
+
+
+class Command(BaseCommand):
+    """Django command to benchmark the main endpoints of the API"""
+    help = 'Send requests to the tag, ingredient and recipe endpoints as ' \
+        'a seeded user and report the latency percentiles and throughput. ' \
+        'Requests go through the test client and are rolled back, or to ' \
+        'a running server with --url, as the user given with --email. ' \
+        'The recipes it creates are deleted at the end.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--email',
+            help='User sending the requests, by default the one with the '
+                 'most recipes when not sent to a server'
+        )
+        parser.add_argument(
+            '--url',
+            help='Base URL of a server using this database, like '
+                 'http://localhost:8000, requires --email'
+        )
+        parser.add_argument('--requests', type=int, default=200,
+                            help='Requests of each scenario')
+        parser.add_argument('--warmup', type=int, default=10,
+                            help='Untimed requests before each scenario')
+        parser.add_argument('--concurrency', type=int, default=8,
+                            help='Concurrent clients, with --url only')
+        parser.add_argument(
+            '--scenarios',
+            default=','.join(SCENARIOS),
+            help=f'Comma separated scenarios among: {", ".join(SCENARIOS)}'
+        )
+        parser.add_argument('--output', help='Save the results as JSON')
+        parser.add_argument(
+            '--compare',
+            help='Results saved by a previous run to compare with'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        scenarios = options['scenarios'].split(',')
+        unknown = set(scenarios) - set(SCENARIOS)
+        if unknown:
+            raise CommandError(f'Unknown scenarios: {", ".join(unknown)}')
+        if options['url'] and not options['email']:
+            raise CommandError(
+                '--email is required with --url, the requests are sent '
+                'and kept as that user.'
+            )
+
+        user = self.get_user(options['email'])
+        self.rng = random.Random(options['seed'])
+        self.recipe_ids = list(
+            Recipe.objects.filter(user=user).values_list('id', flat=True)
+        )
+        self.tag_ids = list(user.tag_set.values_list('id', flat=True))
+        self.ingredient_ids = list(
+            user.ingredient_set.values_list('id', flat=True)
+        )
+        if not self.recipe_ids:
+            raise CommandError(f'{user.email} has no recipes to request.')
+        self.image = sample_image()
+        token, _ = Token.objects.get_or_create(user=user)
+        self.created_ids = []
+        try:
+            results = self.run_scenarios(user, token, scenarios, options)
+        finally:
+            self.delete_created()
+
+        baseline = {}
+        if options['compare']:
+            with open(options['compare']) as file:
+                baseline = json.load(file)['scenarios']
+        for scenario, summary in results['scenarios'].items():
+            self.write_summary(scenario, summary, baseline.get(scenario))
+
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                json.dump(results, file, indent=2)
+
+    def run_scenarios(self, user, token, scenarios, options):
+        """Run the scenarios and return their results"""
+        if 'upload-image' in scenarios:
+            self.upload_ids = self.create_upload_recipes(
+                user, options['warmup'] + options['requests']
+            )
+
+        if options['url']:
+            run = self.run_server(options['url'], token, options)
+        else:
+            run = self.run_client(token, options)
+
+        results = {
+            'user': user.email,
+            'recipes': len(self.recipe_ids),
+            'server': options['url'] or 'test client',
+            'concurrency': options['concurrency'] if options['url'] else 1,
+            'database': connection.vendor,
+            'settings': {
+                name: getattr(settings, name) for name in (
+                    'DEBUG',
+                    'METRICS_ENABLED',
+                    'QUERY_INSPECTION_ENABLED',
+                    'RECIPE_FAST_READ',
+                )
+            },
+            'scenarios': {},
+        }
+        for scenario in scenarios:
+            results['scenarios'][scenario] = summarize(*run(
+                scenario, options['requests'], options['warmup']
+            ))
+
+        return results
+
+    def create_upload_recipes(self, user, count):
+        """Create the recipes to upload images to, return their ids
+
+        Each request gets its own recipe, as the original image replaced
+        by an upload is kept.
+        """
+        recipes = bulk.bulk_create_recipes([
+            {
+                'user': user,
+                'title': f'{CREATED_TITLE} image {i}',
+                'time_minutes': 10,
+                'price': Decimal('5.00'),
+            } for i in range(count)
+        ])
+        ids = [recipe.pk for recipe in recipes]
+        self.created_ids.extend(ids)
+        return ids
+
+    def record_created(self, body):
+        self.created_ids.append(json.loads(body)['id'])
+
+    def delete_created(self):
+        """Delete the recipes created by the benchmark and their images"""
+        recipes = Recipe.objects.filter(id__in=self.created_ids)
+        for name in recipes.exclude(image='').values_list('image', flat=True):
+            images.delete_variants(name)
+            default_storage.delete(name)
+        recipes.delete()
+
+    def get_user(self, email):
+        """Return the user sending the requests"""
+        users = get_user_model().objects.all()
+        if email:
+            users = users.filter(email=email)
+        user = users.annotate(
+            recipe_count=Count('recipe')
+        ).order_by('-recipe_count').first()
+
+        if user is None:
+            raise CommandError(
+                f'Unknown user {email}.' if email
+                else 'No user, seed the database with seed_data first.'
+            )
+        return user
+
+    def build_request(self, scenario, index):
+        """Return the method, path, data and format of a request"""
+        if scenario == 'tag-list':
+            return 'get', reverse('recipe:tag-list'), None, None
+        if scenario == 'ingredient-list':
+            return 'get', reverse('recipe:ingredient-list'), None, None
+        if scenario == 'recipe-list':
+            return 'get', reverse('recipe:recipe-list'), None, None
+        if scenario == 'recipe-detail':
+            return 'get', reverse(
+                'recipe:recipe-detail', args=[self.rng.choice(self.recipe_ids)]
+            ), None, None
+        if scenario == 'recipe-create':
+            return 'post', reverse('recipe:recipe-list'), {
+                'title': f'{CREATED_TITLE} {index}',
+                'time_minutes': self.rng.randint(5, 180),
+                'price': '{:.2f}'.format(self.rng.randint(100, 10000) / 100),
+                'tags': self.rng.sample(
+                    self.tag_ids, min(3, len(self.tag_ids))
+                ),
+                'ingredients': self.rng.sample(
+                    self.ingredient_ids, min(8, len(self.ingredient_ids))
+                ),
+            }, 'json'
+        return 'post', reverse(
+            'recipe:recipe-upload-image',
+            args=[self.upload_ids[index]]
+        ), {
+            'image': SimpleUploadedFile(
+                'benchmark.jpg', self.image, 'image/jpeg'
+            ),
+        }, 'multipart'
+
+    def run_client(self, token, options):
+        """Return a function running scenarios through the test client"""
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+        def send(request):
+            method, path, data, format = request
+            start = time.perf_counter()
+            response = getattr(client, method)(path, data, format=format)
+            return response.status_code, (time.perf_counter() - start) * 1000
+
+        def run(scenario, requests, warmup):
+            # The created recipes and uploaded images are discarded
+            media_root = tempfile.mkdtemp()
+            try:
+                with override_settings(
+                    ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+                    MEDIA_ROOT=media_root,
+                ), transaction.atomic():
+                    for i in range(warmup):
+                        send(self.build_request(scenario, i))
+
+                    start = time.perf_counter()
+                    results = [
+                        send(self.build_request(scenario, i))
+                        for i in range(requests)
+                    ]
+                    elapsed = (time.perf_counter() - start) * 1000
+
+                    transaction.set_rollback(True)
+            finally:
+                shutil.rmtree(media_root)
+
+            return results, elapsed
+
+        return run
+
+    def run_server(self, url, token, options):
+        """Return a function running scenarios against a running server"""
+        headers = {'Authorization': f'Token {token.key}'}
+
+        def to_urllib(request):
+            method, path, data, format = request
+            body, request_headers = None, dict(headers)
+            if format == 'json':
+                body = json.dumps(data).encode()
+                request_headers['Content-Type'] = 'application/json'
+            elif format == 'multipart':
+                body = encode_multipart(BOUNDARY, data)
+                request_headers['Content-Type'] = MULTIPART_CONTENT
+            return urllib.request.Request(
+                url.rstrip('/') + path, data=body, headers=request_headers,
+                method=method.upper()
+            )
+
+        def run(scenario, requests, warmup):
+            requests = [
+                to_urllib(self.build_request(scenario, i))
+                for i in range(warmup + requests)
+            ]
+            # The created recipes are deleted by id at the end
+            on_body = self.record_created \
+                if scenario == 'recipe-create' else None
+            for request in requests[:warmup]:
+                timed_request(request, on_body)
+
+            return run_concurrently(
+                lambda i: timed_request(requests[warmup + i], on_body),
+                len(requests) - warmup, options['concurrency']
+            )
+
+        return run
+
+    def write_summary(self, scenario, summary, baseline):
+        """Write the results of a scenario and their change"""
+        self.stdout.write(
+            '{}: {requests} requests, {errors} errors, {throughput:.1f} '
+            'requests/s, p50 {p50:.2f}ms, p95 {p95:.2f}ms, '
+            'p99 {p99:.2f}ms'.format(scenario, **summary)
+        )
+        if baseline:
+            self.stdout.write('  vs baseline: ' + ', '.join(
+                '{} {:+.1f}%'.format(
+                    name, (summary[name] / baseline[name] - 1) * 100
+                )
+                for name in ('p50', 'p95', 'p99', 'throughput')
+                if baseline.get(name)
+            ))
@@ -0,0 +1,88 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+
+from core.benchmark import measure, format_timings
+from recipe.models import Tag
+from recipe.seeding import analyze_recipe_tables, seed_recipes
+
+
+class Command(BaseCommand):
+    """Django command to compare the plans of the assigned only filter"""
+    help = 'Benchmark the join, NOT IN, EXISTS and recipe count filters ' \
+        'of the assigned tags on a seeded dataset, rolled back at the end'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recipes', type=int, default=20000)
+        parser.add_argument('--tags', type=int, default=20)
+        parser.add_argument('--unused-tags', type=int, default=20)
+        parser.add_argument(
+            '--other-recipes',
+            type=int,
+            default=20000,
+            help='Recipes of another user, sharing the tables'
+        )
+        parser.add_argument(
+            '--skew',
+            type=float,
+            default=1,
+            help='Zipf exponent of the tag popularity, 0 for uniform'
+        )
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def get_strategies(self, user):
+        """Return the name and queryset of each filter strategy"""
+        tags = Tag.objects.filter(user=user).order_by('name', 'id')
+
+        return [
+            ('join', tags.filter(recipes__isnull=False)),
+            ('not in (exclude)', tags.exclude(recipes__isnull=True)),
+            ('exists', tags.assigned()),
+            ('recipe count', tags.filter(recipe_count__gt=0)),
+        ]
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+
+        with transaction.atomic():
+            self.stdout.write(
+                f'Seeding {options["recipes"]} + {options["other_recipes"]} '
+                'recipes...'
+            )
+            other = User.objects.create_user('other@recipe-api.local')
+            seed_recipes(
+                other, options['other_recipes'], tags=options['tags'],
+                seed=options['seed'], skew=options['skew']
+            )
+            user = User.objects.create_user('benchmark@recipe-api.local')
+            seed_recipes(
+                user, options['recipes'], tags=options['tags'],
+                seed=options['seed'] + 1, skew=options['skew']
+            )
+            Tag.objects.bulk_create(
+                Tag(user=user, name=f'Unused {i}')
+                for i in range(options['unused_tags'])
+            )
+            analyze_recipe_tables()
+            self.stdout.write('Most used tag: {} recipes'.format(
+                Tag.objects.filter(user=user).aggregate(
+                    most=Max('recipe_count')
+                )['most']
+            ))
+
+            for name, queryset in self.get_strategies(user):
+                ids = list(queryset.values_list('id', flat=True))
+                timings = measure(
+                    lambda: list(queryset.values_list('id', 'name')),
+                    options['repeat']
+                )
+                self.stdout.write(
+                    f'{name}: {len(ids)} rows, {len(set(ids))} distinct, '
+                    f'{format_timings(timings)}'
+                )
+                if options['verbosity'] > 1:
+                    self.stdout.write(queryset.explain())
+
+            transaction.set_rollback(True)
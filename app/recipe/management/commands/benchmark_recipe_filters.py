@@ -0,0 +1,65 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.benchmark import measure, format_timings
+from recipe.models import Recipe, Tag
+from recipe.seeding import analyze_recipe_tables, seed_recipes
+
+
+class Command(BaseCommand):
+    """Django command to compare the plans of the recipe tag filters"""
+    help = 'Benchmark the join, EXISTS and HAVING tag filters on a ' \
+        'seeded dataset, rolled back at the end'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recipes', type=int, default=100000)
+        parser.add_argument('--tags', type=int, default=50)
+        parser.add_argument('--filter-tags', type=int, default=3)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def get_strategies(self, user, tag_ids):
+        """Return the name and queryset of each filter strategy"""
+        recipes = Recipe.objects.filter(user=user).order_by('title', 'id')
+        join_all = recipes
+        for tag_id in tag_ids:
+            join_all = join_all.filter(tags__id=tag_id)
+
+        return [
+            ('join (any)', recipes.filter(tags__id__in=tag_ids)),
+            ('exists (any)', recipes.with_tags(tag_ids, 'any')),
+            ('join (all)', join_all),
+            ('having (all)', recipes.with_tags(tag_ids, 'all')),
+        ]
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            user = get_user_model().objects.create_user(
+                'benchmark@recipe-api.local'
+            )
+            self.stdout.write(f'Seeding {options["recipes"]} recipes...')
+            seed_recipes(
+                user,
+                options['recipes'],
+                tags=options['tags'],
+                seed=options['seed']
+            )
+            analyze_recipe_tables()
+            tag_ids = list(Tag.objects.filter(user=user).values_list(
+                'id', flat=True)[:options['filter_tags']])
+
+            for name, queryset in self.get_strategies(user, tag_ids):
+                ids = list(queryset.values_list('id', flat=True))
+                timings = measure(
+                    lambda: list(queryset.values_list('id', flat=True)),
+                    options['repeat']
+                )
+                self.stdout.write(
+                    f'{name}: {len(ids)} rows, {len(set(ids))} distinct, '
+                    f'{format_timings(timings)}'
+                )
+                if options['verbosity'] > 1:
+                    self.stdout.write(queryset.explain())
+
+            transaction.set_rollback(True)
@@ -0,0 +1,76 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.benchmark import measure, format_timings
+from recipe import views
+from recipe.management.commands.explain_queries import get_view_queryset
+from recipe.models import Recipe
+from recipe.seeding import analyze_recipe_tables, seed_recipes
+
+
+QUERIES = [
+    ('under 30 minutes and $10 by price',
+     {'max_time': '30', 'max_price': '10', 'ordering': 'price'}),
+    ('$20 to $40 by title', {'min_price': '20', 'max_price': '40'}),
+    ('over an hour, longest first',
+     {'min_time': '60', 'ordering': '-time_minutes'}),
+    ('cheapest first', {'ordering': 'price'}),
+]
+
+
+class Command(BaseCommand):
+    """Django command to time the range filters on growing accounts"""
+    help = 'Time the first page of the recipe range filters as the ' \
+        'account grows, on seeded data rolled back at the end'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            default='1000,10000,100000',
+            help='Comma separated account sizes, in recipes'
+        )
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        sizes = sorted(int(size) for size in options['sizes'].split(','))
+        medians = {}
+
+        with transaction.atomic():
+            user = get_user_model().objects.create_user(
+                'benchmark@recipe-api.local'
+            )
+
+            for size in sizes:
+                seeded = Recipe.objects.filter(user=user).count()
+                self.stdout.write(f'Seeding up to {size} recipes...')
+                seed_recipes(
+                    user, size - seeded, tags=0, ingredients=0,
+                    seed=options['seed'] + size
+                )
+                analyze_recipe_tables()
+
+                for name, params in QUERIES:
+                    queryset = get_view_queryset(
+                        views.RecipeViewSet, user, params
+                    )
+                    timings = measure(
+                        lambda: list(queryset.values_list('id', flat=True)),
+                        options['repeat']
+                    )
+                    growth = ''
+                    if name in medians:
+                        growth = ', {:.1f}x the previous size'.format(
+                            timings['median'] / medians[name]
+                        )
+                    medians[name] = timings['median']
+
+                    self.stdout.write(
+                        f'{size} recipes, {name}: '
+                        f'{format_timings(timings)}{growth}'
+                    )
+                    if options['verbosity'] > 1:
+                        self.stdout.write(queryset.explain())
+
+            transaction.set_rollback(True)
@@ -0,0 +1,58 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from core.benchmark import measure, format_timings
+from recipe import fastpath
+from recipe.models import Recipe
+from recipe.seeding import seed_recipes
+from recipe.serializers import RecipeSerializer
+
+
+class Command(BaseCommand):
+    """Django command to compare the serializer and fast read paths"""
+    help = 'Time a page of recipes built by RecipeSerializer and by the ' \
+        'fast read path, on seeded data rolled back at the end'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recipes', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            user = get_user_model().objects.create_user(
+                'benchmark@recipe-api.local'
+            )
+            self.stdout.write(f'Seeding {options["recipes"]} recipes...')
+            seed_recipes(user, options['recipes'], seed=options['seed'])
+            recipes = Recipe.objects.filter(user=user).order_by('title', 'id')
+            fields = list(fastpath.FIELD_COLUMNS)
+
+            def serializer_path():
+                return RecipeSerializer(recipes.for_list(), many=True).data
+
+            def fast_path():
+                return fastpath.represent_recipes(
+                    list(recipes.values(*fastpath.get_columns(fields))),
+                    fields
+                )
+
+            renderer = JSONRenderer()
+            if renderer.render(serializer_path()) != \
+                    renderer.render(fast_path()):
+                raise CommandError('The fast path output differs')
+
+            medians = {}
+            for name, func in [('serializer', serializer_path),
+                               ('fast path', fast_path)]:
+                timings = measure(func, options['repeat'])
+                medians[name] = timings['median']
+                self.stdout.write(f'{name}: {format_timings(timings)}')
+
+            self.stdout.write('fast path speed-up: {:.1f}x'.format(
+                medians['serializer'] / medians['fast path']
+            ))
+
+            transaction.set_rollback(True)
@@ -0,0 +1,98 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from rest_framework.request import Request
+
+from recipe import views
+from recipe.models import Tag, Ingredient
+from recipe.pagination import KeysetPagination
+
+
+INDEX_MARKERS = ['Index Scan', 'Index Only Scan', 'USING INDEX',
+                 'USING COVERING INDEX', 'USING INTEGER PRIMARY KEY']
+SORT_MARKERS = ['Sort', 'USE TEMP B-TREE']
+
+
+def get_view_queryset(viewset, user, params=None):
+    """Return the queryset a list request with the params would use"""
+    request = Request(RequestFactory().get('/', params or {}))
+    request.user = user
+    view = viewset(
+        request=request,
+        action='list',
+        args=(),
+        kwargs={},
+        format_kwarg=None
+    )
+    queryset = view.get_queryset().order_by(
+        *KeysetPagination().get_ordering(view)
+    )
+
+    return queryset[:KeysetPagination.page_size]
+
+
+class Command(BaseCommand):
+    """Django command to explain the queries of the list endpoints"""
+    help = 'Run EXPLAIN on the hot list queries and report index usage'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'email',
+            help='Email of the user whose data the queries run on'
+        )
+
+    def get_hot_queries(self, user):
+        """Return the name and queryset of the queries to explain"""
+        tags = ','.join(
+            str(pk) for pk in Tag.objects.filter(user=user).values_list(
+                'id', flat=True)[:3]
+        ) or '0'
+        ingredients = ','.join(
+            str(pk) for pk in Ingredient.objects.filter(
+                user=user).values_list('id', flat=True)[:3]
+        ) or '0'
+
+        return [
+            ('tag list', get_view_queryset(views.TagViewSet, user)),
+            ('tag list assigned only', get_view_queryset(
+                views.TagViewSet, user, {'assigned_only': '1'})),
+            ('ingredient list', get_view_queryset(
+                views.IngredientViewSet, user)),
+            ('ingredient list assigned only', get_view_queryset(
+                views.IngredientViewSet, user, {'assigned_only': '1'})),
+            ('recipe list', get_view_queryset(views.RecipeViewSet, user)),
+            ('recipe list by tags', get_view_queryset(
+                views.RecipeViewSet, user, {'tags': tags})),
+            ('recipe list by ingredients', get_view_queryset(
+                views.RecipeViewSet, user, {'ingredients': ingredients})),
+            ('recipe list by price range', get_view_queryset(
+                views.RecipeViewSet, user,
+                {'max_price': '10', 'max_time': '30', 'ordering': 'price'})),
+            ('recipe list by time', get_view_queryset(
+                views.RecipeViewSet, user,
+                {'min_time': '60', 'ordering': '-time_minutes'})),
+        ]
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(email=options['email'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f'User {options["email"]} does not exist')
+
+        for name, queryset in self.get_hot_queries(user):
+            plan = queryset.explain()
+            uses_index = any(marker in plan for marker in INDEX_MARKERS)
+            sorts = any(marker in plan for marker in SORT_MARKERS)
+
+            message = '{}: {}{}'.format(
+                name,
+                'index scan' if uses_index else 'no index scan',
+                ', sorts in memory' if sorts else ''
+            )
+            if uses_index and not sorts:
+                self.stdout.write(self.style.SUCCESS(message))
+            else:
+                self.stdout.write(self.style.WARNING(message))
+
+            if options['verbosity'] > 1:
+                self.stdout.write(plan)
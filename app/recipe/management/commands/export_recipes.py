@@ -0,0 +1,51 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from recipe import export
+from recipe.models import Recipe
+
+
+class Command(BaseCommand):
+    """Django command to export the recipes of a user"""
+    help = 'Stream the recipes of a user as NDJSON or CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('email', help='Email of the recipes owner')
+        parser.add_argument(
+            '--format',
+            choices=list(export.FORMATS),
+            default='ndjson',
+            help='Format of the exported file'
+        )
+        parser.add_argument(
+            '--output',
+            help='File to write to, the standard output by default'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=export.CHUNK_SIZE,
+            help='Number of recipes read from the database at a time'
+        )
+
+    def _write(self, lines, output):
+        if not output:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+
+        with open(output, 'w', newline='') as out:
+            out.writelines(lines)
+        self.stderr.write(self.style.SUCCESS(f'Exported recipes to {output}'))
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(email=options['email'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f'User {options["email"]} does not exist')
+
+        encode, _ = export.FORMATS[options['format']]
+        recipes = export.iter_recipes(
+            Recipe.objects.filter(user=user), options['chunk_size']
+        )
+        self._write(encode(recipes), options['output'])
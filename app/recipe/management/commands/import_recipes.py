@@ -0,0 +1,80 @@
+import json
+import os
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from recipe import imports
+
+
+class Command(BaseCommand):
+    """Django command to import a file of recipes for a user"""
+    help = 'Import the recipes of an NDJSON or CSV file, chunk by chunk'
+
+    def add_arguments(self, parser):
+        parser.add_argument('email', help='Email of the recipes owner')
+        parser.add_argument('path', help='File to import')
+        parser.add_argument(
+            '--format',
+            choices=list(imports.PARSERS),
+            help='Format of the file, guessed from its extension by default'
+        )
+        parser.add_argument(
+            '--start',
+            type=int,
+            default=0,
+            help='Number of rows to skip, to resume an interrupted import'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            help='Number of rows validated and committed at a time'
+        )
+
+    def _report_progress(self, result):
+        """Write the rows committed so far and the new row errors"""
+        for error in result['errors'][self.reported_errors:]:
+            self.stderr.write(
+                f'Row {error["row"]}: {json.dumps(error["errors"])}'
+            )
+        self.reported_errors = len(result['errors'])
+        self.committed_rows = result['rows']
+
+        self.stdout.write(
+            f'{result["rows"]} rows committed: {result["created"]} created, '
+            f'{result["failed"]} failed'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(email=options['email'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f'User {options["email"]} does not exist')
+
+        import_format = options['format'] or \
+            os.path.splitext(options['path'])[1].lstrip('.').lower()
+        if import_format not in imports.PARSERS:
+            raise CommandError('Unknown file format, use --format')
+
+        self.reported_errors = 0
+        self.committed_rows = options['start']
+
+        try:
+            with open(options['path'], 'rb') as lines:
+                result = imports.import_recipes(
+                    user,
+                    imports.PARSERS[import_format](lines),
+                    start=options['start'],
+                    chunk_size=options['chunk_size'],
+                    progress=self._report_progress
+                )
+        except Exception:
+            self.stderr.write(
+                f'Import stopped, resume with --start {self.committed_rows}'
+            )
+            raise
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {result["created"]} recipes, '
+            f'{result["failed"]} rows failed'
+        ))
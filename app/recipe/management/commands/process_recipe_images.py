@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from recipe.images import process_recipe_image
+from recipe.models import Recipe
+
+
+class Command(BaseCommand):
+    """Django command to create the variants of pending recipe images"""
+    help = 'Process the recipe images that have no variants yet'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--retry-failed',
+            action='store_true',
+            help='Also process the images that failed before'
+        )
+
+    def handle(self, *args, **options):
+        statuses = [Recipe.IMAGE_PENDING]
+        if options['retry_failed']:
+            statuses.append(Recipe.IMAGE_FAILED)
+
+        recipe_ids = Recipe.objects.filter(
+            image_status__in=statuses
+        ).values_list('id', flat=True)
+
+        processed = 0
+        for recipe_id in recipe_ids.iterator():
+            process_recipe_image(recipe_id)
+            processed += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Processed {processed} recipe images')
+        )
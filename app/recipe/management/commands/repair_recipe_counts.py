@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Max
+
+from recipe.counters import recount_recipes
+from recipe.models import Tag, Ingredient
+
+
+class Command(BaseCommand):
+    """Django command to recompute the recipe counts of tags and ingredients"""
+    help = 'Recount the recipes using each tag and ingredient and fix the ' \
+        'counts that drifted, a batch of ids per statement'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=10000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        for model in (Tag, Ingredient):
+            last_id = model.objects.aggregate(last_id=Max('id'))['last_id']
+            repaired = 0
+            for start in range(0, (last_id or 0) + 1, batch_size):
+                repaired += recount_recipes(model.objects.filter(
+                    id__gte=start, id__lt=start + batch_size
+                ))
+
+            self.stdout.write(self.style.SUCCESS(
+                f'Repaired {repaired} {model._meta.verbose_name} counts'
+            ))
@@ -0,0 +1,71 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from recipe.models import Recipe
+from recipe.seeding import seed_recipes, seed_users
+
+
+class Command(BaseCommand):
+    """Django command to fill the database with a realistic dataset"""
+    help = 'Create users with recipes, tags and ingredients in bulk, a few ' \
+        'tags and ingredients being used by most recipes like real accounts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10)
+        parser.add_argument('--recipes', type=int, default=1000,
+                            help='Recipes of each user')
+        parser.add_argument('--tags', type=int, default=30,
+                            help='Tags of each user')
+        parser.add_argument('--ingredients', type=int, default=200,
+                            help='Ingredients of each user')
+        parser.add_argument('--tags-per-recipe', type=int, default=3)
+        parser.add_argument('--ingredients-per-recipe', type=int, default=8)
+        parser.add_argument(
+            '--skew',
+            type=float,
+            default=1.1,
+            help='Zipf exponent of the tag and ingredient popularity, '
+                 '0 for uniform'
+        )
+        parser.add_argument('--password', default='seedpass')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--search',
+            action='store_true',
+            help='Also build the search vectors of the recipes'
+        )
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+
+        with transaction.atomic():
+            users = seed_users(
+                options['users'], options['password'], options['batch_size']
+            )
+            for i, user in enumerate(users):
+                seed_recipes(
+                    user,
+                    options['recipes'],
+                    tags=options['tags'],
+                    ingredients=options['ingredients'],
+                    tags_per_recipe=options['tags_per_recipe'],
+                    ingredients_per_recipe=options['ingredients_per_recipe'],
+                    batch_size=options['batch_size'],
+                    seed=options['seed'] + i,
+                    skew=options['skew'],
+                )
+                if options['search']:
+                    Recipe.objects.filter(user=user).update_search_vectors()
+                if options['verbosity'] > 1:
+                    self.stdout.write(f'Seeded {user.email}')
+
+        self.stdout.write(
+            '{} users with {} recipes each seeded in {:.1f}s, '
+            'password {}'.format(
+                len(users), options['recipes'],
+                time.perf_counter() - start, options['password']
+            )
+        )
@@ -0,0 +1,35 @@
+# Generated by Django 2.1.15 on 2026-10-17 04:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipe', '0005_recipe_image'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ingredient',
+            index=models.Index(fields=['user', 'name', 'id'], name='recipe_ingr_user_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['user', 'title', 'id'], name='recipe_recipe_user_title_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tag',
+            index=models.Index(fields=['user', 'name', 'id'], name='recipe_tag_user_name_idx'),
+        ),
+        migrations.RunSQL(
+            ['CREATE INDEX recipe_recipe_tags_tag_recipe_idx '
+             'ON recipe_recipe_tags (tag_id, recipe_id)'],
+            ['DROP INDEX recipe_recipe_tags_tag_recipe_idx'],
+        ),
+        migrations.RunSQL(
+            ['CREATE INDEX recipe_recipe_ingr_ingr_recipe_idx '
+             'ON recipe_recipe_ingredients (ingredient_id, recipe_id)'],
+            ['DROP INDEX recipe_recipe_ingr_ingr_recipe_idx'],
+        ),
+    ]
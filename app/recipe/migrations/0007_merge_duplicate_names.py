@@ -0,0 +1,49 @@
+# Generated by Django 2.1.15 on 2026-10-17 04:26
+
+from django.db import migrations
+from django.db.models import Count, Min
+
+
+def merge_duplicate_names(apps, schema_editor):
+    """Merge the tags and ingredients of a user that share a name"""
+    Recipe = apps.get_model('recipe', 'Recipe')
+
+    for model_name, relation, column in (
+        ('Tag', 'tags', 'tag_id'),
+        ('Ingredient', 'ingredients', 'ingredient_id'),
+    ):
+        model = apps.get_model('recipe', model_name)
+        through = getattr(Recipe, relation).through
+        duplicates = model.objects.values('user_id', 'name').annotate(
+            keep=Min('id'),
+            total=Count('id'),
+        ).filter(total__gt=1)
+
+        for duplicate in duplicates:
+            others = model.objects.filter(
+                user_id=duplicate['user_id'],
+                name=duplicate['name'],
+            ).exclude(id=duplicate['keep'])
+            recipe_ids = set(through.objects.filter(
+                **{f'{column}__in': others}
+            ).values_list('recipe_id', flat=True))
+            recipe_ids -= set(through.objects.filter(
+                **{column: duplicate['keep']}
+            ).values_list('recipe_id', flat=True))
+
+            through.objects.bulk_create([
+                through(recipe_id=recipe_id, **{column: duplicate['keep']})
+                for recipe_id in recipe_ids
+            ])
+            others.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipe', '0006_user_ordering_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_names, migrations.RunPython.noop),
+    ]
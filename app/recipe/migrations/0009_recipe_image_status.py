@@ -0,0 +1,27 @@
+# Generated by Django 2.1.15 on 2026-10-17 04:28
+
+from django.db import migrations, models
+
+
+def mark_images_pending(apps, schema_editor):
+    """Mark the existing images to be processed"""
+    Recipe = apps.get_model('recipe', 'Recipe')
+    Recipe.objects.exclude(image='').exclude(image__isnull=True).update(
+        image_status='pending'
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipe', '0008_unique_user_names'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='image_status',
+            field=models.CharField(blank=True, choices=[('pending', 'Pending'), ('ready', 'Ready'), ('failed', 'Failed')], max_length=10),
+        ),
+        migrations.RunPython(mark_images_pending, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,91 @@
+# Generated by Django 2.1.15 on 2026-10-17 09:12
+
+import django.contrib.postgres.search
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import OuterRef, Subquery, TextField, Value
+from django.db.models.functions import Coalesce
+
+
+# Frozen copy of recipe.search at the time of this migration
+SEARCH_CONFIG = 'english'
+RELATION_WEIGHTS = (
+    ('ingredients', 'B'),
+    ('tags', 'C'),
+)
+
+
+def _related_names(Recipe, relation):
+    """Return a subquery joining the names related to the outer recipe"""
+    from django.contrib.postgres.aggregates import StringAgg
+
+    through = getattr(Recipe, relation).through
+    return Coalesce(Subquery(
+        through.objects.filter(recipe_id=OuterRef('pk')).order_by()
+        .values('recipe_id')
+        .annotate(names=StringAgg(f'{relation[:-1]}__name', ' '))
+        .values('names'),
+        output_field=TextField()
+    ), Value(''))
+
+
+def fill_search_vectors(apps, schema_editor):
+    """Compute the search vector of the existing recipes"""
+    Recipe = apps.get_model('recipe', 'Recipe')
+    alias = schema_editor.connection.alias
+    recipes = Recipe.objects.using(alias)
+
+    if schema_editor.connection.vendor == 'postgresql':
+        vector = SearchVector('title', weight='A', config=SEARCH_CONFIG)
+        for relation, weight in RELATION_WEIGHTS:
+            vector = vector + SearchVector(
+                _related_names(Recipe, relation),
+                weight=weight,
+                config=SEARCH_CONFIG
+            )
+        recipes.update(search_vector=vector)
+        return
+
+    documents = {
+        pk: [title] for pk, title in recipes.values_list('id', 'title')
+    }
+    for relation, _ in RELATION_WEIGHTS:
+        through = getattr(Recipe, relation).through
+        for recipe_id, name in through.objects.using(alias).values_list(
+            'recipe_id', f'{relation[:-1]}__name'
+        ):
+            documents[recipe_id].append(name)
+
+    for pk, words in documents.items():
+        recipes.filter(pk=pk).update(search_vector=' '.join(words).lower())
+
+
+def create_search_index(apps, schema_editor):
+    """Index the search vectors with GIN, only available on Postgres"""
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE INDEX recipe_recipe_search_idx ON recipe_recipe '
+            'USING gin (search_vector)'
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX recipe_recipe_search_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipe', '0009_recipe_image_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(fill_search_vectors, migrations.RunPython.noop),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
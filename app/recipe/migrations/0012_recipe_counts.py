@@ -0,0 +1,47 @@
+# Generated by Django 2.1.15 on 2026-10-17 05:21
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_recipe_counts(apps, schema_editor):
+    """Count the recipes using the existing tags and ingredients"""
+    Recipe = apps.get_model('recipe', 'Recipe')
+    alias = schema_editor.connection.alias
+
+    for name, relation, column in [
+        ('Tag', 'tags', 'tag'),
+        ('Ingredient', 'ingredients', 'ingredient'),
+    ]:
+        model = apps.get_model('recipe', name)
+        through = getattr(Recipe, relation).through
+        model.objects.using(alias).update(recipe_count=Coalesce(Subquery(
+            through.objects.filter(
+                **{column: OuterRef('pk')}
+            ).order_by().values(column).annotate(
+                count=Count('*')
+            ).values('count'),
+            output_field=models.IntegerField()
+        ), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipe', '0011_recipe_range_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingredient',
+            name='recipe_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='recipe_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_recipe_counts, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,11 @@
 import uuid
 import os
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.conf import settings
 
+from recipe import search
+
 
 def recipe_image_file_path(instance, filename):
     """Generate file path for new recipe image"""
@@ -12,6 +15,25 @@ def recipe_image_file_path(instance, filename):
     return os.path.join('uploads/recipe/', file_name)
 
 
+class RecipeAttrQuerySet(models.QuerySet):
+    """Queryset of the objects recipes are assigned"""
+
+    def assigned(self):
+        """Filter the objects used by a recipe
+
+        Each object is probed in the index of the recipe relation with
+        EXISTS, which neither repeats objects nor reads the relations of
+        the other users.
+        """
+        relation = self.model._meta.get_field('recipes')
+        column = relation.field.m2m_reverse_field_name()
+        return self.annotate(assigned=models.Exists(
+            relation.through.objects.filter(
+                **{column: models.OuterRef('pk')}
+            ).values(column)
+        )).filter(assigned=True)
+
+
 class Tag(models.Model):
     """A tag a recipe can be assigned"""
     name = models.CharField(max_length=255)
@@ -19,6 +41,19 @@ class Tag(models.Model):
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE
     )
+    # Recipes using it, kept up to date by the signals
+    recipe_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = RecipeAttrQuerySet.as_manager()
+
+    class Meta:
+        unique_together = [('user', 'name')]
+        indexes = [
+            models.Index(
+                fields=['user', 'name', 'id'],
+                name='recipe_tag_user_name_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -31,13 +66,111 @@ class Ingredient(models.Model):
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE
     )
+    # Recipes using it, kept up to date by the signals
+    recipe_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = RecipeAttrQuerySet.as_manager()
+
+    class Meta:
+        unique_together = [('user', 'name')]
+        indexes = [
+            models.Index(
+                fields=['user', 'name', 'id'],
+                name='recipe_ingr_user_name_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
 
+class RecipeQuerySet(models.QuerySet):
+    """Queryset with the loading strategies used by the recipe endpoints"""
+    MATCH_ANY = 'any'
+    MATCH_ALL = 'all'
+
+    def for_list(self, relations=('ingredients', 'tags')):
+        """Prefetch only the related ids needed to list recipes"""
+        return self.defer('search_vector').prefetch_related(*(
+            models.Prefetch(
+                relation,
+                queryset=self._related_model(relation).objects.only(
+                    'id').order_by('id')
+            ) for relation in relations
+        ))
+
+    def for_detail(self, relations=('ingredients', 'tags')):
+        """Prefetch the related objects nested in the recipe details"""
+        return self.defer('search_vector').prefetch_related(*(
+            models.Prefetch(
+                relation,
+                queryset=self._related_model(relation).objects.order_by('id')
+            ) for relation in relations
+        ))
+
+    def _related_model(self, relation):
+        return self.model._meta.get_field(relation).related_model
+
+    def for_image(self):
+        """Load only the fields needed to manage the recipe image"""
+        return self.only('id', 'user', 'image', 'image_status')
+
+    def with_tags(self, tag_ids, match=MATCH_ANY):
+        """Filter recipes assigned any or all of the tags"""
+        return self._filter_related(
+            self.model.tags.through, 'tag_id', tag_ids, match
+        )
+
+    def with_ingredients(self, ingredient_ids, match=MATCH_ANY):
+        """Filter recipes that use any or all of the ingredients"""
+        return self._filter_related(
+            self.model.ingredients.through, 'ingredient_id',
+            ingredient_ids, match
+        )
+
+    def search(self, terms):
+        """Filter recipes matching the terms, annotated with search_rank"""
+        return search.search_recipes(self, terms)
+
+    def update_search_vectors(self):
+        """Recompute the search vectors of the recipes"""
+        search.update_search_vectors(self)
+
+    def _filter_related(self, through, field, ids, match):
+        """Filter on the through table without joining it to the recipes
+
+        Matching any id is a semi-join with EXISTS, matching all of them
+        groups the through rows by recipe and keeps the complete groups,
+        so no recipe is repeated in the results.
+        """
+        ids = set(ids)
+        related = through.objects.filter(**{f'{field}__in': ids})
+
+        if match == self.MATCH_ALL:
+            matching = related.values('recipe_id').annotate(
+                matched=models.Count(field)
+            ).filter(matched=len(ids)).values('recipe_id')
+            return self.filter(id__in=matching)
+
+        annotation = f'has_{field}'
+        return self.annotate(**{
+            annotation: models.Exists(
+                related.filter(recipe_id=models.OuterRef('pk'))
+            )
+        }).filter(**{annotation: True})
+
+
 class Recipe(models.Model):
     """A recipe"""
+    IMAGE_PENDING = 'pending'
+    IMAGE_READY = 'ready'
+    IMAGE_FAILED = 'failed'
+    IMAGE_STATUS_CHOICES = [
+        (IMAGE_PENDING, 'Pending'),
+        (IMAGE_READY, 'Ready'),
+        (IMAGE_FAILED, 'Failed'),
+    ]
+
     title = models.CharField(max_length=255)
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -49,6 +182,31 @@ class Recipe(models.Model):
     ingredients = models.ManyToManyField(Ingredient, related_name='recipes')
     tags = models.ManyToManyField(Tag, related_name='recipes')
     image = models.ImageField(null=True, upload_to=recipe_image_file_path)
+    image_status = models.CharField(
+        max_length=10,
+        choices=IMAGE_STATUS_CHOICES,
+        blank=True
+    )
+    # Title, ingredient and tag names, kept up to date by the signals
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = RecipeQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['user', 'title', 'id'],
+                name='recipe_recipe_user_title_idx'
+            ),
+            models.Index(
+                fields=['user', 'price', 'id'],
+                name='recipe_recipe_user_price_idx'
+            ),
+            models.Index(
+                fields=['user', 'time_minutes', 'id'],
+                name='recipe_recipe_user_time_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.title
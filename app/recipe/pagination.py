@@ -0,0 +1,180 @@
+import base64
+import binascii
+import json
+import math
+from collections import OrderedDict
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Cursor pagination on the view ordering
+
+    The cursor holds the ordering values of the row it points to and pages
+    are fetched by filtering past that position instead of using OFFSET,
+    so every page costs the same no matter how deep it is. The view
+    ordering must end with a unique field, like the id, to break ties.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    page_size = 100
+    max_page_size = 1000
+    invalid_cursor_message = _('Invalid cursor')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Return the page of the queryset pointed by the request cursor"""
+        self.ordering = self.get_ordering(view)
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+
+        cursor = self.decode_cursor(request, queryset)
+        reverse = False
+        if cursor is not None:
+            reverse, position = cursor
+            queryset = queryset.filter(
+                self._get_keyset_filter(position, reverse)
+            )
+
+        ordering = self.ordering
+        if reverse:
+            ordering = [self._reverse_field(field) for field in ordering]
+
+        results = list(queryset.order_by(*ordering)[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = cursor is not None
+
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_ordering(self, view):
+        """Return the ordering used to paginate the view"""
+        if hasattr(view, 'get_ordering'):
+            return list(view.get_ordering())
+        return list(view.ordering)
+
+    def get_page_size(self, request):
+        """Return the page size requested, limited to the maximum"""
+        try:
+            page_size = int(
+                request.query_params[self.page_size_query_param]
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+        if page_size <= 0:
+            return self.page_size
+
+        return min(page_size, self.max_page_size)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(False, self.page[-1])
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(True, self.page[0])
+
+    def encode_cursor(self, reverse, instance):
+        """Return the url with a cursor pointing to the instance"""
+        position = [
+            self._get_value(instance, field) for field in self.ordering
+        ]
+        data = json.dumps([reverse, position], cls=DjangoJSONEncoder)
+        cursor = base64.urlsafe_b64encode(data.encode('utf-8'))
+
+        url = remove_query_param(self.base_url, self.cursor_query_param)
+        return replace_query_param(
+            url, self.cursor_query_param, cursor.decode('ascii')
+        )
+
+    def decode_cursor(self, request, queryset):
+        """Return the direction and position of the request cursor
+
+        The position values are converted by the fields the queryset is
+        ordered by, so a cursor that was tampered with is refused.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            data = base64.urlsafe_b64decode(encoded.encode('ascii'))
+            reverse, position = json.loads(data.decode('utf-8'))
+        except (TypeError, ValueError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+
+        if not isinstance(position, list) or \
+                len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        try:
+            position = [
+                self._to_python(queryset, field.lstrip('-'), value)
+                for field, value in zip(self.ordering, position)
+            ]
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+        return bool(reverse), position
+
+    def _to_python(self, queryset, name, value):
+        """Return the position value as the ordering field reads it"""
+        if name in queryset.query.annotations:
+            field = queryset.query.annotations[name].output_field
+        elif name == 'pk':
+            field = queryset.model._meta.pk
+        else:
+            field = queryset.model._meta.get_field(name)
+
+        value = field.to_python(value)
+        if value is None or isinstance(value, (float, Decimal)) and \
+                not math.isfinite(value):
+            raise ValueError(f'Invalid {name} position')
+        return value
+
+    def _get_keyset_filter(self, position, reverse):
+        """Return the filter selecting rows after the position"""
+        keyset_filter = Q()
+        previous_fields = {}
+
+        for field, value in zip(self.ordering, position):
+            name = field.lstrip('-')
+            descending = field.startswith('-') != reverse
+            lookup = f'{name}__lt' if descending else f'{name}__gt'
+
+            keyset_filter |= Q(**previous_fields, **{lookup: value})
+            previous_fields[name] = value
+
+        return keyset_filter
+
+    def _get_value(self, instance, field):
+        if isinstance(instance, dict):
+            return instance[field.lstrip('-')]
+        return getattr(instance, field.lstrip('-'))
+
+    def _reverse_field(self, field):
+        return field[1:] if field.startswith('-') else f'-{field}'
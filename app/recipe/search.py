@@ -0,0 +1,106 @@
+from django.contrib.postgres.search import (
+    SearchQuery, SearchRank, SearchVector,
+)
+from django.db import connections
+from django.db.models import (
+    Case, DecimalField, F, IntegerField, OuterRef, Subquery, TextField,
+    Value, When,
+)
+from django.db.models.functions import Cast, Coalesce
+
+
+SEARCH_CONFIG = 'english'
+# Relations whose names are searched, with their weight on Postgres
+RELATION_WEIGHTS = (
+    ('ingredients', 'B'),
+    ('tags', 'C'),
+)
+
+
+def uses_postgres(queryset):
+    return connections[queryset.db].vendor == 'postgresql'
+
+
+def _related_names(recipes, relation):
+    """Return a subquery joining the names related to the outer recipe"""
+    # StringAgg lives with the Postgres fields, which need psycopg2
+    from django.contrib.postgres.aggregates import StringAgg
+
+    through = getattr(recipes.model, relation).through
+    return Coalesce(Subquery(
+        through.objects.filter(recipe_id=OuterRef('pk')).order_by()
+        .values('recipe_id')
+        .annotate(names=StringAgg(f'{relation[:-1]}__name', ' '))
+        .values('names'),
+        output_field=TextField()
+    ), Value(''))
+
+
+def _update_postgres(recipes):
+    vector = SearchVector('title', weight='A', config=SEARCH_CONFIG)
+    for relation, weight in RELATION_WEIGHTS:
+        vector = vector + SearchVector(
+            _related_names(recipes, relation),
+            weight=weight,
+            config=SEARCH_CONFIG
+        )
+    recipes.update(search_vector=vector)
+
+
+def _update_in_process(recipes):
+    """Store the lowercased title and related names as a plain document"""
+    documents = {
+        pk: [title] for pk, title in recipes.values_list('id', 'title')
+    }
+    for relation, _ in RELATION_WEIGHTS:
+        through = getattr(recipes.model, relation).through
+        for recipe_id, name in through.objects.filter(
+            recipe_id__in=list(documents)
+        ).values_list('recipe_id', f'{relation[:-1]}__name'):
+            documents[recipe_id].append(name)
+
+    for pk, words in documents.items():
+        recipes.model._default_manager.filter(pk=pk).update(
+            search_vector=' '.join(words).lower()
+        )
+
+
+def update_search_vectors(recipes):
+    """Recompute the search vector of the recipes in the queryset
+
+    On Postgres the vector is a weighted tsvector updated with a single
+    statement. Other databases store a plain document, built in process,
+    that the search matches word by word.
+    """
+    if uses_postgres(recipes):
+        _update_postgres(recipes)
+    else:
+        _update_in_process(recipes)
+
+
+def search_recipes(recipes, terms):
+    """Filter the recipes matching all the terms, annotated with a rank
+
+    The rank is exact, a decimal on Postgres and an integer elsewhere,
+    so it can be used as a pagination keyset.
+    """
+    if uses_postgres(recipes):
+        query = SearchQuery(terms, config=SEARCH_CONFIG)
+        return recipes.annotate(search_rank=Cast(
+            SearchRank(F('search_vector'), query),
+            DecimalField(max_digits=12, decimal_places=8)
+        )).filter(search_vector=query)
+
+    words = terms.lower().split()
+    for word in words:
+        recipes = recipes.filter(search_vector__contains=word)
+
+    # Words found in the title rank higher than in the related names
+    rank = Value(0, output_field=IntegerField())
+    for word in words:
+        rank = rank + Case(
+            When(title__icontains=word, then=Value(2)),
+            default=Value(1),
+            output_field=IntegerField()
+        )
+    return recipes.annotate(search_rank=rank)
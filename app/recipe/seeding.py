@@ -0,0 +1,132 @@
+import itertools
+import random
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection
+
+from recipe.counters import recount_recipes
+from recipe.models import Tag, Ingredient, Recipe
+
+
+def _bulk_insert(model, objects, batch_size):
+    """Insert the objects in batches, consuming them lazily"""
+    batch = []
+    for obj in objects:
+        batch.append(obj)
+        if len(batch) >= batch_size:
+            model.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        model.objects.bulk_create(batch)
+
+
+def _sampler(rng, ids, skew):
+    """Return a function picking k distinct ids
+
+    With a skew, the ids are picked with Zipf weights, so the first ones
+    are used by most recipes like the popular tags of real accounts.
+    """
+    if not skew:
+        return lambda k: rng.sample(ids, min(k, len(ids)))
+
+    cum_weights = list(itertools.accumulate(
+        1 / (rank ** skew) for rank in range(1, len(ids) + 1)
+    ))
+
+    def sample(k):
+        picked = set()
+        while len(picked) < min(k, len(ids)):
+            picked.update(rng.choices(ids, cum_weights=cum_weights, k=k))
+        return list(picked)[:k]
+
+    return sample
+
+
+def seed_users(count, password, batch_size=1000):
+    """Bulk insert users sharing the password, return them"""
+    User = get_user_model()
+    first = User.objects.filter(email__startswith='seed').count()
+    emails = [f'seed{first + i}@recipe-api.local' for i in range(count)]
+    password = make_password(password)
+    _bulk_insert(User, (
+        User(email=email, name=f'Seed user {first + i}', password=password)
+        for i, email in enumerate(emails)
+    ), batch_size)
+
+    return list(User.objects.filter(email__in=emails).order_by('id'))
+
+
+def seed_recipes(user, recipes, tags=20, ingredients=50, tags_per_recipe=3,
+                 ingredients_per_recipe=5, batch_size=1000, seed=None,
+                 skew=0):
+    """Bulk insert recipes with random tags and ingredients for the user
+
+    With a skew, the tags and ingredients of each recipe are picked with
+    Zipf weights of that exponent instead of uniformly.
+    """
+    rng = random.Random(seed)
+
+    first_tag = Tag.objects.filter(user=user).count()
+    _bulk_insert(Tag, (
+        Tag(user=user, name=f'Tag {first_tag + i}') for i in range(tags)
+    ), batch_size)
+    first_ingredient = Ingredient.objects.filter(user=user).count()
+    _bulk_insert(Ingredient, (
+        Ingredient(user=user, name=f'Ingredient {first_ingredient + i}')
+        for i in range(ingredients)
+    ), batch_size)
+    tag_ids = list(
+        Tag.objects.filter(user=user).values_list('id', flat=True)
+    )
+    ingredient_ids = list(
+        Ingredient.objects.filter(user=user).values_list('id', flat=True)
+    )
+
+    last_recipe = Recipe.objects.order_by('-id').values_list(
+        'id', flat=True).first() or 0
+    _bulk_insert(Recipe, (
+        Recipe(
+            user=user,
+            title=f'Recipe {i}',
+            time_minutes=rng.randint(5, 180),
+            price=Decimal(rng.randint(100, 10000)) / 100,
+        ) for i in range(recipes)
+    ), batch_size)
+    recipe_ids = Recipe.objects.filter(
+        user=user, id__gt=last_recipe
+    ).values_list('id', flat=True)
+
+    sample_tags = _sampler(rng, tag_ids, skew)
+    _bulk_insert(Recipe.tags.through, (
+        Recipe.tags.through(recipe_id=recipe_id, tag_id=tag_id)
+        for recipe_id in recipe_ids.iterator()
+        for tag_id in sample_tags(tags_per_recipe)
+    ), batch_size)
+    sample_ingredients = _sampler(rng, ingredient_ids, skew)
+    _bulk_insert(Recipe.ingredients.through, (
+        Recipe.ingredients.through(
+            recipe_id=recipe_id, ingredient_id=ingredient_id)
+        for recipe_id in recipe_ids.iterator()
+        for ingredient_id in sample_ingredients(ingredients_per_recipe)
+    ), batch_size)
+    recount_recipes(Tag.objects.filter(user=user))
+    recount_recipes(Ingredient.objects.filter(user=user))
+
+
+def analyze_recipe_tables():
+    """Refresh the planner statistics of the recipe tables
+
+    Rows inserted in bulk are not counted until the tables are analyzed,
+    so queries run right after seeding are planned for empty tables.
+    """
+    models = [
+        Recipe, Tag, Ingredient,
+        Recipe.tags.through, Recipe.ingredients.through,
+    ]
+    with connection.cursor() as cursor:
+        for model in models:
+            cursor.execute('ANALYZE {}'.format(
+                connection.ops.quote_name(model._meta.db_table)
+            ))
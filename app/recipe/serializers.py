@@ -1,8 +1,42 @@
+from django.conf import settings
 from rest_framework import serializers
-from recipe import models
+from rest_framework.relations import MANY_RELATION_KWARGS
+from core.metrics import TimedSerializerMixin
+from recipe import bulk, images, models
 
 
-class TagSerializer(serializers.ModelSerializer):
+class SparseFieldsMixin:
+    """Serializer mixin keeping only the fields given in its arguments"""
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+
+        if fields is not None:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
+
+
+class RecipeAttrSerializer(
+    SparseFieldsMixin,
+    TimedSerializerMixin,
+    serializers.ModelSerializer,
+):
+    """Base serializer for the objects recipes are assigned"""
+
+    def validate_name(self, value):
+        """Validate the name is not used yet by the user"""
+        request = self.context.get('request')
+        if request and self.Meta.model.objects.filter(
+            user=request.user,
+            name=value
+        ).exists():
+            raise serializers.ValidationError(
+                'You already have one with this name!')
+        return value
+
+
+class TagSerializer(RecipeAttrSerializer):
     """Serializer for Tag objects"""
 
     class Meta():
@@ -11,19 +45,143 @@ class TagSerializer(serializers.ModelSerializer):
         read_only_fields = ['id']
 
 
-class IngredientSerializer(serializers.ModelSerializer):
+class IngredientSerializer(RecipeAttrSerializer):
     class Meta():
         model = models.Ingredient
         fields = ['id', 'name']
         read_only_fields = ['id']
 
 
-class RecipeSerializer(serializers.ModelSerializer):
-    ingredients = serializers.PrimaryKeyRelatedField(
+class TagCountSerializer(TagSerializer):
+    """Serializer for Tag objects with the number of recipes using them"""
+
+    class Meta(TagSerializer.Meta):
+        fields = ['id', 'name', 'recipe_count']
+        read_only_fields = ['id', 'recipe_count']
+
+
+class IngredientCountSerializer(IngredientSerializer):
+    """Serializer for Ingredient objects with their number of recipes"""
+
+    class Meta(IngredientSerializer.Meta):
+        fields = ['id', 'name', 'recipe_count']
+        read_only_fields = ['id', 'recipe_count']
+
+
+class NameListSerializer(serializers.Serializer):
+    """Serializer for a list of tag or ingredient names"""
+    names = serializers.ListField(
+        child=serializers.CharField(max_length=255),
+        allow_empty=False,
+    )
+
+    def validate_names(self, value):
+        """Validate the number of names"""
+        if len(value) > settings.RECIPE_BULK_MAX_ITEMS:
+            raise serializers.ValidationError(
+                f'At most {settings.RECIPE_BULK_MAX_ITEMS} names can be '
+                'sent at once.'
+            )
+        return value
+
+
+class PreloadedManyRelatedField(serializers.ManyRelatedField):
+    """Many related field loading the objects of all its ids at once"""
+
+    def to_internal_value(self, data):
+        queryset = self.child_relation.queryset
+        related_objects = self.context.setdefault('related_objects', {})
+        if queryset.model not in related_objects and isinstance(data, list):
+            # Form data sends the ids as strings
+            related_objects[queryset.model] = queryset.in_bulk({
+                int(pk) for pk in data
+                if isinstance(pk, int) or
+                isinstance(pk, str) and pk.isdecimal()
+            })
+        return super().to_internal_value(data)
+
+
+class PreloadedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """Primary key field that looks up the objects preloaded in context"""
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return PreloadedManyRelatedField(**list_kwargs)
+
+    def to_internal_value(self, data):
+        objects = self.context.get('related_objects', {}).get(
+            self.queryset.model
+        )
+        if objects is not None:
+            try:
+                return objects[int(data)]
+            except (KeyError, TypeError, ValueError):
+                pass
+
+        return super().to_internal_value(data)
+
+
+class RecipeListSerializer(serializers.ListSerializer):
+    """Serializer for validating and writing recipes in bulk"""
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            self._context['related_objects'] = self.load_related_objects(
+                data
+            )
+        return super().to_internal_value(data)
+
+    def load_related_objects(self, data):
+        """Return the related objects of every item, one query per model"""
+        related_objects = {}
+        for field_name in ('ingredients', 'tags'):
+            queryset = self.child.fields[field_name].child_relation.queryset
+            ids = set()
+            for item in data:
+                if isinstance(item, dict) and \
+                        isinstance(item.get(field_name), list):
+                    ids.update(
+                        pk for pk in item[field_name] if isinstance(pk, int)
+                    )
+            related_objects[queryset.model] = queryset.in_bulk(ids)
+
+        return related_objects
+
+    def create(self, validated_data):
+        return bulk.bulk_create_recipes(validated_data)
+
+    def update(self, instance, validated_data):
+        return bulk.bulk_update_recipes(instance, validated_data)
+
+
+class RecipeImagesMixin(serializers.Serializer):
+    """Serializer mixin exposing the urls of the recipe image variants"""
+    images = serializers.SerializerMethodField()
+
+    def get_images(self, recipe):
+        """Return the urls of the image and of its variants"""
+        return images.image_urls(
+            recipe.image.name,
+            recipe.image_status,
+            self.context.get('request')
+        )
+
+
+class RecipeSerializer(
+    SparseFieldsMixin,
+    TimedSerializerMixin,
+    RecipeImagesMixin,
+    serializers.ModelSerializer,
+):
+    ingredients = PreloadedPrimaryKeyRelatedField(
         queryset=models.Ingredient.objects.all(),
         many=True,
     )
-    tags = serializers.PrimaryKeyRelatedField(
+    tags = PreloadedPrimaryKeyRelatedField(
         queryset=models.Tag.objects.all(),
         many=True,
     )
@@ -37,9 +195,12 @@ class RecipeSerializer(serializers.ModelSerializer):
             'price',
             'ingredients',
             'tags',
-            'link'
+            'link',
+            'image_status',
+            'images'
         ]
-        read_only_fields = ['id']
+        read_only_fields = ['id', 'image_status']
+        list_serializer_class = RecipeListSerializer
 
     def validate_time_minutes(self, value):
         """Validate time_minutes field"""
@@ -60,10 +221,73 @@ class RecipeDetailSerializer(RecipeSerializer):
     tags = TagSerializer(many=True, read_only=True)
 
 
-class RecipeImageSerializer(serializers.ModelSerializer):
+class RecipeFilterSerializer(serializers.Serializer):
+    """Serializer for the range filters and ordering of the recipe list"""
+    ordering_fields = ['title', 'price', 'time_minutes']
+
+    min_price = serializers.DecimalField(
+        max_digits=6, decimal_places=2, min_value=0, required=False
+    )
+    max_price = serializers.DecimalField(
+        max_digits=6, decimal_places=2, min_value=0, required=False
+    )
+    min_time = serializers.IntegerField(min_value=0, required=False)
+    max_time = serializers.IntegerField(min_value=0, required=False)
+    ordering = serializers.CharField(required=False)
+
+    def validate_ordering(self, value):
+        """Validate the ordering is a list of distinct sortable fields"""
+        fields = [field.strip() for field in value.split(',')]
+        names = [field[1:] if field.startswith('-') else field
+                 for field in fields]
+
+        if any(name not in self.ordering_fields for name in names):
+            raise serializers.ValidationError(
+                f'Must be a comma separated list of: '
+                f'{", ".join(self.ordering_fields)}, optionally prefixed '
+                'with - for descending order.'
+            )
+        if len(set(names)) != len(names):
+            raise serializers.ValidationError('Fields cannot be repeated.')
+        return fields
+
+
+class RecipeImportSerializer(RecipeSerializer):
+    """Serializer for imported recipes, related by name instead of id"""
+    ingredients = serializers.ListField(
+        child=serializers.CharField(max_length=255),
+        required=False,
+    )
+    tags = serializers.ListField(
+        child=serializers.CharField(max_length=255),
+        required=False,
+    )
+
+    class Meta(RecipeSerializer.Meta):
+        fields = [
+            'title',
+            'time_minutes',
+            'price',
+            'ingredients',
+            'tags',
+            'link',
+        ]
+
+
+class RecipeImportFileSerializer(serializers.Serializer):
+    """Serializer for a file of recipes to import"""
+    file = serializers.FileField()
+    import_format = serializers.ChoiceField(
+        choices=['ndjson', 'csv'],
+        default='ndjson',
+    )
+    start = serializers.IntegerField(min_value=0, default=0)
+
+
+class RecipeImageSerializer(RecipeImagesMixin, serializers.ModelSerializer):
     """Serializer for uploading images to recipes"""
 
     class Meta:
         model = models.Recipe
-        fields = ['id', 'image']
-        read_only_fields = ['id']
+        fields = ['id', 'image', 'image_status', 'images']
+        read_only_fields = ['id', 'image_status']
@@ -0,0 +1,201 @@
+import threading
+from contextlib import contextmanager
+
+from django.db.models.signals import (
+    post_save, pre_delete, post_delete, m2m_changed,
+)
+from django.db.models import F
+from django.dispatch import receiver
+
+from recipe import counters
+from recipe.bulk import recipes_bulk_changed
+from recipe.cache import bump_user_version
+from recipe.models import Tag, Ingredient, Recipe
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Ingredient)
+@receiver(post_delete, sender=Recipe)
+def invalidate_user_responses(sender, instance, **kwargs):
+    """Invalidate the cached responses of the owner of the instance"""
+    bump_user_version(instance.user_id)
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def invalidate_user_responses_on_assign(sender, instance, action, **kwargs):
+    """Invalidate the cached responses when a recipe relation changes"""
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_user_version(instance.user_id)
+
+
+@receiver(recipes_bulk_changed)
+def invalidate_user_responses_on_bulk(sender, user_ids, **kwargs):
+    """Invalidate the cached responses of the users of bulk writes"""
+    for user_id in user_ids:
+        bump_user_version(user_id)
+
+
+_batch = threading.local()
+
+
+@contextmanager
+def batch_search_updates():
+    """Update the search vectors changed in the block once, at its end
+
+    Saving a recipe and setting each of its relations all change its
+    vector, in a batch it is computed once with all the changes.
+    """
+    if getattr(_batch, 'recipe_ids', None) is not None:
+        yield
+        return
+
+    recipe_ids = _batch.recipe_ids = set()
+    try:
+        yield
+    finally:
+        _batch.recipe_ids = None
+    if recipe_ids:
+        _update_search_vectors(recipe_ids)
+
+
+def _update_search_vectors(recipe_ids):
+    pending = getattr(_batch, 'recipe_ids', None)
+    if pending is not None:
+        pending.update(recipe_ids)
+    else:
+        Recipe.objects.filter(id__in=recipe_ids).update_search_vectors()
+
+
+@receiver(post_save, sender=Recipe)
+def update_recipe_search_vector(sender, instance, update_fields, **kwargs):
+    """Update the search vector of the recipe when its title changes"""
+    if update_fields is None or 'title' in update_fields:
+        _update_search_vectors([instance.id])
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+def update_search_vectors_on_rename(sender, instance, created,
+                                    update_fields, **kwargs):
+    """Update the search vectors of the recipes using a renamed object"""
+    if not created and (update_fields is None or 'name' in update_fields):
+        _update_search_vectors(
+            instance.recipes.values_list('id', flat=True)
+        )
+
+
+@receiver(pre_delete, sender=Tag)
+@receiver(pre_delete, sender=Ingredient)
+def collect_recipes_on_delete(sender, instance, **kwargs):
+    """Remember the recipes of the object, their relations are deleted"""
+    instance._search_recipe_ids = list(
+        instance.recipes.values_list('id', flat=True)
+    )
+
+
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Ingredient)
+def update_search_vectors_on_delete(sender, instance, **kwargs):
+    """Update the search vectors of the recipes that used the object"""
+    recipe_ids = getattr(instance, '_search_recipe_ids', None)
+    if recipe_ids:
+        _update_search_vectors(recipe_ids)
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def update_search_vectors_on_assign(sender, instance, action, reverse,
+                                    pk_set, **kwargs):
+    """Update the search vectors of the recipes whose relations changed"""
+    if action == 'pre_clear' and reverse:
+        collect_recipes_on_delete(sender, instance)
+    elif action in ('post_add', 'post_remove') and reverse:
+        _update_search_vectors(pk_set)
+    elif action == 'post_clear' and reverse:
+        update_search_vectors_on_delete(sender, instance)
+    elif action in ('post_add', 'post_remove', 'post_clear'):
+        _update_search_vectors([instance.id])
+
+
+@receiver(recipes_bulk_changed)
+def update_search_vectors_on_bulk(sender, recipe_ids, **kwargs):
+    """Update the search vectors of the recipes written in bulk"""
+    if recipe_ids:
+        _update_search_vectors(recipe_ids)
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def update_recipe_counts_on_assign(sender, instance, action, reverse, model,
+                                   pk_set, **kwargs):
+    """Update the recipe counts of the objects assigned or removed
+
+    Removals are counted before the rows are deleted, as the ids given
+    may not all be assigned. The counts change in the transaction of the
+    relation change.
+    """
+    if reverse:
+        objects = type(instance).objects.filter(pk=instance.pk)
+        if action == 'post_add':
+            objects.update(recipe_count=F('recipe_count') + len(pk_set))
+        elif action == 'pre_remove':
+            removed = instance.recipes.filter(pk__in=pk_set).count()
+            objects.update(recipe_count=F('recipe_count') - removed)
+        elif action == 'pre_clear':
+            objects.update(recipe_count=0)
+    elif action == 'post_add':
+        model.objects.filter(pk__in=pk_set).update(
+            recipe_count=F('recipe_count') + 1
+        )
+    elif action in ('pre_remove', 'pre_clear'):
+        objects = model.objects.filter(recipes=instance)
+        if action == 'pre_remove':
+            objects = objects.filter(pk__in=pk_set)
+        objects.update(recipe_count=F('recipe_count') - 1)
+
+
+_deleting = threading.local()
+
+
+@contextmanager
+def batch_recipe_deletes(recipe_ids):
+    """Update the recipe counts once for the recipes deleted in the block
+
+    Each deleted recipe updates the counts of its tags and ingredients,
+    in a batch they are read before the block and updated once per
+    number of deleted recipes.
+    """
+    counts = {
+        model: counters.recipe_counts(model, recipe_ids)
+        for model in (Tag, Ingredient)
+    }
+    _deleting.recipe_ids = set(recipe_ids)
+    try:
+        yield
+    finally:
+        _deleting.recipe_ids = None
+    for model, model_counts in counts.items():
+        counters.add_recipe_counts(model, model_counts, -1)
+
+
+@receiver(pre_delete, sender=Recipe)
+def update_recipe_counts_on_delete(sender, instance, **kwargs):
+    """Update the recipe counts of the objects the recipe used"""
+    if instance.pk in (getattr(_deleting, 'recipe_ids', None) or ()):
+        return
+
+    for model in (Tag, Ingredient):
+        model.objects.filter(recipes=instance).update(
+            recipe_count=F('recipe_count') - 1
+        )
+
+
+@receiver(recipes_bulk_changed)
+def update_recipe_counts_on_bulk(sender, recipe_counts, **kwargs):
+    """Apply the changes of the recipe counts of the bulk writes"""
+    for model, counts in recipe_counts.items():
+        counters.add_recipe_counts(model, counts)
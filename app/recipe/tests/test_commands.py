@@ -0,0 +1,299 @@
+import json
+import os
+import tempfile
+from collections import Counter
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection, connections
+from django.test import LiveServerTestCase, TestCase, override_settings
+
+from recipe.models import Recipe, Tag, Ingredient
+from recipe.seeding import seed_recipes
+
+
+class ExplainQueriesCommandTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@gotmail.com',
+            'testpass'
+        )
+        recipe = Recipe.objects.create(
+            user=self.user, title='Test Recipe', time_minutes=5, price=5.00
+        )
+        recipe.tags.add(Tag.objects.create(user=self.user, name='Tag'))
+        recipe.ingredients.add(
+            Ingredient.objects.create(user=self.user, name='Ingredient')
+        )
+        if connection.vendor == 'postgresql':
+            # The benchmarks analyze the tables, after which a sequential
+            # scan is cheaper for the single row than any index
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def test_explain_hot_queries(self):
+        """Test every hot query is explained and its index usage reported"""
+        out = StringIO()
+        call_command('explain_queries', self.user.email, stdout=out)
+
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 9)
+        self.assertTrue(lines[0].startswith('tag list: '))
+        self.assertIn('recipe list: index scan', out.getvalue())
+
+    def test_explain_unknown_user(self):
+        """Test the command fails for an unknown user"""
+        with self.assertRaises(CommandError):
+            call_command('explain_queries', 'other@gotmail.com')
+
+
+class BenchmarkRecipeFiltersCommandTests(TestCase):
+
+    def test_benchmark_rolls_back_seeded_data(self):
+        """Test every strategy is reported and the seed is rolled back"""
+        out = StringIO()
+        call_command(
+            'benchmark_recipe_filters', recipes=20, tags=5, repeat=1,
+            stdout=out
+        )
+
+        self.assertIn('exists (any):', out.getvalue())
+        self.assertIn('having (all):', out.getvalue())
+        self.assertFalse(Recipe.objects.exists())
+        self.assertFalse(get_user_model().objects.exists())
+
+
+class BenchmarkAssignedOnlyCommandTests(TestCase):
+
+    def test_benchmark_rolls_back_seeded_data(self):
+        """Test every strategy is reported and the seed is rolled back"""
+        out = StringIO()
+        call_command(
+            'benchmark_assigned_only', recipes=20, other_recipes=10, tags=5,
+            unused_tags=2, repeat=1, stdout=out
+        )
+
+        self.assertIn('join: 60 rows, 5 distinct', out.getvalue())
+        self.assertIn('exists: 5 rows, 5 distinct', out.getvalue())
+        self.assertIn('recipe count: 5 rows', out.getvalue())
+        self.assertFalse(Tag.objects.exists())
+        self.assertFalse(get_user_model().objects.exists())
+
+
+class BenchmarkRecipeRangesCommandTests(TestCase):
+
+    def test_benchmark_reports_growth(self):
+        """Test every query is timed on each size and rolled back"""
+        out = StringIO()
+        call_command(
+            'benchmark_recipe_ranges', sizes='10,20', repeat=1, stdout=out
+        )
+
+        self.assertIn('10 recipes, cheapest first:', out.getvalue())
+        self.assertIn('20 recipes, cheapest first:', out.getvalue())
+        self.assertIn('the previous size', out.getvalue())
+        self.assertFalse(Recipe.objects.exists())
+
+
+class BenchmarkRecipeSerializersCommandTests(TestCase):
+
+    def test_benchmark_compares_paths(self):
+        """Test both read paths are timed and the seed is rolled back"""
+        out = StringIO()
+        call_command(
+            'benchmark_recipe_serializers', recipes=10, repeat=1, stdout=out
+        )
+
+        self.assertIn('serializer:', out.getvalue())
+        self.assertIn('fast path speed-up:', out.getvalue())
+        self.assertFalse(Recipe.objects.exists())
+
+
+class SeedDataCommandTests(TestCase):
+
+    def test_seed_data(self):
+        """Test each seeded user gets its recipes, tags and ingredients"""
+        call_command(
+            'seed_data', users=2, recipes=10, tags=4, ingredients=6,
+            stdout=StringIO()
+        )
+
+        users = get_user_model().objects.all()
+        self.assertEqual(users.count(), 2)
+        for user in users:
+            self.assertTrue(user.check_password('seedpass'))
+            self.assertEqual(Recipe.objects.filter(user=user).count(), 10)
+            self.assertEqual(Tag.objects.filter(user=user).count(), 4)
+            self.assertEqual(Ingredient.objects.filter(user=user).count(), 6)
+        self.assertEqual(Recipe.tags.through.objects.count(), 2 * 10 * 3)
+
+    def test_seed_data_adds_users(self):
+        """Test seeding again adds new users"""
+        call_command('seed_data', users=1, recipes=1, stdout=StringIO())
+        call_command('seed_data', users=1, recipes=1, stdout=StringIO())
+
+        self.assertEqual(get_user_model().objects.count(), 2)
+
+    def test_skewed_tags(self):
+        """Test the first tags are used by most recipes with a skew"""
+        user = get_user_model().objects.create_user('test@gotmail.com')
+        seed_recipes(
+            user, 200, tags=10, ingredients=0, tags_per_recipe=1, seed=0,
+            skew=2
+        )
+
+        uses = Counter(
+            Recipe.tags.through.objects.values_list('tag__name', flat=True)
+        )
+        self.assertEqual(uses.most_common(1)[0][0], 'Tag 0')
+        self.assertGreater(uses['Tag 0'], 200 / 2)
+
+
+class RepairRecipeCountsCommandTests(TestCase):
+
+    def test_repair_recipe_counts(self):
+        """Test the counts that drifted are recomputed"""
+        user = get_user_model().objects.create_user('test@gotmail.com')
+        seed_recipes(user, 10, tags=3, ingredients=4, seed=0)
+        Tag.objects.update(recipe_count=0)
+        Ingredient.objects.filter(name='Ingredient 0').update(recipe_count=99)
+
+        out = StringIO()
+        call_command('repair_recipe_counts', batch_size=2, stdout=out)
+
+        self.assertIn('Repaired 3 tag counts', out.getvalue())
+        self.assertIn('Repaired 1 ingredient counts', out.getvalue())
+        self.assertEqual(
+            sum(Tag.objects.values_list('recipe_count', flat=True)), 10 * 3
+        )
+        self.assertEqual(
+            sum(Ingredient.objects.values_list('recipe_count', flat=True)),
+            10 * 4
+        )
+
+
+class BenchmarkApiCommandTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user('test@gotmail.com')
+        seed_recipes(self.user, 20, tags=5, ingredients=10, seed=0)
+
+    def test_benchmark_api(self):
+        """Test every scenario succeeds, is saved and rolled back"""
+        out = StringIO()
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'results.json')
+            call_command(
+                'benchmark_api', requests=3, warmup=1, output=output,
+                stdout=out
+            )
+            with open(output) as file:
+                results = json.load(file)
+
+        self.assertEqual(results['user'], self.user.email)
+        self.assertEqual(len(results['scenarios']), 6)
+        for summary in results['scenarios'].values():
+            self.assertEqual(summary['requests'], 3)
+            self.assertEqual(summary['errors'], 0)
+            self.assertLessEqual(summary['p50'], summary['p99'])
+        self.assertIn('upload-image: 3 requests', out.getvalue())
+        self.assertEqual(Recipe.objects.count(), 20)
+        self.assertFalse(Recipe.objects.exclude(image='').exists())
+
+    def test_benchmark_api_compare(self):
+        """Test the results are compared with a previous run"""
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'results.json')
+            call_command(
+                'benchmark_api', scenarios='tag-list', requests=2,
+                warmup=0, output=output, stdout=StringIO()
+            )
+            out = StringIO()
+            call_command(
+                'benchmark_api', scenarios='tag-list', requests=2,
+                warmup=0, compare=output, stdout=out
+            )
+
+        self.assertIn('vs baseline: p50 ', out.getvalue())
+
+    def test_benchmark_api_unknown_scenario(self):
+        """Test the command fails for an unknown scenario"""
+        with self.assertRaises(CommandError):
+            call_command('benchmark_api', scenarios='tag-delete')
+
+
+class BenchmarkApiServerCommandTests(LiveServerTestCase):
+
+    def setUp(self):
+        # The server threads would keep their connections open otherwise
+        patcher = patch.dict(connections.databases['default'],
+                             {'CONN_MAX_AGE': 0})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_benchmark_api_server(self):
+        """Test the requests are sent to the server and cleaned up"""
+        user = get_user_model().objects.create_user('test@gotmail.com')
+        seed_recipes(user, 5, tags=2, ingredients=2, seed=0)
+
+        Recipe.objects.filter(user=user).update(title='Benchmark recipe')
+
+        out = StringIO()
+        with tempfile.TemporaryDirectory() as media_root, \
+                override_settings(MEDIA_ROOT=media_root,
+                                  RECIPE_IMAGE_WORKERS=0):
+            call_command(
+                'benchmark_api', url=self.live_server_url,
+                email=user.email,
+                scenarios='recipe-detail,recipe-create,upload-image',
+                requests=4, warmup=1, concurrency=1, stdout=out
+            )
+
+            self.assertEqual(os.listdir(os.path.join(
+                media_root, 'uploads', 'recipe'
+            )), [])
+
+        self.assertIn('recipe-detail: 4 requests, 0 errors', out.getvalue())
+        self.assertIn('recipe-create: 4 requests, 0 errors', out.getvalue())
+        self.assertIn('upload-image: 4 requests, 0 errors', out.getvalue())
+        # The recipes of the user are left as they were
+        self.assertEqual(Recipe.objects.count(), 5)
+        self.assertFalse(Recipe.objects.exclude(image='').exists())
+
+    def test_benchmark_api_server_requires_email(self):
+        """Test the user must be given to send requests to a server"""
+        with self.assertRaises(CommandError):
+            call_command('benchmark_api', url=self.live_server_url)
+
+
+class ProcessRecipeImagesCommandTests(TestCase):
+
+    @patch('recipe.management.commands.process_recipe_images.'
+           'process_recipe_image')
+    def test_process_pending_images(self, process):
+        """Test only the pending images are processed by default"""
+        user = get_user_model().objects.create_user('test@gotmail.com', 'pw')
+        pending = Recipe.objects.create(
+            user=user, title='Pending', time_minutes=5, price=5.00,
+            image_status=Recipe.IMAGE_PENDING
+        )
+        failed = Recipe.objects.create(
+            user=user, title='Failed', time_minutes=5, price=5.00,
+            image_status=Recipe.IMAGE_FAILED
+        )
+
+        call_command('process_recipe_images', stdout=StringIO())
+        process.assert_called_once_with(pending.id)
+
+        process.reset_mock()
+        call_command(
+            'process_recipe_images', retry_failed=True, stdout=StringIO()
+        )
+        self.assertEqual(
+            sorted(call[0][0] for call in process.call_args_list),
+            [pending.id, failed.id]
+        )
@@ -0,0 +1,134 @@
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.shortcuts import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from recipe.models import Tag, Ingredient, Recipe
+
+
+RECIPE_LIST_URL = reverse('recipe:recipe-list')
+RECIPE_BULK_URL = reverse('recipe:recipe-bulk-create')
+
+
+def sample_recipe(user, title='Recipe'):
+    return Recipe.objects.create(
+        user=user, title=title, time_minutes=10, price=5.00
+    )
+
+
+def recipe_counts(model):
+    return dict(model.objects.values_list('name', 'recipe_count'))
+
+
+class RecipeCountTests(TestCase):
+    """Test the recipe counts of tags and ingredients are kept up to date"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='test@gotmail.com',
+            password='testpass',
+            name='Test Name'
+        )
+        self.tag1 = Tag.objects.create(user=self.user, name='Tag1')
+        self.tag2 = Tag.objects.create(user=self.user, name='Tag2')
+        self.recipe1 = sample_recipe(self.user, 'Recipe1')
+        self.recipe2 = sample_recipe(self.user, 'Recipe2')
+
+    def test_add_and_remove_tags(self):
+        """Test assigning and removing tags of a recipe"""
+        self.recipe1.tags.add(self.tag1, self.tag2)
+        self.recipe1.tags.add(self.tag1)
+        self.recipe2.tags.add(self.tag1)
+        self.assertEqual(recipe_counts(Tag), {'Tag1': 2, 'Tag2': 1})
+
+        self.recipe2.tags.remove(self.tag1, self.tag2)
+        self.assertEqual(recipe_counts(Tag), {'Tag1': 1, 'Tag2': 1})
+
+        self.recipe1.tags.clear()
+        self.assertEqual(recipe_counts(Tag), {'Tag1': 0, 'Tag2': 0})
+
+    def test_set_tags(self):
+        """Test replacing the tags of a recipe"""
+        self.recipe1.tags.set([self.tag1])
+        self.recipe1.tags.set([self.tag2])
+
+        self.assertEqual(recipe_counts(Tag), {'Tag1': 0, 'Tag2': 1})
+
+    def test_add_and_remove_recipes(self):
+        """Test assigning and removing recipes from the tag side"""
+        self.tag1.recipes.add(self.recipe1, self.recipe2)
+        self.tag1.recipes.remove(self.recipe1, sample_recipe(self.user))
+        self.assertEqual(recipe_counts(Tag), {'Tag1': 1, 'Tag2': 0})
+
+        self.tag1.recipes.clear()
+        self.assertEqual(recipe_counts(Tag), {'Tag1': 0, 'Tag2': 0})
+
+    def test_delete_recipe(self):
+        """Test deleting a recipe decrements the counts it used"""
+        ingredient = Ingredient.objects.create(user=self.user, name='Salt')
+        self.recipe1.tags.add(self.tag1)
+        self.recipe1.ingredients.add(ingredient)
+        self.recipe2.tags.add(self.tag1)
+
+        self.recipe1.delete()
+
+        self.assertEqual(recipe_counts(Tag), {'Tag1': 1, 'Tag2': 0})
+        self.assertEqual(recipe_counts(Ingredient), {'Salt': 0})
+
+    def test_bulk_api(self):
+        """Test the recipes created, updated and deleted in bulk"""
+        client = APIClient()
+        client.force_authenticate(self.user)
+        payload = [
+            {'title': f'Bulk {i}', 'time_minutes': 10, 'price': '5.00',
+             'tags': [self.tag1.id], 'ingredients': []}
+            for i in range(2)
+        ]
+
+        res = client.post(RECIPE_BULK_URL, payload, format='json')
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(recipe_counts(Tag), {'Tag1': 2, 'Tag2': 0})
+
+        ids = [recipe['id'] for recipe in res.data]
+        res = client.patch(RECIPE_BULK_URL, [
+            {'id': ids[0], 'tags': [self.tag2.id]}
+        ], format='json')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(recipe_counts(Tag), {'Tag1': 1, 'Tag2': 1})
+
+        res = client.delete(f'{RECIPE_BULK_URL}?ids={ids[0]},{ids[1]}')
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(recipe_counts(Tag), {'Tag1': 0, 'Tag2': 0})
+
+    def test_bulk_api_updates_only_related(self):
+        """Test bulk writes only change the counts of the related objects"""
+        Tag.objects.filter(pk=self.tag2.pk).update(recipe_count=7)
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        res = client.post(RECIPE_BULK_URL, [
+            {'title': 'Bulk', 'time_minutes': 10, 'price': '5.00',
+             'tags': [self.tag1.id, self.tag1.id], 'ingredients': []}
+        ], format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(recipe_counts(Tag), {'Tag1': 1, 'Tag2': 7})
+
+    def test_create_recipe_api(self):
+        """Test creating and updating a recipe through the API"""
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        res = client.post(RECIPE_LIST_URL, {
+            'title': 'New', 'time_minutes': 10, 'price': '5.00',
+            'tags': [self.tag1.id, self.tag2.id], 'ingredients': [],
+        }, format='json')
+        self.assertEqual(recipe_counts(Tag), {'Tag1': 1, 'Tag2': 1})
+
+        client.patch(
+            reverse('recipe:recipe-detail', args=[res.data['id']]),
+            {'tags': [self.tag2.id]}, format='json'
+        )
+        self.assertEqual(recipe_counts(Tag), {'Tag1': 0, 'Tag2': 1})
@@ -0,0 +1,120 @@
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from django.shortcuts import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from recipe.models import Recipe, Tag, Ingredient
+
+
+RECIPE_LIST_URL = reverse('recipe:recipe-list')
+
+
+def recipe_detail_url(id):
+    return reverse('recipe:recipe-detail', args=[id])
+
+
+class FastReadPathTests(TestCase):
+    """Test the fast read path responds exactly like the serializers"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@gotmail.com',
+            'testpass'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        tags = [
+            Tag.objects.create(user=self.user, name=name)
+            for name in ['Vegan', 'Dinner', 'Quick']
+        ]
+        ingredients = [
+            Ingredient.objects.create(user=self.user, name=name)
+            for name in ['Rice', 'Chickpeas', 'Salt']
+        ]
+        self.recipes = []
+        for i, (title, price) in enumerate([
+            ('Curry', 7.5), ('Toast', 1), ('Stew', 1234.56), ('Salad', 5),
+        ]):
+            recipe = Recipe.objects.create(
+                user=self.user, title=title, time_minutes=10 * i, price=price,
+                link=f'https://example.com/{i}' if i % 2 else ''
+            )
+            recipe.tags.add(*reversed(tags[:i]))
+            recipe.ingredients.add(*reversed(ingredients[i % 2:]))
+            self.recipes.append(recipe)
+
+        Recipe.objects.filter(id=self.recipes[0].id).update(
+            image='uploads/recipe/curry.jpg', image_status=Recipe.IMAGE_READY
+        )
+        Recipe.objects.filter(id=self.recipes[1].id).update(
+            image='uploads/recipe/toast.png',
+            image_status=Recipe.IMAGE_PENDING
+        )
+
+    def assertSameResponses(self, url, params=None):
+        """Assert both paths respond the same with the same queries"""
+        responses = []
+        for fast in (False, True):
+            with override_settings(RECIPE_FAST_READ=fast), \
+                    CaptureQueriesContext(connection) as context:
+                res = self.client.get(url, params)
+            responses.append(
+                (res.status_code, res.content, len(context.captured_queries))
+            )
+
+        self.assertEqual(responses[1], responses[0])
+        return responses[0][:2]
+
+    def test_list_same_as_serializer(self):
+        """Test the list matches the serializer for each parameter"""
+        for params in [
+            {},
+            {'fields': 'id,title'},
+            {'exclude': 'tags,images'},
+            {'ordering': '-price'},
+            {'search': 'stew'},
+            {'tags': Tag.objects.first().id, 'max_price': '10'},
+            {'page_size': 2},
+        ]:
+            with self.subTest(params=params):
+                status_code, content = self.assertSameResponses(
+                    RECIPE_LIST_URL, params
+                )
+                self.assertEqual(status_code, status.HTTP_200_OK)
+
+    def test_next_page_same_as_serializer(self):
+        """Test the cursors of both paths point to the same pages"""
+        with override_settings(RECIPE_FAST_READ=True):
+            next_url = self.client.get(
+                RECIPE_LIST_URL, {'page_size': 2, 'ordering': 'price'}
+            ).data['next']
+
+        self.assertSameResponses(next_url)
+
+    def test_detail_same_as_serializer(self):
+        """Test the detail matches the serializer"""
+        for recipe in self.recipes:
+            with self.subTest(recipe=recipe.title):
+                self.assertSameResponses(recipe_detail_url(recipe.id))
+
+        self.assertSameResponses(
+            recipe_detail_url(self.recipes[2].id), {'fields': 'tags,price'}
+        )
+
+    def test_detail_of_other_user_not_found(self):
+        """Test the fast path does not return other users recipes"""
+        other = get_user_model().objects.create_user(
+            'other@gotmail.com', 'testpass'
+        )
+        recipe = Recipe.objects.create(
+            user=other, title='Other', time_minutes=5, price=5
+        )
+
+        status_code, _ = self.assertSameResponses(recipe_detail_url(recipe.id))
+
+        self.assertEqual(status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,121 @@
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.shortcuts import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from recipe.models import Recipe, Tag, Ingredient
+
+
+RECIPE_LIST_URL = reverse('recipe:recipe-list')
+TAG_LIST_URL = reverse('recipe:tag-list')
+
+
+def recipe_detail_url(id):
+    return reverse('recipe:recipe-detail', args=[id])
+
+
+class SparseFieldsetTests(TestCase):
+    """Tests for the fields and exclude parameters of the list endpoints"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            'test@gotmail.com',
+            'testpass'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        for i in range(3):
+            recipe = Recipe.objects.create(
+                user=self.user, title=f'Recipe {i}', time_minutes=5, price=5
+            )
+            recipe.tags.add(Tag.objects.create(user=self.user, name=f'T{i}'))
+            recipe.ingredients.add(
+                Ingredient.objects.create(user=self.user, name=f'I{i}')
+            )
+
+    def test_list_requested_fields(self):
+        """Test only the requested fields are sent and queried"""
+        with self.assertNumQueries(1) as context:
+            res = self.client.get(RECIPE_LIST_URL, {'fields': 'id,title'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data['results'][0], {'id': Recipe.objects.first().id,
+                                     'title': 'Recipe 0'}
+        )
+        self.assertNotIn('"price"', context.captured_queries[0]['sql'])
+
+    def test_list_excluded_fields(self):
+        """Test the excluded relations are not sent nor prefetched"""
+        with self.assertNumQueries(2):
+            res = self.client.get(
+                RECIPE_LIST_URL, {'exclude': 'ingredients,images'}
+            )
+
+        self.assertEqual(
+            list(res.data['results'][0]),
+            ['id', 'title', 'time_minutes', 'price', 'tags', 'link',
+             'image_status']
+        )
+
+    def test_detail_requested_fields(self):
+        """Test the detail sends the requested nested relation only"""
+        recipe = Recipe.objects.first()
+
+        with self.assertNumQueries(2):
+            res = self.client.get(
+                recipe_detail_url(recipe.id), {'fields': 'title,tags'}
+            )
+
+        self.assertEqual(res.data['title'], recipe.title)
+        self.assertEqual(res.data['tags'][0]['name'], 'T0')
+        self.assertNotIn('ingredients', res.data)
+
+    def test_fields_read_by_method_fields_loaded(self):
+        """Test the images are sent from the columns they need"""
+        with self.assertNumQueries(1):
+            res = self.client.get(RECIPE_LIST_URL, {'fields': 'images'})
+
+        self.assertEqual(res.data['results'][0], {'images': None})
+
+    def test_paginated_sparse_list(self):
+        """Test the ordering fields are loaded for the next cursor"""
+        res = self.client.get(
+            RECIPE_LIST_URL,
+            {'fields': 'id', 'ordering': '-price', 'page_size': 2}
+        )
+        res = self.client.get(res.data['next'])
+
+        self.assertEqual(len(res.data['results']), 1)
+
+    def test_tag_list_requested_fields(self):
+        """Test the attr lists accept the fields parameter"""
+        res = self.client.get(TAG_LIST_URL, {'fields': 'name'})
+
+        self.assertEqual(
+            res.data['results'], [{'name': f'T{i}'} for i in range(3)]
+        )
+
+    def test_unknown_fields(self):
+        """Test requesting unknown fields fails"""
+        res = self.client.get(RECIPE_LIST_URL, {'exclude': 'user'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('exclude', res.data)
+
+    def test_fields_ignored_on_create(self):
+        """Test the fields parameter does not limit the writes"""
+        res = self.client.post(
+            f'{RECIPE_LIST_URL}?fields=id',
+            {'title': 'New', 'time_minutes': 5, 'price': '5.00',
+             'tags': [], 'ingredients': []},
+            format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data['title'], 'New')
@@ -9,6 +9,7 @@ from recipe.models import Ingredient, Recipe
 from recipe.serializers import IngredientSerializer
 
 INGREDIENT_LIST_URL = reverse('recipe:ingredient-list')
+INGREDIENT_ENSURE_URL = reverse('recipe:ingredient-ensure')
 
 
 class PublicIngredientApiTests(TestCase):
@@ -46,7 +47,7 @@ class PrivateIngredientApiTests(TestCase):
         res = self.client.get(INGREDIENT_LIST_URL)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_retrieve_authenticated_user_ingredients_only(self):
         """Test that only the authenticated user ingredients are retrieved"""
@@ -59,8 +60,8 @@ class PrivateIngredientApiTests(TestCase):
         Ingredient.objects.create(name="Test Ing2", user=user2)
         res = self.client.get(INGREDIENT_LIST_URL)
 
-        self.assertEqual(len(res.data), 1)
-        self.assertEqual(res.data[0]['name'], ing.name)
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertEqual(res.data['results'][0]['name'], ing.name)
 
     def test_create_ingredient_successful(self):
         """Test the user can create an ingredient"""
@@ -113,12 +114,12 @@ class PrivateIngredientApiTests(TestCase):
 
         res = self.client.get(INGREDIENT_LIST_URL, {'assigned_only': 1})
 
-        self.assertEqual(len(res.data), 2)
-        self.assertIn(serializer1.data, res.data)
-        self.assertIn(serializer2.data, res.data)
-        self.assertNotIn(serializer3.data, res.data)
+        self.assertEqual(len(res.data['results']), 2)
+        self.assertIn(serializer1.data, res.data['results'])
+        self.assertIn(serializer2.data, res.data['results'])
+        self.assertNotIn(serializer3.data, res.data['results'])
 
-    def ingredients_assigned_unique(self):
+    def test_retrieve_ingredients_assigned_unique(self):
         """Test filtering ingredients by assigned returns unique items"""
         ingredient1 = Ingredient.objects.create(user=self.user, name="Ing1")
         Ingredient.objects.create(user=self.user, name="Ing2")
@@ -140,4 +141,40 @@ class PrivateIngredientApiTests(TestCase):
 
         res = self.client.get(INGREDIENT_LIST_URL, {'assigned_only': 1})
 
-        self.assertEqual(len(res.data), 1)
+        self.assertEqual(len(res.data['results']), 1)
+
+    def test_retrieve_ingredients_with_recipe_count(self):
+        """Test the recipe counts are sent only when requested"""
+        ingredient = Ingredient.objects.create(user=self.user, name='Salt')
+        recipe = Recipe.objects.create(
+            user=self.user,
+            title='Test Recipe',
+            price=1.0,
+            time_minutes=10,
+        )
+        recipe.ingredients.add(ingredient)
+
+        res = self.client.get(INGREDIENT_LIST_URL, {'recipe_count': 1})
+        self.assertEqual(res.data['results'], [
+            {'id': ingredient.id, 'name': 'Salt', 'recipe_count': 1},
+        ])
+
+        recipe.delete()
+        res = self.client.get(INGREDIENT_LIST_URL, {'recipe_count': 1})
+        self.assertEqual(res.data['results'][0]['recipe_count'], 0)
+
+    def test_ensure_ingredients(self):
+        """Test ensuring ingredients returns the ids of every name"""
+        ingredient = Ingredient.objects.create(user=self.user, name='Salt')
+
+        res = self.client.post(
+            INGREDIENT_ENSURE_URL,
+            {'names': ['Salt', 'Pepper']},
+            format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data[0]['id'], ingredient.id)
+        self.assertTrue(Ingredient.objects.filter(
+            user=self.user, name='Pepper', id=res.data[1]['id']
+        ).exists())
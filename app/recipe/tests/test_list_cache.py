@@ -0,0 +1,129 @@
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.shortcuts import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from recipe.models import Tag, Ingredient, Recipe
+
+
+TAG_LIST_URL = reverse('recipe:tag-list')
+INGREDIENT_LIST_URL = reverse('recipe:ingredient-list')
+
+
+def result_names(res):
+    return [item['name'] for item in res.data['results']]
+
+
+class ListCacheTests(TestCase):
+    """Test the cached responses of the tag and ingredient lists"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email='test@gotmail.com',
+            password='testpass',
+            name='Test Name'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_list_served_from_cache(self):
+        """Test an unchanged list is not queried again"""
+        Tag.objects.create(user=self.user, name='Tag1')
+        self.client.get(TAG_LIST_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(TAG_LIST_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(result_names(res), ['Tag1'])
+
+    def test_list_invalidated_on_change(self):
+        """Test the list is recomputed after the user data changes"""
+        tag = Tag.objects.create(user=self.user, name='Tag1')
+        self.client.get(TAG_LIST_URL)
+
+        self.client.post(TAG_LIST_URL, {'name': 'Tag2'})
+        self.assertEqual(
+            result_names(self.client.get(TAG_LIST_URL)), ['Tag1', 'Tag2']
+        )
+
+        tag.delete()
+        self.assertEqual(
+            result_names(self.client.get(TAG_LIST_URL)), ['Tag2']
+        )
+
+    def test_assigned_only_invalidated_on_assign(self):
+        """Test assigning an ingredient to a recipe updates the list"""
+        ingredient = Ingredient.objects.create(user=self.user, name='Ing1')
+        recipe = Recipe.objects.create(
+            user=self.user, title='Recipe', time_minutes=5, price=5.00
+        )
+        params = {'assigned_only': 1}
+        self.assertEqual(
+            result_names(self.client.get(INGREDIENT_LIST_URL, params)), []
+        )
+
+        recipe.ingredients.add(ingredient)
+        self.assertEqual(
+            result_names(self.client.get(INGREDIENT_LIST_URL, params)),
+            ['Ing1']
+        )
+
+        ingredient.recipes.clear()
+        self.assertEqual(
+            result_names(self.client.get(INGREDIENT_LIST_URL, params)), []
+        )
+
+    def test_list_cached_per_user(self):
+        """Test the cached list of a user is not returned to others"""
+        Tag.objects.create(user=self.user, name='Tag1')
+        self.client.get(TAG_LIST_URL)
+
+        other = get_user_model().objects.create_user(
+            'other@gotmail.com', 'testpass'
+        )
+        self.client.force_authenticate(other)
+
+        self.assertEqual(result_names(self.client.get(TAG_LIST_URL)), [])
+
+    def test_not_modified(self):
+        """Test a request with the current ETag returns 304"""
+        Tag.objects.create(user=self.user, name='Tag1')
+        etag = self.client.get(TAG_LIST_URL)['ETag']
+
+        with self.assertNumQueries(0):
+            res = self.client.get(TAG_LIST_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertFalse(res.content)
+
+    def test_not_modified_weak_etag(self):
+        """Test the weak ETag of a compressed list also returns 304"""
+        res = self.client.get(TAG_LIST_URL, HTTP_ACCEPT_ENCODING='gzip')
+        etag = f'W/{res["ETag"]}'
+
+        res = self.client.get(TAG_LIST_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_etag_changes_with_data(self):
+        """Test the ETag of the list changes when the data changes"""
+        etag = self.client.get(TAG_LIST_URL)['ETag']
+        Tag.objects.create(user=self.user, name='Tag1')
+
+        res = self.client.get(TAG_LIST_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res['ETag'], etag)
+
+    def test_etag_depends_on_query_params(self):
+        """Test lists with different parameters have different ETags"""
+        etag = self.client.get(TAG_LIST_URL)['ETag']
+
+        res = self.client.get(TAG_LIST_URL, {'assigned_only': 1})
+
+        self.assertNotEqual(res['ETag'], etag)
@@ -1,7 +1,9 @@
+from django.db import connection
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from unittest.mock import patch
 from recipe import models
+from recipe.seeding import seed_recipes
 
 
 def sample_user(email='test@gotmail.com', password='testpass', name='Name'):
@@ -53,3 +55,56 @@ class ModelTest(TestCase):
         filepath = models.recipe_image_file_path(None, 'myimage.jpg')
 
         self.assertEqual(filepath, f'uploads/recipe/{uuid}.jpg')
+
+
+class AssignedQuerySetTest(TestCase):
+
+    def setUp(self):
+        self.user = sample_user()
+
+    def explain_assigned(self, model):
+        """Return the plan of the first page of the assigned objects
+
+        Postgres scans tables this small sequentially, so scans are
+        disabled to get the plan of large accounts.
+        """
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        return model.objects.filter(user=self.user).assigned().order_by(
+            'name', 'id'
+        ).only('id', 'name')[:50].explain()
+
+    def test_assigned_unique(self):
+        """Test the assigned objects are each listed once"""
+        tag = sample_tag(self.user, 'Used')
+        sample_tag(self.user, 'Unused')
+        for title in ('Recipe1', 'Recipe2'):
+            models.Recipe.objects.create(
+                user=self.user, title=title, time_minutes=5, price=5.00
+            ).tags.add(tag)
+
+        self.assertEqual(list(models.Tag.objects.assigned()), [tag])
+
+    def test_assigned_semi_join(self):
+        """Test the relation is probed with EXISTS instead of joined"""
+        sql = str(models.Ingredient.objects.assigned().query)
+
+        self.assertIn('EXISTS', sql)
+        self.assertNotIn('JOIN', sql)
+
+    def test_assigned_plan(self):
+        """Test the relation is read from its index only"""
+        seed_recipes(self.user, 100, tags=10, ingredients=20, seed=0)
+        sample_tag(self.user, 'Unused')
+
+        for model in (models.Tag, models.Ingredient):
+            plan = self.explain_assigned(model)
+            through = model.recipes.rel.through._meta.db_table
+
+            if connection.vendor == 'postgresql':
+                self.assertIn('Index Only Scan', plan)
+                self.assertNotIn(f'Seq Scan on {through}', plan)
+            else:
+                self.assertIn('SEARCH U0 USING COVERING INDEX', plan)
+                self.assertNotIn('SCAN U0', plan)
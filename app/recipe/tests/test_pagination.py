@@ -0,0 +1,148 @@
+import base64
+import json
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.shortcuts import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from recipe.models import Recipe, Tag
+from recipe.pagination import KeysetPagination
+
+
+RECIPE_LIST_URL = reverse('recipe:recipe-list')
+TAG_LIST_URL = reverse('recipe:tag-list')
+
+
+def sample_recipe(user, title):
+    return Recipe.objects.create(
+        user=user, title=title, time_minutes=5, price=5.00
+    )
+
+
+class KeysetPaginationTests(TestCase):
+    """Tests for the cursor pagination of the list endpoints"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='test@gotmail.com',
+            password='testpass',
+            name='Test User'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def walk_pages(self, url, params):
+        """Follow the next links and return the ids of every page"""
+        pages = []
+        res = self.client.get(url, params)
+        while True:
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            pages.append([item['id'] for item in res.data['results']])
+            if not res.data['next']:
+                return pages
+            res = self.client.get(res.data['next'])
+
+    def test_paginated_response(self):
+        """Test the list is returned in pages with next link"""
+        for i in range(3):
+            sample_recipe(self.user, f'Recipe {i}')
+
+        res = self.client.get(RECIPE_LIST_URL, {'page_size': 2})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['results']), 2)
+        self.assertIsNotNone(res.data['next'])
+        self.assertIsNone(res.data['previous'])
+
+    def test_pages_follow_ordering_with_id_tiebreaker(self):
+        """Test walking the pages return every row once in order"""
+        for title in ['B', 'A', 'B', 'B', 'C', 'A', 'B']:
+            sample_recipe(self.user, title)
+        expected = list(
+            Recipe.objects.order_by('title', 'id').values_list('id', flat=True)
+        )
+
+        pages = self.walk_pages(RECIPE_LIST_URL, {'page_size': 2})
+
+        self.assertEqual([len(page) for page in pages], [2, 2, 2, 1])
+        self.assertEqual(sum(pages, []), expected)
+
+    def test_pages_follow_requested_ordering(self):
+        """Test walking the pages of a descending price ordering"""
+        for price in [5, 2, 5, 9, 2, 5]:
+            Recipe.objects.create(
+                user=self.user, title='Recipe', time_minutes=5, price=price
+            )
+        expected = list(Recipe.objects.order_by('-price', '-id').values_list(
+            'id', flat=True))
+
+        pages = self.walk_pages(
+            RECIPE_LIST_URL, {'page_size': 4, 'ordering': '-price'}
+        )
+
+        self.assertEqual(sum(pages, []), expected)
+
+    def test_previous_link(self):
+        """Test the previous link returns the previous page"""
+        for i in range(5):
+            Tag.objects.create(user=self.user, name=f'Tag {i}')
+
+        first = self.client.get(TAG_LIST_URL, {'page_size': 2})
+        second = self.client.get(first.data['next'])
+        previous = self.client.get(second.data['previous'])
+
+        self.assertEqual(previous.data['results'], first.data['results'])
+        self.assertIsNotNone(previous.data['next'])
+        self.assertIsNone(previous.data['previous'])
+
+    def test_page_size_limited_to_maximum(self):
+        """Test the page size requested cannot exceed the maximum"""
+        for i in range(4):
+            Tag.objects.create(user=self.user, name=f'Tag {i}')
+
+        with patch.object(KeysetPagination, 'max_page_size', 3):
+            res = self.client.get(TAG_LIST_URL, {'page_size': 100})
+
+        self.assertEqual(len(res.data['results']), 3)
+
+    def test_invalid_cursor(self):
+        """Test an invalid cursor returns not found"""
+        res = self.client.get(TAG_LIST_URL, {'cursor': 'invalid'})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cursor_invalid_values(self):
+        """Test cursors with values of the wrong types return not found"""
+        def encode(data):
+            return base64.urlsafe_b64encode(json.dumps(data).encode())
+
+        cases = [
+            (TAG_LIST_URL, {}, [False, ['a', 'x']]),
+            (TAG_LIST_URL, {}, [False, ['a', None]]),
+            (RECIPE_LIST_URL, {'ordering': 'price'}, [False, ['abc', 1]]),
+            (RECIPE_LIST_URL, {'ordering': 'price'}, [False, ['NaN', 1]]),
+            (RECIPE_LIST_URL, {'ordering': '-time_minutes'},
+             [True, [[1], 1]]),
+        ]
+        for url, params, data in cases:
+            res = self.client.get(url, {**params, 'cursor': encode(data)})
+
+            self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_deep_page_queries_constant(self):
+        """Test fetching a deep page does not cost more queries"""
+        for i in range(10):
+            sample_recipe(self.user, f'Recipe {i:02}')
+
+        res = self.client.get(RECIPE_LIST_URL, {'page_size': 1})
+        for i in range(8):
+            res = self.client.get(res.data['next'])
+
+        with self.assertNumQueries(3):
+            res = self.client.get(res.data['next'])
+        self.assertIsNone(res.data['next'])
+        self.assertEqual(res.data['results'][0]['title'], 'Recipe 09')
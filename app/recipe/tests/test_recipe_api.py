@@ -1,15 +1,19 @@
 import tempfile
 import os
+from unittest.mock import patch
 
 from PIL import Image
 
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
 from django.shortcuts import reverse
 
 from rest_framework.test import APIClient
 from rest_framework import status
 
+from core.testing import QueryBudgetMixin
+from recipe import images
 from recipe.models import Recipe, Tag, Ingredient
 from recipe.serializers import RecipeSerializer, RecipeDetailSerializer
 
@@ -63,7 +67,7 @@ def sample_recipe_payload(**params):
     return defaults
 
 
-class PublicRecipeApiTests(TestCase):
+class PublicRecipeApiTests(QueryBudgetMixin, TestCase):
     """Tests for public requests on Recipe API"""
 
     def setUp(self):
@@ -75,7 +79,7 @@ class PublicRecipeApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
-class PrivateRecipeApiTests(TestCase):
+class PrivateRecipeApiTests(QueryBudgetMixin, TestCase):
     """Tests for private requests on Recipe API"""
 
     def setUp(self):
@@ -106,7 +110,7 @@ class PrivateRecipeApiTests(TestCase):
         res = self.client.get(RECIPE_LIST_URL)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_recipes_limited_to_authenticated_user(self):
         """Test that the authenticated user get their recipes only"""
@@ -122,8 +126,8 @@ class PrivateRecipeApiTests(TestCase):
         res = self.client.get(RECIPE_LIST_URL)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 1)
-        self.assertEqual(res.data[0], serializer.data)
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertEqual(res.data['results'][0], serializer.data)
 
     def test_retrieve_recipe_detail(self):
         """Test retrieving the recipe details"""
@@ -194,7 +198,7 @@ class PrivateRecipeApiTests(TestCase):
     def test_create_full_recipe_successful(self):
         """Test creating a new recipe with ingredients and tags assigned"""
         ingredient1 = sample_ingredient(self.user)
-        ingredient2 = sample_ingredient(self.user)
+        ingredient2 = sample_ingredient(self.user, name="Test Ing 2")
         tag = sample_tag(self.user)
 
         payload = sample_recipe_payload()
@@ -227,6 +231,16 @@ class PrivateRecipeApiTests(TestCase):
             self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
             self.assertEqual(len(Recipe.objects.all()), 0)
 
+    def test_create_recipe_invalid_related_ids(self):
+        """Test refusing ids that are digits but not decimal numbers"""
+        payload = sample_recipe_payload(tags=['²'], ingredients=['x'])
+
+        res = self.client.post(RECIPE_LIST_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('tags', res.data)
+        self.assertFalse(Recipe.objects.exists())
+
     def test_update_recipe(self):
         """Test updating a recipe"""
         # PUT
@@ -274,11 +288,11 @@ class PrivateRecipeApiTests(TestCase):
         serializer3 = RecipeSerializer(recipe3)
         serializer4 = RecipeSerializer(recipe4)
 
-        self.assertEqual(len(res.data), 2)
-        self.assertIn(serializer1.data, res.data)
-        self.assertIn(serializer2.data, res.data)
-        self.assertNotIn(serializer3.data, res.data)
-        self.assertNotIn(serializer4.data, res.data)
+        self.assertEqual(len(res.data['results']), 2)
+        self.assertIn(serializer1.data, res.data['results'])
+        self.assertIn(serializer2.data, res.data['results'])
+        self.assertNotIn(serializer3.data, res.data['results'])
+        self.assertNotIn(serializer4.data, res.data['results'])
 
     def test_filter_recipe_by_ingredient(self):
         """Test returning recipes with specific ingredients"""
@@ -304,14 +318,131 @@ class PrivateRecipeApiTests(TestCase):
         serializer3 = RecipeSerializer(recipe3)
         serializer4 = RecipeSerializer(recipe4)
 
-        self.assertEqual(len(res.data), 2)
-        self.assertIn(serializer1.data, res.data)
-        self.assertIn(serializer2.data, res.data)
-        self.assertNotIn(serializer3.data, res.data)
-        self.assertNotIn(serializer4.data, res.data)
+        self.assertEqual(len(res.data['results']), 2)
+        self.assertIn(serializer1.data, res.data['results'])
+        self.assertIn(serializer2.data, res.data['results'])
+        self.assertNotIn(serializer3.data, res.data['results'])
+        self.assertNotIn(serializer4.data, res.data['results'])
+
+    def test_filter_recipes_matching_any_unique(self):
+        """Test recipes matching several tags are returned once"""
+        recipe1 = sample_recipe(user=self.user, title="Test Recipe 1")
+        recipe2 = sample_recipe(user=self.user, title="Test Recipe 2")
+        tag1 = sample_tag(user=self.user, name="Tag1")
+        tag2 = sample_tag(user=self.user, name="Tag2")
+        recipe1.tags.add(tag1, tag2)
+        recipe2.tags.add(tag2)
+
+        res = self.client.get(
+            RECIPE_LIST_URL,
+            {'tags': f'{tag1.id},{tag2.id}', 'match': 'any'}
+        )
+
+        ids = [recipe['id'] for recipe in res.data['results']]
+        self.assertEqual(ids, [recipe1.id, recipe2.id])
+
+    def test_filter_recipes_matching_all(self):
+        """Test returning recipes with all the tags and ingredients"""
+        recipe1 = sample_recipe(user=self.user, title="Test Recipe 1")
+        recipe2 = sample_recipe(user=self.user, title="Test Recipe 2")
+        recipe3 = sample_recipe(user=self.user, title="Test Recipe 3")
+        tag1 = sample_tag(user=self.user, name="Tag1")
+        tag2 = sample_tag(user=self.user, name="Tag2")
+        ingredient = sample_ingredient(user=self.user, name="Ingredient")
+        recipe1.tags.add(tag1, tag2)
+        recipe1.ingredients.add(ingredient)
+        recipe2.tags.add(tag1)
+        recipe2.ingredients.add(ingredient)
+        recipe3.tags.add(tag1, tag2)
+
+        res = self.client.get(RECIPE_LIST_URL, {
+            'tags': f'{tag1.id},{tag2.id},{tag1.id}',
+            'ingredients': f'{ingredient.id}',
+            'match': 'all',
+        })
+
+        ids = [recipe['id'] for recipe in res.data['results']]
+        self.assertEqual(ids, [recipe1.id])
+
+    def test_filter_recipes_invalid_match(self):
+        """Test filtering with an unknown match mode fails"""
+        res = self.client.get(RECIPE_LIST_URL, {'tags': '1', 'match': 'x'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_filter_recipes_by_price_and_time(self):
+        """Test returning recipes within the price and time ranges"""
+        quick = sample_recipe(
+            user=self.user, title='Quick', time_minutes=20, price=8
+        )
+        sample_recipe(user=self.user, title='Slow', time_minutes=90, price=8)
+        sample_recipe(user=self.user, title='Pricey', time_minutes=20,
+                      price=30)
+        cheap = sample_recipe(
+            user=self.user, title='Cheap', time_minutes=30, price=2
+        )
+
+        res = self.client.get(RECIPE_LIST_URL, {
+            'max_time': 30,
+            'max_price': '10.00',
+            'min_price': '2',
+        })
+
+        ids = [recipe['id'] for recipe in res.data['results']]
+        self.assertEqual(ids, [cheap.id, quick.id])
+
+        res = self.client.get(RECIPE_LIST_URL, {'min_time': 60})
+
+        titles = [recipe['title'] for recipe in res.data['results']]
+        self.assertEqual(titles, ['Slow'])
+
+    def test_order_recipes(self):
+        """Test ordering recipes by the requested fields"""
+        recipe1 = sample_recipe(user=self.user, time_minutes=10, price=5)
+        recipe2 = sample_recipe(user=self.user, time_minutes=20, price=5)
+        recipe3 = sample_recipe(user=self.user, time_minutes=5, price=1)
+
+        res = self.client.get(
+            RECIPE_LIST_URL, {'ordering': 'price,-time_minutes'}
+        )
+
+        ids = [recipe['id'] for recipe in res.data['results']]
+        self.assertEqual(ids, [recipe3.id, recipe2.id, recipe1.id])
 
+        res = self.client.get(RECIPE_LIST_URL, {'ordering': '-price'})
 
-class RecipeImageUploadTests(TestCase):
+        ids = [recipe['id'] for recipe in res.data['results']]
+        self.assertEqual(ids, [recipe2.id, recipe1.id, recipe3.id])
+
+    def test_invalid_range_filters_and_ordering(self):
+        """Test invalid range filters and orderings fail"""
+        for params in [
+            {'max_price': 'cheap'},
+            {'min_time': '-1'},
+            {'ordering': 'user'},
+            {'ordering': 'price,-price'},
+        ]:
+            res = self.client.get(RECIPE_LIST_URL, params)
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn(list(params)[0], res.data)
+
+    def test_list_params_ignored_on_detail(self):
+        """Test the list filters do not apply to a single recipe"""
+        recipe = sample_recipe(self.user, price=5.00)
+
+        res = self.client.get(recipe_detail_url(recipe.id), {
+            'match': 'bad',
+            'tags': 'x',
+            'ordering': 'user',
+            'min_price': '10.00',
+        })
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['id'], recipe.id)
+
+
+class RecipeImageUploadTests(QueryBudgetMixin, TestCase):
 
     def setUp(self):
         self.client = APIClient()
@@ -323,8 +454,18 @@ class RecipeImageUploadTests(TestCase):
         self.recipe = sample_recipe(user=self.user)
 
     def tearDown(self):
+        if self.recipe.image:
+            images.delete_variants(self.recipe.image.name)
         self.recipe.image.delete()
 
+    def upload_image(self, size=(10, 10)):
+        url = image_upload_url(self.recipe.id)
+        with tempfile.NamedTemporaryFile(suffix='.jpg') as ntf:
+            img = Image.new('RGB', size)
+            img.save(ntf, format='JPEG')
+            ntf.seek(0)
+            return self.client.post(url, {'image': ntf}, format='multipart')
+
     def test_upload_image_to_recipe(self):
         """Test uploading an image to recipe"""
         url = image_upload_url(self.recipe.id)
@@ -340,9 +481,133 @@ class RecipeImageUploadTests(TestCase):
         self.assertIn('image', res.data)
         self.assertTrue(os.path.exists(self.recipe.image.path))
 
+    def test_upload_image_processed_later(self):
+        """Test the upload returns before the variants are created"""
+        res = self.upload_image()
+
+        self.recipe.refresh_from_db()
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['image_status'], Recipe.IMAGE_PENDING)
+        self.assertIsNone(res.data['images']['thumbnail'])
+        self.assertFalse(os.path.exists(images.variant_name(
+            self.recipe.image.path, 'thumbnail'
+        )))
+
+    @override_settings(RECIPE_IMAGE_WORKERS=0)
+    def test_upload_image_variants(self):
+        """Test the image is resized and re-encoded into variants"""
+        res = self.upload_image(size=(2000, 1000))
+
+        self.recipe.refresh_from_db()
+        self.assertEqual(res.data['image_status'], Recipe.IMAGE_READY)
+        for variant, options in images.VARIANTS.items():
+            path = images.variant_name(self.recipe.image.path, variant)
+            with Image.open(path) as variant_image:
+                self.assertEqual(variant_image.format, options['format'])
+                self.assertEqual(
+                    variant_image.size[0], options['size'][0]
+                )
+            self.assertTrue(res.data['images'][variant].endswith(
+                images.variant_name(self.recipe.image.name, variant)
+            ))
+
+        res = self.client.get(recipe_detail_url(self.recipe.id))
+        self.assertEqual(res.data['image_status'], Recipe.IMAGE_READY)
+        self.assertIsNotNone(res.data['images']['medium'])
+
+    def test_process_invalid_image_fails(self):
+        """Test an image that cannot be decoded is marked as failed"""
+        self.recipe.image.save('image.jpg', ContentFile(b'notimage'))
+
+        with self.assertLogs('recipe.images', level='ERROR'):
+            images.process_recipe_image(self.recipe.id)
+
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.image_status, Recipe.IMAGE_FAILED)
+
+    @override_settings(RECIPE_IMAGE_WORKERS=0)
+    def test_upload_image_variants_upright(self):
+        """Test the variants are turned as the EXIF orientation says"""
+        # A big-endian TIFF block with the orientation of a phone held
+        # upright, stored rotated 90 degrees
+        exif = (
+            b'Exif\x00\x00MM\x00\x2a\x00\x00\x00\x08\x00\x01'
+            b'\x01\x12\x00\x03\x00\x00\x00\x01\x00\x06\x00\x00'
+            b'\x00\x00\x00\x00'
+        )
+        url = image_upload_url(self.recipe.id)
+        with tempfile.NamedTemporaryFile(suffix='.jpg') as ntf:
+            Image.new('RGB', (400, 200)).save(ntf, format='JPEG', exif=exif)
+            ntf.seek(0)
+            self.client.post(url, {'image': ntf}, format='multipart')
+
+        self.recipe.refresh_from_db()
+        path = images.variant_name(self.recipe.image.path, 'thumbnail')
+        with Image.open(path) as variant_image:
+            self.assertEqual(variant_image.size, (75, 150))
+
+    def test_process_in_worker_marks_failed(self):
+        """Test unexpected errors of the workers mark the image failed"""
+        self.recipe.image_status = Recipe.IMAGE_PENDING
+        self.recipe.image.save('image.jpg', ContentFile(b'notimage'))
+
+        # The test connection is kept open
+        with patch('recipe.images.create_variants',
+                   side_effect=RuntimeError), \
+                patch('recipe.images.connection'), \
+                self.assertLogs('recipe.images', level='ERROR'):
+            images._process_in_worker(self.recipe.id)
+
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.image_status, Recipe.IMAGE_FAILED)
+
     def test_upload_image_bad_request(self):
         """Test uploading an invalid image"""
         url = image_upload_url(self.recipe.id)
         res = self.client.post(url, {'image': 'notimage'}, format='multipart')
 
         self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class RecipeQueryCountTests(QueryBudgetMixin, TestCase):
+    """Tests for the number of queries run by the Recipe API"""
+
+    def setUp(self):
+        self.user = sample_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def create_recipes(self, count):
+        start = Recipe.objects.count()
+        for i in range(start, start + count):
+            recipe = sample_recipe(self.user, title=f'Recipe {i}')
+            recipe.ingredients.add(
+                sample_ingredient(self.user, name=f'Ing {i}')
+            )
+            recipe.tags.add(sample_tag(self.user, name=f'Tag {i}'))
+
+    def test_list_queries_constant(self):
+        """Test listing recipes runs the same queries for any list size"""
+        self.create_recipes(2)
+        with self.assertNumQueries(3):
+            res = self.client.get(RECIPE_LIST_URL)
+        self.assertEqual(len(res.data['results']), 2)
+
+        self.create_recipes(10)
+        with self.assertNumQueries(3):
+            res = self.client.get(RECIPE_LIST_URL)
+        self.assertEqual(len(res.data['results']), 12)
+
+    def test_detail_queries_constant(self):
+        """Test retrieving a recipe does not query per related object"""
+        recipe = sample_recipe(self.user)
+        for i in range(5):
+            recipe.ingredients.add(
+                sample_ingredient(self.user, name=f'Ing {i}')
+            )
+            recipe.tags.add(sample_tag(self.user, name=f'Tag {i}'))
+
+        with self.assertNumQueries(3):
+            res = self.client.get(recipe_detail_url(recipe.id))
+        self.assertEqual(len(res.data['ingredients']), 5)
+        self.assertEqual(len(res.data['tags']), 5)
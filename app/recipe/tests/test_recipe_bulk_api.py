@@ -0,0 +1,213 @@
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from django.shortcuts import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from recipe.models import Recipe, Tag, Ingredient
+from recipe.serializers import RecipeSerializer
+
+
+RECIPE_BULK_URL = reverse('recipe:recipe-bulk-create')
+TAG_LIST_URL = reverse('recipe:tag-list')
+
+
+def sample_recipe(user, **params):
+    defaults = {
+        'title': 'Test Recipe',
+        'time_minutes': 5,
+        'price': 50.0
+    }
+    defaults.update(params)
+
+    return Recipe.objects.create(user=user, **defaults)
+
+
+def recipe_payload(**params):
+    defaults = {
+        'title': 'Test Recipe',
+        'time_minutes': 5,
+        'price': '50.00',
+    }
+    defaults.update(params)
+
+    return defaults
+
+
+class RecipeBulkApiTests(TestCase):
+    """Tests for the bulk endpoints of the Recipe API"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='test@gotmail.com',
+            password='testpass',
+            name='Test User'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.tag = Tag.objects.create(user=self.user, name='Tag')
+        self.ingredient = Ingredient.objects.create(
+            user=self.user, name='Ingredient'
+        )
+
+    def test_bulk_create(self):
+        """Test creating a list of recipes with their relations"""
+        payload = [
+            recipe_payload(
+                title='Recipe 1',
+                tags=[self.tag.id],
+                ingredients=[self.ingredient.id, self.ingredient.id]
+            ),
+            recipe_payload(title='Recipe 2', tags=[], ingredients=[]),
+        ]
+
+        res = self.client.post(RECIPE_BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [recipe['title'] for recipe in res.data],
+            ['Recipe 1', 'Recipe 2']
+        )
+        recipe = Recipe.objects.get(title='Recipe 1', user=self.user)
+        self.assertEqual(list(recipe.tags.all()), [self.tag])
+        self.assertEqual(list(recipe.ingredients.all()), [self.ingredient])
+        self.assertEqual(res.data[0]['tags'], [self.tag.id])
+
+    def test_bulk_create_reports_item_errors(self):
+        """Test no recipe is created when any item is invalid"""
+        payload = [
+            recipe_payload(title='Recipe 1', tags=[], ingredients=[]),
+            recipe_payload(price=-1, tags=[], ingredients=[]),
+            recipe_payload(title='Recipe 3', tags=[1000], ingredients=[]),
+        ]
+
+        res = self.client.post(RECIPE_BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data[0], {})
+        self.assertIn('price', res.data[1])
+        self.assertIn('tags', res.data[2])
+        self.assertFalse(Recipe.objects.exists())
+
+    def test_bulk_create_validation_queries_batched(self):
+        """Test the related ids are validated with one query per model"""
+        payload = [
+            recipe_payload(tags=[self.tag.id], ingredients=[
+                self.ingredient.id
+            ]) for _ in range(5)
+        ]
+
+        serializer = RecipeSerializer(data=payload, many=True)
+
+        with self.assertNumQueries(2):
+            self.assertTrue(serializer.is_valid())
+
+    @override_settings(RECIPE_BULK_MAX_ITEMS=2)
+    def test_bulk_create_limited(self):
+        """Test sending more items than allowed fails"""
+        payload = [recipe_payload(tags=[], ingredients=[])] * 3
+
+        res = self.client.post(RECIPE_BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Recipe.objects.exists())
+
+    def test_bulk_create_requires_list(self):
+        """Test the bulk payload must be a list"""
+        res = self.client.post(
+            RECIPE_BULK_URL, recipe_payload(), format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_create_invalidates_list_cache(self):
+        """Test the cached tag list is refreshed after a bulk create"""
+        params = {'assigned_only': 1}
+        self.assertEqual(
+            self.client.get(TAG_LIST_URL, params).data['results'], []
+        )
+
+        self.client.post(RECIPE_BULK_URL, [
+            recipe_payload(tags=[self.tag.id], ingredients=[])
+        ], format='json')
+
+        res = self.client.get(TAG_LIST_URL, params)
+        self.assertEqual(len(res.data['results']), 1)
+
+    def test_bulk_update(self):
+        """Test updating a list of recipes"""
+        recipe1 = sample_recipe(self.user, title='Recipe 1')
+        recipe2 = sample_recipe(self.user, title='Recipe 2')
+        recipe2.tags.add(self.tag)
+
+        res = self.client.patch(RECIPE_BULK_URL, [
+            {'id': recipe1.id, 'time_minutes': 30, 'tags': [self.tag.id]},
+            {'id': recipe2.id, 'title': 'New Title'},
+        ], format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        recipe1.refresh_from_db()
+        recipe2.refresh_from_db()
+        self.assertEqual(recipe1.time_minutes, 30)
+        self.assertEqual(list(recipe1.tags.all()), [self.tag])
+        self.assertEqual(recipe2.title, 'New Title')
+        self.assertEqual(list(recipe2.tags.all()), [self.tag])
+
+    def test_bulk_update_batches_search_vectors(self):
+        """Test the search vectors are updated once for all the recipes"""
+        recipes = [sample_recipe(self.user) for _ in range(5)]
+
+        with CaptureQueriesContext(connection) as context:
+            res = self.client.patch(RECIPE_BULK_URL, [
+                {'id': recipe.id, 'title': f'Stew {recipe.id}'}
+                for recipe in recipes
+            ], format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        vector_updates = [
+            query for query in context.captured_queries
+            if 'SET "search_vector"' in query['sql']
+        ]
+        # A single statement on Postgres, one per recipe elsewhere
+        self.assertLessEqual(len(vector_updates), len(recipes))
+        self.assertEqual(
+            Recipe.objects.filter(user=self.user).search('stew').count(), 5
+        )
+
+    def test_bulk_update_other_user_recipe(self):
+        """Test recipes of other users cannot be updated"""
+        other = get_user_model().objects.create_user(
+            'other@gotmail.com', 'testpass'
+        )
+        recipe = sample_recipe(other)
+
+        res = self.client.patch(RECIPE_BULK_URL, [
+            {'id': recipe.id, 'title': 'New Title'},
+        ], format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('id', res.data[0])
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.title, 'Test Recipe')
+
+    def test_bulk_delete(self):
+        """Test deleting a list of recipes of the user only"""
+        recipe1 = sample_recipe(self.user)
+        recipe2 = sample_recipe(self.user)
+        recipe3 = sample_recipe(self.user)
+        other = sample_recipe(
+            get_user_model().objects.create_user('other@gotmail.com', 'pw')
+        )
+
+        res = self.client.delete(
+            f'{RECIPE_BULK_URL}?ids={recipe1.id},{recipe2.id},{other.id}'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(
+            list(Recipe.objects.values_list('id', flat=True)),
+            [recipe3.id, other.id]
+        )
@@ -0,0 +1,134 @@
+import csv
+import json
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.shortcuts import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from recipe.models import Recipe, Tag, Ingredient
+
+
+RECIPE_EXPORT_URL = reverse('recipe:recipe-export')
+
+
+def streamed_lines(res):
+    return b''.join(res.streaming_content).decode('utf-8').splitlines()
+
+
+class RecipeExportApiTests(TestCase):
+    """Tests for the streaming export of the Recipe API"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@gotmail.com',
+            'testpass'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        self.recipe = Recipe.objects.create(
+            user=self.user, title='Curry', time_minutes=30, price=7.5
+        )
+        self.tag = Tag.objects.create(user=self.user, name='Vegan')
+        self.recipe.tags.add(self.tag)
+        self.recipe.ingredients.add(
+            Ingredient.objects.create(user=self.user, name='Rice'),
+            Ingredient.objects.create(user=self.user, name='Chickpeas'),
+        )
+        Recipe.objects.create(
+            user=self.user, title='Toast', time_minutes=2, price=1
+        )
+
+    def test_export_requires_authentication(self):
+        """Test the export is refused to anonymous users"""
+        res = APIClient().get(RECIPE_EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_export_ndjson(self):
+        """Test the recipes are streamed as one JSON object per line"""
+        res = self.client.get(RECIPE_EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        self.assertEqual(res['Content-Type'], 'application/x-ndjson')
+        lines = [json.loads(line) for line in streamed_lines(res)]
+        self.assertEqual(lines[0], {
+            'id': self.recipe.id,
+            'title': 'Curry',
+            'time_minutes': 30,
+            'price': '7.50',
+            'link': '',
+            'tags': [{'id': self.tag.id, 'name': 'Vegan'}],
+            'ingredients': [
+                {'id': ingredient.id, 'name': ingredient.name}
+                for ingredient in self.recipe.ingredients.order_by('name')
+            ],
+        })
+        self.assertEqual(lines[1]['title'], 'Toast')
+        self.assertEqual(lines[1]['tags'], [])
+
+    def test_export_csv(self):
+        """Test the recipes are streamed as CSV with joined names"""
+        res = self.client.get(RECIPE_EXPORT_URL, {'export_format': 'csv'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Content-Type'], 'text/csv')
+        rows = list(csv.DictReader(streamed_lines(res)))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0]['price'], '7.50')
+        self.assertEqual(rows[0]['tags'], 'Vegan')
+        self.assertEqual(rows[0]['ingredients'], 'Chickpeas|Rice')
+
+    def test_export_limited_to_user_and_filters(self):
+        """Test only the user recipes matching the filters are exported"""
+        other = get_user_model().objects.create_user(
+            'other@gotmail.com', 'testpass'
+        )
+        Recipe.objects.create(
+            user=other, title='Other', time_minutes=5, price=5
+        )
+
+        res = self.client.get(RECIPE_EXPORT_URL, {'tags': self.tag.id})
+
+        lines = [json.loads(line) for line in streamed_lines(res)]
+        self.assertEqual([line['title'] for line in lines], ['Curry'])
+
+    def test_export_invalid_format(self):
+        """Test an unknown export format is refused"""
+        res = self.client.get(RECIPE_EXPORT_URL, {'export_format': 'xml'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ExportRecipesCommandTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@gotmail.com',
+            'testpass'
+        )
+        for i in range(5):
+            recipe = Recipe.objects.create(
+                user=self.user, title=f'Recipe {i}', time_minutes=5, price=5
+            )
+            recipe.tags.add(Tag.objects.create(user=self.user, name=f'T{i}'))
+
+    def test_export_in_chunks(self):
+        """Test the relations are loaded once per chunk of recipes"""
+        out = StringIO()
+        # The user, one cursor over the recipes, then the tags and the
+        # ingredients of each of the three chunks
+        with self.assertNumQueries(8):
+            call_command(
+                'export_recipes', self.user.email, chunk_size=2, stdout=out
+            )
+
+        lines = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(len(lines), 5)
+        self.assertEqual(lines[4]['tags'][0]['name'], 'T4')
@@ -0,0 +1,233 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from django.shortcuts import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from recipe import imports
+from recipe.models import Recipe, Tag, Ingredient
+
+
+RECIPE_IMPORT_URL = reverse('recipe:recipe-import')
+
+
+def ndjson_file(*items, name='recipes.ndjson'):
+    content = ''.join(json.dumps(item) + '\n' for item in items)
+    return SimpleUploadedFile(name, content.encode('utf-8'))
+
+
+def recipe_item(**params):
+    defaults = {
+        'title': 'Test Recipe',
+        'time_minutes': 5,
+        'price': '5.00',
+    }
+    defaults.update(params)
+
+    return defaults
+
+
+class RecipeImportApiTests(TestCase):
+    """Tests for the file import of the Recipe API"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@gotmail.com',
+            'testpass'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_import_ndjson(self):
+        """Test recipes are created with their tags and ingredients"""
+        Tag.objects.create(user=self.user, name='Vegan')
+        items = [
+            recipe_item(title='Curry', tags=['Vegan', 'Dinner'],
+                        ingredients=['Rice']),
+            recipe_item(title='Toast', tags=[{'id': 99, 'name': 'Vegan'}]),
+        ]
+
+        res = self.client.post(
+            RECIPE_IMPORT_URL, {'file': ndjson_file(*items)},
+            format='multipart'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['created'], 2)
+        self.assertEqual(res.data['errors'], [])
+        curry = Recipe.objects.get(user=self.user, title='Curry')
+        self.assertEqual(
+            sorted(curry.tags.values_list('name', flat=True)),
+            ['Dinner', 'Vegan']
+        )
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(
+            list(Ingredient.objects.values_list('name', flat=True)),
+            ['Rice']
+        )
+
+    def test_import_csv(self):
+        """Test recipes are imported from a CSV file"""
+        content = (
+            'id,title,time_minutes,price,link,tags,ingredients\r\n'
+            '7,Curry,30,7.50,,Vegan|Dinner,Rice\r\n'
+        )
+
+        res = self.client.post(RECIPE_IMPORT_URL, {
+            'file': SimpleUploadedFile('recipes.csv', content.encode()),
+            'import_format': 'csv',
+        }, format='multipart')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        recipe = Recipe.objects.get(user=self.user)
+        self.assertEqual(recipe.title, 'Curry')
+        self.assertEqual(recipe.tags.count(), 2)
+
+    def test_import_reports_row_errors(self):
+        """Test invalid rows are reported and the valid ones created"""
+        content = (
+            json.dumps(recipe_item()) + '\n'
+            'not json\n' +
+            json.dumps(recipe_item(time_minutes=-1)) + '\n'
+        )
+
+        res = self.client.post(RECIPE_IMPORT_URL, {
+            'file': SimpleUploadedFile('recipes.ndjson', content.encode()),
+        }, format='multipart')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['rows'], 3)
+        self.assertEqual(res.data['created'], 1)
+        self.assertEqual(res.data['failed'], 2)
+        self.assertEqual(
+            [error['row'] for error in res.data['errors']], [2, 3]
+        )
+        self.assertIn('time_minutes', res.data['errors'][1]['errors'])
+        self.assertEqual(Recipe.objects.count(), 1)
+
+    def test_import_reports_undecodable_rows(self):
+        """Test rows that are not UTF-8 are reported as row errors"""
+        content = (
+            b'\xff\xfe bad\n' +
+            json.dumps(recipe_item()).encode() + b'\n'
+        )
+
+        res = self.client.post(RECIPE_IMPORT_URL, {
+            'file': SimpleUploadedFile('recipes.ndjson', content),
+        }, format='multipart')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['rows'], 2)
+        self.assertEqual(res.data['created'], 1)
+        self.assertEqual(res.data['errors'][0]['row'], 1)
+        self.assertEqual(Recipe.objects.count(), 1)
+
+    def test_import_reports_invalid_csv_rows(self):
+        """Test CSV rows that cannot be decoded or parsed are reported"""
+        content = (
+            b'id,title,time_minutes,price,link,tags,ingredients\r\n'
+            b'1,Caf\xe9,30,7.50,,,\r\n'
+            b'2,Nul\x00,30,7.50,,,\r\n'
+            b'3,Curry,30,7.50,,,\r\n'
+        )
+
+        res = self.client.post(RECIPE_IMPORT_URL, {
+            'file': SimpleUploadedFile('recipes.csv', content),
+            'import_format': 'csv',
+        }, format='multipart')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['rows'], 3)
+        self.assertEqual(
+            [error['row'] for error in res.data['errors']], [1, 2]
+        )
+        self.assertEqual(
+            list(Recipe.objects.values_list('title', flat=True)), ['Curry']
+        )
+
+    def test_import_without_file(self):
+        """Test a request without a file is refused"""
+        res = self.client.post(RECIPE_IMPORT_URL, {}, format='multipart')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('file', res.data)
+
+
+class ImportRecipesTests(TestCase):
+    """Tests for the chunked import of recipes"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@gotmail.com',
+            'testpass'
+        )
+
+    def test_names_resolved_once_per_chunk(self):
+        """Test the names of a chunk are resolved with a query per model"""
+        items = [
+            recipe_item(title=f'Recipe {i}', tags=['Tag', f'Tag {i}'],
+                        ingredients=[f'Ingredient {i}'])
+            for i in range(5)
+        ]
+
+        with CaptureQueriesContext(connection) as context:
+            imports.import_recipes(self.user, iter(items), chunk_size=5)
+
+        # Find, create and load again the tags and the ingredients
+        name_queries = [
+            query for query in context.captured_queries
+            if 'FROM "recipe_tag"' in query['sql'] or
+            'INTO "recipe_tag"' in query['sql'] or
+            'FROM "recipe_ingredient"' in query['sql'] or
+            'INTO "recipe_ingredient"' in query['sql']
+        ]
+        self.assertEqual(len(name_queries), 6)
+        self.assertEqual(Recipe.objects.count(), 5)
+        self.assertEqual(Tag.objects.count(), 6)
+
+    def test_import_resumes_from_start(self):
+        """Test the rows before the start are skipped"""
+        items = [recipe_item(title=f'Recipe {i}') for i in range(5)]
+        progress = []
+
+        result = imports.import_recipes(
+            self.user, iter(items), start=2, chunk_size=2,
+            progress=lambda result: progress.append(result['rows'])
+        )
+
+        self.assertEqual(progress, [4, 5])
+        self.assertEqual(result['created'], 3)
+        self.assertEqual(
+            sorted(Recipe.objects.values_list('title', flat=True)),
+            ['Recipe 2', 'Recipe 3', 'Recipe 4']
+        )
+
+    def test_import_command(self):
+        """Test the command imports the file and reports its progress"""
+        with tempfile.NamedTemporaryFile(
+            'w', suffix='.ndjson', delete=False
+        ) as recipes_file:
+            for i in range(3):
+                recipes_file.write(json.dumps(recipe_item(title=str(i))))
+                recipes_file.write('\n')
+        self.addCleanup(os.remove, recipes_file.name)
+
+        out = StringIO()
+        call_command(
+            'import_recipes', self.user.email, recipes_file.name,
+            chunk_size=2, stdout=out
+        )
+
+        self.assertIn('2 rows committed', out.getvalue())
+        self.assertIn('Imported 3 recipes', out.getvalue())
+        self.assertEqual(Recipe.objects.filter(user=self.user).count(), 3)
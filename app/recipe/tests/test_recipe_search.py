@@ -0,0 +1,131 @@
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.shortcuts import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from recipe import bulk
+from recipe.models import Recipe, Tag, Ingredient
+
+
+RECIPE_LIST_URL = reverse('recipe:recipe-list')
+
+
+def result_titles(res):
+    return [item['title'] for item in res.data['results']]
+
+
+class RecipeSearchApiTests(TestCase):
+    """Tests for the full-text search of the Recipe API"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@gotmail.com',
+            'testpass'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        self.curry = Recipe.objects.create(
+            user=self.user, title='Chickpea curry', time_minutes=30, price=7
+        )
+        self.salad = Recipe.objects.create(
+            user=self.user, title='Summer salad', time_minutes=10, price=4
+        )
+        self.chickpeas = Ingredient.objects.create(
+            user=self.user, name='Chickpeas'
+        )
+        self.vegan = Tag.objects.create(user=self.user, name='Vegan')
+        self.salad.ingredients.add(self.chickpeas)
+        self.curry.tags.add(self.vegan)
+
+    def search(self, terms, **params):
+        return self.client.get(RECIPE_LIST_URL, {'search': terms, **params})
+
+    def test_search_title_and_related_names(self):
+        """Test recipes are found by title, ingredient and tag names"""
+        self.assertEqual(result_titles(self.search('salad')), ['Summer salad'])
+        self.assertEqual(result_titles(self.search('vegan')),
+                         ['Chickpea curry'])
+        self.assertEqual(result_titles(self.search('vegan chickpea')),
+                         ['Chickpea curry'])
+        self.assertEqual(result_titles(self.search('pasta')), [])
+
+    def test_search_ranks_title_first(self):
+        """Test a match in the title ranks before a match in the names"""
+        res = self.search('chickpea')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            result_titles(res), ['Chickpea curry', 'Summer salad']
+        )
+
+    def test_search_paginated_by_rank(self):
+        """Test the pages of a search follow the rank ordering"""
+        first = self.search('chickpea', page_size=1)
+        second = self.client.get(first.data['next'])
+
+        self.assertEqual(result_titles(first), ['Chickpea curry'])
+        self.assertEqual(result_titles(second), ['Summer salad'])
+        self.assertIsNone(second.data['next'])
+
+    def test_search_limited_to_user(self):
+        """Test the recipes of other users are not searched"""
+        other = get_user_model().objects.create_user(
+            'other@gotmail.com', 'testpass'
+        )
+        Recipe.objects.create(
+            user=other, title='Other salad', time_minutes=5, price=5
+        )
+
+        self.assertEqual(result_titles(self.search('salad')), ['Summer salad'])
+
+    def test_search_updated_on_title_change(self):
+        """Test a recipe is found by its new title"""
+        self.salad.title = 'Winter soup'
+        self.salad.save()
+
+        self.assertEqual(result_titles(self.search('salad')), [])
+        self.assertEqual(result_titles(self.search('soup')), ['Winter soup'])
+
+    def test_search_updated_on_assign(self):
+        """Test the vectors follow the relations from both sides"""
+        self.vegan.recipes.add(self.salad)
+        self.assertEqual(len(result_titles(self.search('vegan'))), 2)
+
+        self.vegan.recipes.clear()
+        self.assertEqual(result_titles(self.search('vegan')), [])
+
+        tahini = Ingredient.objects.create(user=self.user, name='Tahini')
+        self.curry.ingredients.add(tahini)
+        self.assertEqual(result_titles(self.search('tahini')),
+                         ['Chickpea curry'])
+
+        self.curry.ingredients.remove(tahini)
+        self.assertEqual(result_titles(self.search('tahini')), [])
+
+    def test_search_updated_on_rename_and_delete(self):
+        """Test renaming or deleting a tag updates its recipes"""
+        self.vegan.name = 'Spicy'
+        self.vegan.save()
+        self.assertEqual(result_titles(self.search('spicy')),
+                         ['Chickpea curry'])
+
+        self.vegan.delete()
+        self.assertEqual(result_titles(self.search('spicy')), [])
+
+    def test_search_updated_on_bulk_create(self):
+        """Test recipes created in bulk are searchable"""
+        bulk.bulk_create_recipes([{
+            'user': self.user,
+            'title': 'Lentil stew',
+            'time_minutes': 40,
+            'price': 6,
+            'tags': [self.vegan],
+        }])
+
+        self.assertEqual(
+            result_titles(self.search('vegan')),
+            ['Chickpea curry', 'Lentil stew']
+        )
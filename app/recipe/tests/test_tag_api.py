@@ -1,3 +1,6 @@
+from unittest.mock import patch
+
+from django.db import IntegrityError
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from django.shortcuts import reverse
@@ -10,6 +13,7 @@ from recipe.serializers import TagSerializer
 
 
 TAG_LIST_URL = reverse('recipe:tag-list')
+TAG_ENSURE_URL = reverse('recipe:tag-ensure')
 
 
 class PublicTagApiTests(TestCase):
@@ -46,7 +50,7 @@ class PrivateTagApiTests(TestCase):
         res = self.client.get(TAG_LIST_URL)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_tags_limited_to_auth_user(self):
         """Test that tags returned are only from the user"""
@@ -60,8 +64,8 @@ class PrivateTagApiTests(TestCase):
         res = self.client.get(TAG_LIST_URL)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 1)
-        self.assertEqual(res.data[0]['name'], "TestTag1")
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertEqual(res.data['results'][0]['name'], "TestTag1")
 
     def test_create_tag_successful(self):
         """Test creating a new tag with the api"""
@@ -116,10 +120,10 @@ class PrivateTagApiTests(TestCase):
 
         res = self.client.get(TAG_LIST_URL, {'assigned_only': 1})
 
-        self.assertEqual(len(res.data), 2)
-        self.assertIn(serializer1.data, res.data)
-        self.assertIn(serializer2.data, res.data)
-        self.assertNotIn(serializer3.data, res.data)
+        self.assertEqual(len(res.data['results']), 2)
+        self.assertIn(serializer1.data, res.data['results'])
+        self.assertIn(serializer2.data, res.data['results'])
+        self.assertNotIn(serializer3.data, res.data['results'])
 
     def test_retrieve_tags_assigned_unique(self):
         """Test filtering tags by assigned returns unique items"""
@@ -143,4 +147,101 @@ class PrivateTagApiTests(TestCase):
 
         res = self.client.get(TAG_LIST_URL, {'assigned_only': 1})
 
-        self.assertEqual(len(res.data), 1)
+        self.assertEqual(len(res.data['results']), 1)
+
+    def test_retrieve_tags_with_recipe_count(self):
+        """Test the recipe counts are sent only when requested"""
+        tag1 = Tag.objects.create(user=self.user, name="Tag1")
+        tag2 = Tag.objects.create(user=self.user, name="Tag2")
+        for title in ("Recipe1", "Recipe2"):
+            Recipe.objects.create(
+                user=self.user,
+                title=title,
+                price=1.0,
+                time_minutes=10,
+            ).tags.add(tag1)
+
+        res = self.client.get(TAG_LIST_URL, {'recipe_count': 1})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['results'], [
+            {'id': tag1.id, 'name': 'Tag1', 'recipe_count': 2},
+            {'id': tag2.id, 'name': 'Tag2', 'recipe_count': 0},
+        ])
+        res = self.client.get(TAG_LIST_URL)
+        self.assertNotIn('recipe_count', res.data['results'][0])
+
+    def test_create_tag_duplicate_name(self):
+        """Test a user cannot create two tags with the same name"""
+        Tag.objects.create(user=self.user, name='TestTag')
+
+        res = self.client.post(TAG_LIST_URL, {'name': 'TestTag'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Tag.objects.count(), 1)
+
+    def test_ensure_tags(self):
+        """Test ensuring tags returns existing ones and creates the rest"""
+        tag = Tag.objects.create(user=self.user, name='Existing')
+
+        res = self.client.post(
+            TAG_ENSURE_URL,
+            {'names': ['New', 'Existing', 'New']},
+            format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item['name'] for item in res.data], ['New', 'Existing']
+        )
+        self.assertEqual(res.data[1]['id'], tag.id)
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 2)
+
+    def test_ensure_tags_queries(self):
+        """Test ensuring tags takes a fixed number of queries"""
+        Tag.objects.create(user=self.user, name='Existing')
+        names = ['Existing'] + [f'Tag {i}' for i in range(20)]
+
+        with self.assertNumQueries(5):
+            res = self.client.post(
+                TAG_ENSURE_URL, {'names': names}, format='json'
+            )
+
+        self.assertEqual(len(res.data), 21)
+
+    def test_ensure_tags_per_user(self):
+        """Test ensuring tags does not return tags of other users"""
+        user2 = get_user_model().objects.create_user(
+            'other@gotmail.com',
+            'asdfqwe'
+        )
+        tag = Tag.objects.create(user=user2, name='Shared')
+
+        res = self.client.post(
+            TAG_ENSURE_URL, {'names': ['Shared']}, format='json'
+        )
+
+        self.assertNotEqual(res.data[0]['id'], tag.id)
+        self.assertTrue(
+            Tag.objects.filter(user=self.user, name='Shared').exists()
+        )
+
+    def test_ensure_tags_invalid(self):
+        """Test ensuring tags requires a list of names"""
+        res = self.client.post(TAG_ENSURE_URL, {'names': []}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @patch('django.db.models.query.QuerySet.bulk_create')
+    def test_ensure_tags_conflict(self, bulk_create):
+        """Test names created concurrently are resolved one by one"""
+        bulk_create.side_effect = IntegrityError
+
+        res = self.client.post(
+            TAG_ENSURE_URL, {'names': ['Tag1', 'Tag2']}, format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item['name'] for item in res.data], ['Tag1', 'Tag2']
+        )
@@ -1,19 +1,36 @@
-from rest_framework import viewsets, mixins, permissions, authentication
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from rest_framework import viewsets, mixins, permissions
 from rest_framework.decorators import action
+from rest_framework.generics import get_object_or_404
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework import status
 
-from recipe import models, serializers
+from recipe import (
+    bulk, export, fastpath, images, imports, models, serializers, signals,
+)
+from recipe.cache import CachedListMixin
+from recipe.fieldsets import SparseFieldsetMixin
+from recipe.pagination import KeysetPagination
+from user.authentication import CachedTokenAuthentication
 
 
 class BaseRecipeAttrViewSet(
+    CachedListMixin,
+    SparseFieldsetMixin,
     viewsets.GenericViewSet,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
 ):
     """Superclass with the base functionality for api viewsets"""
     permission_classes = [permissions.IsAuthenticated]
-    authentication_classes = [authentication.TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
+    pagination_class = KeysetPagination
+    ordering = ('name', 'id')
 
     def get_queryset(self):
         """Return objects of the current authenticated user only"""
@@ -21,52 +38,174 @@ class BaseRecipeAttrViewSet(
         assined_only = self.request.query_params.get('assigned_only')
 
         if assined_only and assined_only == '1':
-            queryset = queryset.exclude(recipes__isnull=True)
+            queryset = queryset.assigned()
 
-        return queryset.filter(user=self.request.user).order_by('name')
+        return queryset.filter(user=self.request.user).order_by(
+            *self.ordering
+        )
+
+    def get_serializer_class(self):
+        """Send the recipe counts in lists when they are requested"""
+        if self.action == 'list' and \
+                self.request.query_params.get('recipe_count') == '1':
+            return self.count_serializer_class
+        return self.serializer_class
 
     def perform_create(self, serializer):
         """Create a new object setting the user"""
         serializer.save(user=self.request.user)
 
+    @action(methods=['POST'], detail=False)
+    def ensure(self, request):
+        """Return the objects with the names, creating the missing ones"""
+        serializer = serializers.NameListSerializer(data=request.data)
+
+        if serializer.is_valid():
+            objects = bulk.bulk_ensure_named(
+                self.queryset.model,
+                self.request.user,
+                serializer.validated_data['names']
+            )
+            return Response(
+                self.get_serializer(objects, many=True).data,
+                status=status.HTTP_200_OK
+            )
+
+        return Response(
+            serializer.errors,
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
 
 class TagViewSet(BaseRecipeAttrViewSet):
     """Manage tags on the database"""
     queryset = models.Tag.objects.all()
     serializer_class = serializers.TagSerializer
+    count_serializer_class = serializers.TagCountSerializer
 
 
 class IngredientViewSet(BaseRecipeAttrViewSet):
     """Manage ingredients on the database"""
     queryset = models.Ingredient.objects.all()
     serializer_class = serializers.IngredientSerializer
+    count_serializer_class = serializers.IngredientCountSerializer
 
 
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(SparseFieldsetMixin, viewsets.ModelViewSet):
     """Manage recipes on the database"""
     queryset = models.Recipe.objects.all()
     serializer_class = serializers.RecipeSerializer
-    authentication_classes = [authentication.TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+    ordering = ('title', 'id')
+    search_ordering = ('-search_rank', 'id')
+    field_sources = {'images': ['image', 'image_status']}
+    relations = ('ingredients', 'tags')
+    range_filters = {
+        'min_price': 'price__gte',
+        'max_price': 'price__lte',
+        'min_time': 'time_minutes__gte',
+        'max_time': 'time_minutes__lte',
+    }
+    match_modes = (
+        models.RecipeQuerySet.MATCH_ANY,
+        models.RecipeQuerySet.MATCH_ALL,
+    )
+    # Actions filtering and ordering the recipes with the query parameters
+    list_actions = ('list', 'export')
 
     def _params_to_list(self, values):
-        return list(map(int, values.split(',')))
+        try:
+            return list(map(int, values.split(',')))
+        except ValueError:
+            raise ValidationError(
+                'Ids must be given as a comma separated list of integers.'
+            )
+
+    def _get_action_queryset(self):
+        """Return the base queryset with the related data the action uses"""
+        if self.action == 'retrieve':
+            return self.queryset.for_detail(
+                self.get_requested_relations(self.relations)
+            )
+        elif self.action == 'upload_image':
+            return self.queryset.for_image()
+        elif self.action == 'export':
+            return self.queryset
+        return self.queryset.for_list(
+            self.get_requested_relations(self.relations)
+        )
 
     def get_queryset(self):
         """Retrieve recipes for authenticated user only"""
+        queryset = self._get_action_queryset()
+        if self.action in self.list_actions:
+            queryset = self._filter_list(queryset)
+
+        return queryset.filter(user=self.request.user).order_by(
+            *self.get_ordering()
+        )
+
+    def _filter_list(self, queryset):
+        """Filter the listed recipes with the query parameters"""
         tags = self.request.query_params.get('tags')
         ingredients = self.request.query_params.get('ingredients')
-        queryset = self.queryset
+        match = self.request.query_params.get('match', 'any')
+
+        if match not in self.match_modes:
+            raise ValidationError(
+                {'match': f'Must be one of: {", ".join(self.match_modes)}'}
+            )
 
         if tags:
             tags_ids = self._params_to_list(tags)
-            queryset = queryset.filter(tags__id__in=tags_ids)
+            queryset = queryset.with_tags(tags_ids, match)
 
         if ingredients:
             ingredients_ids = self._params_to_list(ingredients)
-            queryset = queryset.filter(ingredients__id__in=ingredients_ids)
+            queryset = queryset.with_ingredients(ingredients_ids, match)
+
+        if self._get_search_terms():
+            queryset = queryset.search(self._get_search_terms())
 
-        return queryset.filter(user=self.request.user).order_by('title')
+        params = self._get_list_params()
+        return queryset.filter(**{
+            lookup: params[name]
+            for name, lookup in self.range_filters.items()
+            if name in params
+        })
+
+    def _get_search_terms(self):
+        return self.request.query_params.get('search', '').strip()
+
+    def _get_list_params(self):
+        """Return the validated range filters and ordering parameters"""
+        if not hasattr(self, '_list_params'):
+            serializer = serializers.RecipeFilterSerializer(
+                data=self.request.query_params
+            )
+            if not serializer.is_valid():
+                raise ValidationError(serializer.errors)
+            self._list_params = serializer.validated_data
+
+        return self._list_params
+
+    def get_ordering(self):
+        """Return the ordering requested, by rank when searching
+
+        The id breaks ties in the direction of the first field, so the
+        per-user indexes can be scanned in either direction.
+        """
+        if self.action not in self.list_actions:
+            return self.ordering
+        ordering = self._get_list_params().get('ordering')
+        if ordering:
+            tiebreaker = '-id' if ordering[0].startswith('-') else 'id'
+            return [*ordering, tiebreaker]
+        if self._get_search_terms():
+            return self.search_ordering
+        return self.ordering
 
     def get_serializer_class(self):
         """Return the serializer to be used in the response"""
@@ -76,21 +215,218 @@ class RecipeViewSet(viewsets.ModelViewSet):
             return serializers.RecipeImageSerializer
         return self.serializer_class
 
+    def _get_fast_fields(self):
+        fields = self.get_requested_fields()
+        return list(fastpath.FIELD_COLUMNS) if fields is None else fields
+
+    def _get_fast_queryset(self):
+        """Return the queryset to read rows from, without prefetches"""
+        return self.filter_queryset(self.get_queryset()).prefetch_related(
+            None
+        )
+
+    def list(self, request, *args, **kwargs):
+        """List the recipes, built from plain rows on the fast read path"""
+        if not settings.RECIPE_FAST_READ:
+            return super().list(request, *args, **kwargs)
+
+        fields = self._get_fast_fields()
+        ordering = [field.lstrip('-') for field in self.get_ordering()]
+        rows = self._get_fast_queryset().values(
+            *fastpath.get_columns(fields, ordering)
+        )
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(
+                fastpath.represent_recipes(page, fields, request)
+            )
+
+        return Response(fastpath.represent_recipes(rows, fields, request))
+
+    def retrieve(self, request, *args, **kwargs):
+        """Retrieve a recipe, built from a plain row on the fast read path"""
+        if not settings.RECIPE_FAST_READ:
+            return super().retrieve(request, *args, **kwargs)
+
+        fields = self._get_fast_fields()
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        row = get_object_or_404(
+            self._get_fast_queryset().values(*fastpath.get_columns(fields)),
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        )
+        self.check_object_permissions(request, row)
+
+        return Response(fastpath.represent_recipes(
+            [row], fields, request, nested=True
+        )[0])
+
     def perform_create(self, serializer):
         """Create a new recipe object"""
-        serializer.save(user=self.request.user)
+        with signals.batch_search_updates():
+            serializer.save(user=self.request.user)
+
+    def perform_update(self, serializer):
+        with signals.batch_search_updates():
+            serializer.save()
+
+    def _check_bulk_size(self, data):
+        """Refuse bulk requests that are not lists within the maximum size"""
+        max_items = settings.RECIPE_BULK_MAX_ITEMS
+        if not isinstance(data, list):
+            raise ValidationError({'non_field_errors': [
+                'Expected a list of items.'
+            ]})
+        if len(data) > max_items:
+            raise ValidationError({'non_field_errors': [
+                f'At most {max_items} recipes can be sent at once.'
+            ]})
+
+    def _get_bulk_response_data(self, recipes):
+        """Serialize the recipes written in bulk, in the request order"""
+        loaded = models.Recipe.objects.for_list().in_bulk(
+            [recipe.id for recipe in recipes]
+        )
+        serializer = self.get_serializer(
+            [loaded[recipe.id] for recipe in recipes],
+            many=True
+        )
+        return serializer.data
+
+    @action(methods=['POST'], detail=False, url_path='bulk')
+    def bulk_create(self, request):
+        """Create a list of recipes in a single transaction"""
+        self._check_bulk_size(request.data)
+        serializer = self.get_serializer(data=request.data, many=True)
+
+        if serializer.is_valid():
+            with transaction.atomic():
+                recipes = serializer.save(user=self.request.user)
+            return Response(
+                self._get_bulk_response_data(recipes),
+                status=status.HTTP_201_CREATED
+            )
+
+        return Response(
+            serializer.errors,
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    @bulk_create.mapping.patch
+    def bulk_update(self, request):
+        """Update a list of recipes, identified by id, in one transaction"""
+        self._check_bulk_size(request.data)
+
+        ids = [
+            item.get('id') if isinstance(item, dict) else None
+            for item in request.data
+        ]
+        recipes = models.Recipe.objects.filter(user=self.request.user) \
+            .in_bulk([pk for pk in ids if isinstance(pk, int)])
+        id_counts = Counter(ids)
+        errors = [
+            {} if pk in recipes and id_counts[pk] == 1
+            else {'id': ['Unknown or repeated recipe id.']}
+            for pk in ids
+        ]
+        if any(errors):
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = self.get_serializer(
+            [recipes[pk] for pk in ids],
+            data=request.data,
+            many=True,
+            partial=True
+        )
+
+        if serializer.is_valid():
+            with transaction.atomic(), signals.batch_search_updates():
+                recipes = serializer.save()
+            return Response(
+                self._get_bulk_response_data(recipes),
+                status=status.HTTP_200_OK
+            )
+
+        return Response(
+            serializer.errors,
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    @bulk_create.mapping.delete
+    def bulk_destroy(self, request):
+        """Delete the recipes with the ids given in the query parameters"""
+        ids = self._params_to_list(request.query_params.get('ids', ''))
+        self._check_bulk_size(ids)
+
+        with transaction.atomic():
+            recipes = models.Recipe.objects.filter(
+                user=self.request.user,
+                id__in=ids
+            )
+            with signals.batch_recipe_deletes(
+                list(recipes.values_list('id', flat=True))
+            ):
+                recipes.delete()
+
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(methods=['GET'], detail=False)
+    def export(self, request):
+        """Stream all the filtered recipes of the user as NDJSON or CSV"""
+        export_format = request.query_params.get('export_format', 'ndjson')
+        if export_format not in export.FORMATS:
+            raise ValidationError({'export_format': [
+                f'Must be one of: {", ".join(export.FORMATS)}'
+            ]})
+
+        encode, content_type = export.FORMATS[export_format]
+        response = StreamingHttpResponse(
+            encode(export.iter_recipes(self.get_queryset())),
+            content_type=content_type
+        )
+        response['Content-Disposition'] = \
+            f'attachment; filename="recipes.{export_format}"'
+        return response
+
+    @action(methods=['POST'], detail=False, url_path='import',
+            url_name='import')
+    def import_recipes(self, request):
+        """Import the recipes of an NDJSON or CSV file, chunk by chunk"""
+        serializer = serializers.RecipeImportFileSerializer(
+            data=request.data
+        )
+
+        if serializer.is_valid():
+            data = serializer.validated_data
+            parse = imports.PARSERS[data['import_format']]
+            result = imports.import_recipes(
+                self.request.user,
+                parse(data['file']),
+                start=data['start']
+            )
+            return Response(result, status=status.HTTP_200_OK)
+
+        return Response(
+            serializer.errors,
+            status=status.HTTP_400_BAD_REQUEST
+        )
 
     @action(methods=['POST'], detail=True, url_path='upload-image')
     def upload_image(self, request, pk=None):
         """View for uploading an image to recipe"""
         recipe = self.get_object()
+        previous_image = recipe.image.name
         serializer = self.get_serializer(
             recipe,
             data=request.data
         )
 
         if serializer.is_valid():
-            serializer.save()
+            serializer.save(image_status=models.Recipe.IMAGE_PENDING)
+            if previous_image:
+                images.delete_variants(previous_image)
+            images.schedule_image_processing(recipe)
+            recipe.refresh_from_db(fields=['image_status'])
             return Response(
                 serializer.data,
                 status=status.HTTP_200_OK
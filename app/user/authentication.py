@@ -0,0 +1,43 @@
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework import authentication, exceptions
+
+
+def token_cache_key(key):
+    """Return the cache key of the token, without exposing the token"""
+    digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+    return f'auth:token:{digest}'
+
+
+def invalidate_token(key):
+    """Remove the token from the authentication cache"""
+    cache.delete(token_cache_key(key))
+
+
+class CachedTokenAuthentication(authentication.TokenAuthentication):
+    """Token authentication that caches the user id of the token
+
+    The user is loaded by primary key on each request, so the cache holds
+    no user data and the user does not need invalidating when it changes.
+    """
+
+    def authenticate_credentials(self, key):
+        cache_key = token_cache_key(key)
+        user_id = cache.get(cache_key)
+
+        if user_id is None:
+            user, token = super().authenticate_credentials(key)
+            cache.set(cache_key, user.pk, settings.AUTH_TOKEN_CACHE_TTL)
+            return (user, token)
+
+        user = get_user_model()._default_manager.filter(pk=user_id).first()
+        if user is None or not user.is_active:
+            raise exceptions.AuthenticationFailed(
+                _('User inactive or deleted.')
+            )
+
+        return (user, self.get_model()(key=key, user=user))